@@ -5,7 +5,7 @@ from random import Random
 from typing import Any, Protocol
 import logging
 
-from app.clients.ixc_client import IXCClient, IXCClientError
+from app.clients.ixc_client import IXCClient, IXCClientError, IXCUnavailableError
 from app.config import get_settings
 from app.services.ixc_grid_builder import TB_OS_ID_CLIENTE
 from app.utils.ixc_filters import (
@@ -50,6 +50,8 @@ class IXCAdapter(Protocol):
 
     def list_oss_mensagens(self, id_chamado: str) -> list[dict[str, Any]]: ...
 
+    def list_oss_mensagens_batch(self, ids: list[str]) -> dict[str, list[dict[str, Any]]]: ...
+
     def create_billing_ticket(self, payload: dict[str, Any]) -> dict[str, Any]: ...
 
     def close_billing_ticket(self, ticket_id: str, payload: dict[str, Any] | None = None) -> dict[str, Any]: ...
@@ -156,6 +158,8 @@ class RealIXCAdapter:
                 out.extend(self.client.iterate_all(endpoint, in_filter, sortname='id'))
             if out:
                 return out
+        except IXCUnavailableError:
+            raise
         except IXCClientError:
             pass
 
@@ -176,10 +180,40 @@ class RealIXCAdapter:
         try:
             rows = self.client.iterate_all('/su_oss_chamado_mensagem', filters, sortname='data', sortorder='asc')
         except IXCClientError as exc:
+            # propaga: lista vazia acabaria no cache como "OS sem mensagens"
             logger.warning('IXC list_oss_mensagens failed id_chamado=%s err=%s', id_chamado, exc)
-            return []
+            raise
         return sorted(rows, key=lambda r: str(r.get('data') or ''))
 
+    def list_oss_mensagens_batch(self, ids: list[str]) -> dict[str, list[dict[str, Any]]]:
+        uniq = list(dict.fromkeys(str(i).strip() for i in ids if str(i).strip()))
+        out: dict[str, list[dict[str, Any]]] = {i: [] for i in uniq}
+        for i in range(0, len(uniq), 200):
+            batch = uniq[i : i + 200]
+            in_filter = [{'TB': 'su_oss_chamado_mensagem.id_chamado', 'OP': 'IN', 'P': ','.join(batch)}]
+            try:
+                rows = self.client.iterate_all('/su_oss_chamado_mensagem', in_filter, sortname='data', sortorder='asc')
+            except IXCUnavailableError:
+                raise
+            except IXCClientError as exc:
+                # IN recusado/falhou: cai para uma chamada por OS; a que falhar sai do retorno (não vai ao cache)
+                logger.warning('IXC list_oss_mensagens_batch failed ids=%s err=%s', len(batch), exc)
+                for id_chamado in batch:
+                    try:
+                        out[id_chamado] = self.list_oss_mensagens(id_chamado)
+                    except IXCUnavailableError:
+                        raise
+                    except IXCClientError:
+                        del out[id_chamado]
+                continue
+            for row in rows:
+                key = str(row.get('id_chamado') or '')
+                if key in out:
+                    out[key].append(row)
+        for key, rows in out.items():
+            rows.sort(key=lambda r: str(r.get('data') or ''))
+        return out
+
     def create_billing_ticket(self, payload: dict[str, Any]) -> dict[str, Any]:
         settings = get_settings()
         endpoint = settings.billing_ticket_endpoint
@@ -413,6 +447,10 @@ class MockIXCAdapter:
             {'id': '2', 'id_chamado': str(id_chamado), 'data': '2025-01-02 10:00:00', 'mensagem': 'OS finalizada', 'id_evento': '99', 'status': 'F'},
         ]
 
+    def list_oss_mensagens_batch(self, ids: list[str]) -> dict[str, list[dict[str, Any]]]:
+        uniq = list(dict.fromkeys(str(i).strip() for i in ids if str(i).strip()))
+        return {i: self.list_oss_mensagens(i) for i in uniq}
+
     def create_billing_ticket(self, payload: dict[str, Any]) -> dict[str, Any]:
         external_id = str(payload.get('external_id') or payload.get('titulo_id') or '0')
         return {'ticket_id': f'TCK-{external_id}', 'payload': payload}
@@ -1,13 +1,16 @@
 import logging
 from datetime import date
 from decimal import Decimal
+from itertools import chain
 from time import perf_counter
+from typing import Any, Iterator
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy import func
 
+from app.clients.ixc_scheduler import background_ixc_priority
 from app.config import get_settings
-from app.db import BillingCase, SessionLocal
+from app.db import BillingCase, SessionLocal, json_key_equals
 from app.models.billing import (
     BillingActionOut,
     BillingBatchFilters,
@@ -25,8 +28,12 @@ from app.models.billing import (
     BillingTicketDryRunOut,
 )
 from app.services.adapters import get_ixc_adapter
-from app.services.billing import build_billing_open_response, list_billing_actions
-from app.services.billing_cases import build_grouped_billing_cases
+from app.services.billing import (
+    BILLING_OPEN_CACHE_KEY,
+    build_billing_open_response,
+    list_billing_actions,
+)
+from app.services.billing_cases import build_grouped_billing_cases, iter_grouped_billing_cases
 from app.services.billing_enrich import enrich_billing_cases
 from app.services.billing_sync import sync_billing_cases
 from app.services.billing_tickets import (
@@ -37,34 +44,49 @@ from app.services.billing_tickets import (
     dry_run_case_ticket,
     reconcile_tickets,
 )
-from app.utils.cache import cache_get_json, cache_set_json
+from app.utils.cache import cache_get_entry, cache_get_json, cache_set_json, stable_json_hash
+from app.utils.profiling import ixc_budget_exceeded
+from app.utils.responses import cached_json_response, conditional_payload
+from app.utils.streaming import ndjson_response
 
 router = APIRouter(prefix='/billing', tags=['billing'])
 logger = logging.getLogger(__name__)
 
 
 @router.get('/open', response_model=BillingOpenResponse)
-def get_billing_open(response: Response, adapter=Depends(get_ixc_adapter)):
+def get_billing_open(request: Request, response: Response, stream: bool = Query(default=False), adapter=Depends(get_ixc_adapter)):
     started_at = perf_counter()
-    cache_key = 'softhub:billing:open:v1'
-    cached = cache_get_json(cache_key)
+    if stream:
+        cached = cache_get_json(BILLING_OPEN_CACHE_KEY)
+        if cached is not None:
+            return ndjson_response(chain(cached.get('items', []), ({'summary': cached.get('summary')},)), headers={'X-Cache': 'HIT'})
+        # payload montado (e ações gravadas) antes do primeiro byte; o stream só serializa o que já está pronto
+        payload = build_billing_open_response(adapter)
+        if not ixc_budget_exceeded():
+            cache_set_json(BILLING_OPEN_CACHE_KEY, payload, ttl_s=get_settings().dashboard_cache_ttl_s)
+        return ndjson_response(chain(payload['items'], ({'summary': payload['summary']},)), headers={'X-Cache': 'MISS'})
+
+    cached = cache_get_entry(BILLING_OPEN_CACHE_KEY)
     if cached is not None:
-        response.headers['X-Cache'] = 'HIT'
         logger.info(
             'billing.open completed',
             extra={
                 'event': 'billing.open',
                 'cache': 'HIT',
-                'items_count': len(cached.get('items', [])),
+                'bytes': len(cached[0]),
                 'elapsed_ms': round((perf_counter() - started_at) * 1000, 2),
             },
         )
-        return cached
+        return cached_json_response(request, *cached, headers={'X-Cache': 'HIT'})
 
+    request.state.stale_cache_key = BILLING_OPEN_CACHE_KEY
     payload = build_billing_open_response(adapter)
-    cache_set_json(cache_key, payload, ttl_s=get_settings().dashboard_cache_ttl_s)
     response.headers['X-Cache'] = 'MISS'
-    return payload
+    if ixc_budget_exceeded():
+        # resposta parcial: não vai para o cache nem ganha ETag
+        return payload
+    digest = cache_set_json(BILLING_OPEN_CACHE_KEY, payload, ttl_s=get_settings().dashboard_cache_ttl_s)
+    return conditional_payload(request, response, payload, digest)
 
 
 @router.get('/actions', response_model=list[BillingActionOut])
@@ -72,7 +94,7 @@ def get_billing_actions(limit: int = Query(default=200, ge=1, le=1000)):
     return list_billing_actions(limit)
 
 
-@router.post('/sync', response_model=BillingSyncOut)
+@router.post('/sync', response_model=BillingSyncOut, dependencies=[Depends(background_ixc_priority)])
 def post_billing_sync(
     due_from: date | None = Query(default=None),
     only_open: bool = Query(default=True),
@@ -98,7 +120,7 @@ def post_billing_sync(
     )
 
 
-@router.post('/enrich', response_model=BillingEnrichOut)
+@router.post('/enrich', response_model=BillingEnrichOut, dependencies=[Depends(background_ixc_priority)])
 def post_billing_enrich(
     limit: int = Query(default=2000, ge=1, le=10000),
     only_missing: bool = Query(default=True),
@@ -134,7 +156,7 @@ def post_tickets_batch_dry_run(body: BillingTicketBatchIn):
     return BillingTicketBatchDryRunOut(**result)
 
 
-@router.post('/tickets/batch', response_model=BillingTicketBatchOut)
+@router.post('/tickets/batch', response_model=BillingTicketBatchOut, dependencies=[Depends(background_ixc_priority)])
 def post_tickets_batch(body: BillingTicketBatchIn, adapter=Depends(get_ixc_adapter)):
     filters = body.filters.model_dump() if body.filters else None
     try:
@@ -157,7 +179,7 @@ def post_tickets_batch(body: BillingTicketBatchIn, adapter=Depends(get_ixc_adapt
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
-@router.post('/tickets/reconcile', response_model=BillingReconcileOut)
+@router.post('/tickets/reconcile', response_model=BillingReconcileOut, dependencies=[Depends(background_ixc_priority)])
 def post_tickets_reconcile(
     limit: int = Query(default=1000, ge=1, le=5000),
     adapter=Depends(get_ixc_adapter),
@@ -168,12 +190,12 @@ def post_tickets_reconcile(
 
 
 
-@router.post('/cases/tickets', response_model=BillingTicketBatchOut)
+@router.post('/cases/tickets', response_model=BillingTicketBatchOut, dependencies=[Depends(background_ixc_priority)])
 def post_cases_tickets(body: BillingTicketBatchIn, adapter=Depends(get_ixc_adapter)):
     return post_tickets_batch(body, adapter)
 
 
-@router.post('/cases/reconcile', response_model=BillingReconcileOut)
+@router.post('/cases/reconcile', response_model=BillingReconcileOut, dependencies=[Depends(background_ixc_priority)])
 def post_cases_reconcile(limit: int = Query(default=1000, ge=1, le=5000), adapter=Depends(get_ixc_adapter)):
     return post_tickets_reconcile(limit=limit, adapter=adapter)
 
@@ -196,9 +218,13 @@ def get_billing_cases(
     limit: int = Query(default=500, ge=1, le=2000),
     min_due_date: date | None = Query(default=None),
     max_due_date: date | None = Query(default=None),
+    stream: bool = Query(default=False),
+    request: Request = None,
+    response: Response = None,
     adapter=Depends(get_ixc_adapter),
 ):
-    return build_grouped_billing_cases(
+    build = iter_grouped_billing_cases if stream else build_grouped_billing_cases
+    result = build(
         adapter=adapter,
         only_20p=only_20p,
         group_by=group_by,
@@ -206,6 +232,64 @@ def get_billing_cases(
         min_due_date=min_due_date,
         max_due_date=max_due_date,
     )
+    if stream:
+        return ndjson_response(result)
+    if ixc_budget_exceeded():
+        return result
+    # generated_at muda a cada chamada; fica fora do hash para o ETag refletir só o conteúdo
+    summary = {k: v for k, v in result['summary'].items() if k != 'generated_at'}
+    return conditional_payload(request, response, result, stable_json_hash({**result, 'summary': summary}))
+
+
+BILLING_CASE_FIELDS = tuple(BillingCaseOut.model_fields)
+
+
+def _filter_case_json(query, db, status_internet: str | None, plano_nome: str | None, cidade: str | None):
+    # chaves gravadas pelo enrich em contract_json/client_json; no Postgres o filtro usa o índice GIN
+    dialect_name = db.get_bind().dialect.name
+    if status_internet:
+        query = query.filter(json_key_equals(BillingCase.contract_json, 'status_internet', status_internet, dialect_name))
+    if plano_nome:
+        query = query.filter(json_key_equals(BillingCase.contract_json, 'plano_nome', plano_nome, dialect_name))
+    if cidade:
+        query = query.filter(json_key_equals(BillingCase.client_json, 'cidade', cidade, dialect_name))
+    return query
+
+
+def _billing_cases_db_query(
+    db,
+    status: str,
+    filial_id: str | None,
+    min_days: int | None,
+    only_over_20_days: bool,
+    due_from: date | None,
+    due_to: date | None,
+    status_internet: str | None,
+    plano_nome: str | None,
+    cidade: str | None,
+    limit: int,
+    offset: int,
+):
+    resolved_status = status.upper()
+    query = db.query(BillingCase).filter(BillingCase.status_case == resolved_status)
+    if filial_id:
+        query = query.filter(BillingCase.filial_id == filial_id)
+    effective_min_days = 20 if only_over_20_days and min_days is None else min_days
+    if effective_min_days is not None:
+        query = query.filter(BillingCase.open_days >= effective_min_days)
+    if due_from:
+        query = query.filter(BillingCase.due_date >= due_from)
+    if due_to:
+        query = query.filter(BillingCase.due_date <= due_to)
+    query = _filter_case_json(query, db, status_internet, plano_nome, cidade)
+    return query.order_by(BillingCase.open_days.desc(), BillingCase.due_date.asc()).offset(offset).limit(limit)
+
+
+def _stream_billing_cases_db(*query_args) -> Iterator[dict[str, Any]]:
+    # sessão própria, aberta durante o stream; yield_per evita carregar todas as linhas de uma vez
+    with SessionLocal() as db:
+        for row in _billing_cases_db_query(db, *query_args).yield_per(200):
+            yield {field: getattr(row, field) for field in BILLING_CASE_FIELDS}
 
 
 @router.get('/cases/db', response_model=list[BillingCaseOut])
@@ -216,22 +300,18 @@ def get_billing_cases_db(
     only_over_20_days: bool = Query(default=False),
     due_from: date | None = Query(default=None),
     due_to: date | None = Query(default=None),
+    status_internet: str | None = Query(default=None),
+    plano_nome: str | None = Query(default=None),
+    cidade: str | None = Query(default=None),
     limit: int = Query(default=50, ge=1, le=500),
     offset: int = Query(default=0, ge=0),
+    stream: bool = Query(default=False),
 ):
+    query_args = (status, filial_id, min_days, only_over_20_days, due_from, due_to, status_internet, plano_nome, cidade, limit, offset)
+    if stream:
+        return ndjson_response(_stream_billing_cases_db(*query_args))
     with SessionLocal() as db:
-        resolved_status = status.upper()
-        query = db.query(BillingCase).filter(BillingCase.status_case == resolved_status)
-        if filial_id:
-            query = query.filter(BillingCase.filial_id == filial_id)
-        effective_min_days = 20 if only_over_20_days and min_days is None else min_days
-        if effective_min_days is not None:
-            query = query.filter(BillingCase.open_days >= effective_min_days)
-        if due_from:
-            query = query.filter(BillingCase.due_date >= due_from)
-        if due_to:
-            query = query.filter(BillingCase.due_date <= due_to)
-        return query.order_by(BillingCase.open_days.desc(), BillingCase.due_date.asc()).offset(offset).limit(limit).all()
+        return _billing_cases_db_query(db, *query_args).all()
 
 
 @router.get('/cases/summary', response_model=BillingCasesSummaryOut)
@@ -241,6 +321,9 @@ def get_billing_cases_summary(
     min_days: int | None = Query(default=None, ge=0),
     due_from: date | None = Query(default=None),
     due_to: date | None = Query(default=None),
+    status_internet: str | None = Query(default=None),
+    plano_nome: str | None = Query(default=None),
+    cidade: str | None = Query(default=None),
 ):
     with SessionLocal() as db:
         filtered = db.query(BillingCase).filter(BillingCase.status_case == status)
@@ -252,6 +335,7 @@ def get_billing_cases_summary(
             filtered = filtered.filter(BillingCase.due_date >= due_from)
         if due_to:
             filtered = filtered.filter(BillingCase.due_date <= due_to)
+        filtered = _filter_case_json(filtered, db, status_internet, plano_nome, cidade)
 
         totals = filtered.with_entities(
             func.count(BillingCase.id),
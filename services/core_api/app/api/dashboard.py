@@ -6,13 +6,13 @@ from datetime import timedelta
 from time import perf_counter
 
 import anyio
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
 from app.models.dashboard import AgendaWeekResponse, DashboardItem, DashboardSummary, InstallationsPendingResponse
 from app.config import get_settings
 from app.services.adapters import get_ixc_adapter
 from app.services.dashboard import (
-    _load_subject_ids,
+    agenda_week_cache_key,
     agenda_week_range,
     build_agenda_week,
     compose_dashboard_summary,
@@ -23,15 +23,20 @@ from app.services.dashboard import (
     fetch_maint_opened_today_rows,
     fetch_maint_period_rows,
     fetch_maintenance_items,
+    iter_maintenance_items,
     maintenances_range,
     _resolve_today,
     build_installations_pending_response,
     fetch_installations_pending_rows,
     resolve_period,
+    summary_cache_key,
 )
-from app.services.filters import get_saved_filter_definition
-from app.utils.cache import cache_get_json, cache_set_json, stable_json_hash
-from app.utils.profiling import timer
+from app.services.filter_plans import load_subject_ids
+from app.services.filters import get_saved_filter_definition, get_saved_filter_definition_async
+from app.utils.cache import cache_get_entry, cache_set_json
+from app.utils.profiling import ixc_budget_exceeded, timer
+from app.utils.responses import cached_json_response, conditional_payload
+from app.utils.streaming import ndjson_response
 
 router = APIRouter(prefix='/dashboard', tags=['dashboard'])
 logger = logging.getLogger(__name__)
@@ -48,6 +53,17 @@ def _resolve_definition(filter_id: str | None, filter_json: str | None) -> dict:
     return {}
 
 
+async def _resolve_definition_async(filter_id: str | None, filter_json: str | None) -> dict:
+    if filter_json:
+        return json.loads(filter_json)
+    if filter_id:
+        definition = await get_saved_filter_definition_async(filter_id)
+        if definition is None:
+            raise HTTPException(status_code=404, detail='filter not found')
+        return definition
+    return {}
+
+
 @router.get('/agenda-week', response_model=AgendaWeekResponse)
 def get_agenda_week(
     start: str | None = Query(default=None),
@@ -56,12 +72,26 @@ def get_agenda_week(
     filter_id: str | None = Query(default=None),
     filter_json: str | None = Query(default=None),
     filial_id: str | None = Query(default=None, pattern='^(1|2)$'),
+    request: Request = None,
+    response: Response = None,
     adapter=Depends(get_ixc_adapter),
 ):
     definition = _resolve_definition(filter_id, filter_json)
     start, days = resolve_period(period, start, days)
     date_start, _ = agenda_week_range(start, days)
-    return build_agenda_week(adapter, date_start, days, definition, filial_id=filial_id)
+    cache_key = agenda_week_cache_key(date_start, days, filial_id, definition)
+    cached = cache_get_entry(cache_key)
+    if cached is not None:
+        return cached_json_response(request, *cached, headers={'X-Cache': 'HIT'})
+
+    response.headers['X-Cache'] = 'MISS'
+    request.state.stale_cache_key = cache_key
+    payload = build_agenda_week(adapter, date_start, days, definition, filial_id=filial_id)
+    if ixc_budget_exceeded():
+        # resposta parcial: não vai para o cache nem ganha ETag
+        return payload
+    digest = cache_set_json(cache_key, payload, ttl_s=get_settings().dashboard_cache_ttl_s)
+    return conditional_payload(request, response, payload, digest)
 
 
 @router.get('/maintenances', response_model=list[DashboardItem])
@@ -71,13 +101,16 @@ def get_maintenances(
     tab: str = Query(default='open', pattern='^(open|scheduled|done)$'),
     filter_id: str | None = Query(default=None),
     filter_json: str | None = Query(default=None),
+    stream: bool = Query(default=False),
     adapter=Depends(get_ixc_adapter),
 ):
     definition = _resolve_definition(filter_id, filter_json)
+    date_start = date_end = None
     if from_ or to:
         date_start, date_end = maintenances_range(from_, to)
-        return fetch_maintenance_items(adapter, definition, tab=tab, date_start=date_start, date_end=date_end)
-    return fetch_maintenance_items(adapter, definition, tab=tab)
+    if stream:
+        return ndjson_response(iter_maintenance_items(adapter, definition, tab=tab, date_start=date_start, date_end=date_end))
+    return fetch_maintenance_items(adapter, definition, tab=tab, date_start=date_start, date_end=date_end)
 
 
 @router.get('/summary', response_model=DashboardSummary)
@@ -90,24 +123,25 @@ async def get_summary(
     tz: str | None = Query(default='America/Sao_Paulo'),
     filter_id: str | None = Query(default=None),
     filter_json: str | None = Query(default=None),
+    request: Request = None,
     response: Response = None,
     adapter=Depends(get_ixc_adapter),
 ): 
-    definition = _resolve_definition(filter_id, filter_json)
+    definition = await _resolve_definition_async(filter_id, filter_json)
     today_date = _resolve_today(today, tz)
     start, days = resolve_period(period, start, days, today_override=today_date)
     date_start, _ = agenda_week_range(start, days)
-    filter_hash = stable_json_hash(definition)
-    cache_key = f"softhub:dash:summary:{date_start.strftime('%Y-%m-%d')}:{days}:{filial_id or 'all'}:{filter_hash}"
-    cached = cache_get_json(cache_key)
+    cache_key = summary_cache_key(date_start, days, filial_id, definition)
+    # Redis e banco (cache, snapshot de settings) são síncronos: tudo fora do event loop
+    cached = await anyio.to_thread.run_sync(cache_get_entry, cache_key)
     if cached is not None:
-        response.headers['X-Cache'] = 'HIT'
-        return cached
+        return cached_json_response(request, *cached, headers={'X-Cache': 'HIT'})
 
     response.headers['X-Cache'] = 'MISS'
+    request.state.stale_cache_key = cache_key
 
     with timer('api.dashboard.summary', logger, {'endpoint': '/dashboard/summary', 'days': days, 'filial_id': filial_id}):
-        install_subject_ids, maintenance_subject_ids = _load_subject_ids()
+        install_subject_ids, maintenance_subject_ids = await anyio.to_thread.run_sync(load_subject_ids)
         total_days = max(1, min(days, 31))
         date_end = date_start + timedelta(days=total_days - 1)
 
@@ -133,18 +167,20 @@ async def get_summary(
         tempo_ixc_maint_aux = perf_counter() - t_ixc_start
 
         t_process_start = perf_counter()
-        payload = compose_dashboard_summary(
-            date_start,
-            total_days,
-            today_date,
-            definition,
-            install_rows,
-            maint_period_rows,
-            maint_done_rows,
-            maint_backlog_rows,
-            maint_opened_today_rows,
-            maint_done_today_rows,
-            install_overdue_rows,
+        payload = await anyio.to_thread.run_sync(
+            lambda: compose_dashboard_summary(
+                date_start,
+                total_days,
+                today_date,
+                definition,
+                install_rows,
+                maint_period_rows,
+                maint_done_rows,
+                maint_backlog_rows,
+                maint_opened_today_rows,
+                maint_done_today_rows,
+                install_overdue_rows,
+            )
         )
         tempo_processamento = perf_counter() - t_process_start
         tempo_total = perf_counter() - t0
@@ -159,8 +195,10 @@ async def get_summary(
             tempo_processamento,
         )
 
-    cache_set_json(cache_key, payload, ttl_s=get_settings().dashboard_cache_ttl_s)
-    return payload
+    if ixc_budget_exceeded():
+        return payload
+    digest = await anyio.to_thread.run_sync(lambda: cache_set_json(cache_key, payload, ttl_s=get_settings().dashboard_cache_ttl_s))
+    return conditional_payload(request, response, payload, digest)
 
 
 
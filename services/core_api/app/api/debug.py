@@ -3,7 +3,7 @@ from __future__ import annotations
 from fastapi import APIRouter, HTTPException, Query
 
 from app.config import get_settings
-from app.utils.profiling import last_events
+from app.utils.profiling import find_trace, last_events, latency_summary
 
 router = APIRouter(prefix='/debug', tags=['debug'])
 
@@ -12,4 +12,22 @@ router = APIRouter(prefix='/debug', tags=['debug'])
 def get_perf_last(limit: int = Query(default=100, ge=1, le=500)):
     if not get_settings().softhub_profile:
         raise HTTPException(status_code=404, detail='profiling disabled')
-    return {'events': last_events(limit), 'count': min(limit, len(last_events(limit)))}
+    events = last_events(limit)
+    return {'events': events, 'count': len(events)}
+
+
+@router.get('/perf/summary')
+def get_perf_summary():
+    if not get_settings().softhub_profile:
+        raise HTTPException(status_code=404, detail='profiling disabled')
+    return {'unit': 'ms', 'windows': latency_summary()}
+
+
+@router.get('/perf/traces/{request_id}')
+def get_perf_trace(request_id: str):
+    if not get_settings().softhub_profile:
+        raise HTTPException(status_code=404, detail='profiling disabled')
+    trace = find_trace(request_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail='trace not found')
+    return trace
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import date
+
+from fastapi import APIRouter, HTTPException, Query, status
+import redis
+
+from app.models.jobs import JobOut
+from app.services.jobs import JobEnqueueError, enqueue_job, get_job
+
+router = APIRouter(prefix='/jobs', tags=['jobs'])
+
+
+def _enqueue(kind: str, params: dict) -> dict:
+    try:
+        return enqueue_job(kind, params)
+    except JobEnqueueError as exc:
+        raise HTTPException(status_code=503, detail=f'job queue unavailable: {exc}') from exc
+
+
+@router.post('/billing/sync', response_model=JobOut, status_code=status.HTTP_202_ACCEPTED)
+def post_billing_sync_job(
+    due_from: date | None = Query(default=None),
+    only_open: bool = Query(default=True),
+    filial_id: str | None = Query(default=None),
+    limit_pages: int = Query(default=5, ge=1, le=20),
+    rp: int = Query(default=500, ge=50, le=1000),
+):
+    return _enqueue(
+        'billing_sync',
+        {
+            'due_from': due_from.isoformat() if due_from else None,
+            'only_open': only_open,
+            'filial_id': filial_id,
+            'limit_pages': limit_pages,
+            'rp': rp,
+        },
+    )
+
+
+@router.post('/billing/enrich', response_model=JobOut, status_code=status.HTTP_202_ACCEPTED)
+def post_billing_enrich_job(
+    limit: int = Query(default=2000, ge=1, le=10000),
+    only_missing: bool = Query(default=True),
+):
+    return _enqueue('billing_enrich', {'limit': limit, 'only_missing': only_missing})
+
+
+@router.post('/billing/reconcile', response_model=JobOut, status_code=status.HTTP_202_ACCEPTED)
+def post_billing_reconcile_job(limit: int = Query(default=1000, ge=1, le=5000)):
+    return _enqueue('billing_reconcile', {'limit': limit})
+
+
+@router.get('/{job_id}', response_model=JobOut)
+def get_job_status(job_id: str):
+    try:
+        job = get_job(job_id)
+    except redis.RedisError as exc:
+        raise HTTPException(status_code=503, detail=f'job store unavailable: {exc}') from exc
+    if job is None:
+        raise HTTPException(status_code=404, detail='job not found')
+    return job
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.utils.cache import get_redis
+from app.utils.metrics import render_prometheus, render_worker_task_metrics
+
+router = APIRouter(tags=['metrics'])
+
+
+@router.get('/metrics', response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    body = render_prometheus(render_worker_task_metrics(get_redis()))
+    return PlainTextResponse(body, media_type='text/plain; version=0.0.4; charset=utf-8')
@@ -2,13 +2,18 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends
 
+from app.models.oss import OssMensagensBatchIn
+from app.services import oss_messages
 from app.services.adapters import get_ixc_adapter
 
 router = APIRouter(prefix='/oss', tags=['oss'])
 
 
+@router.post('/mensagens/batch')
+def get_oss_mensagens_batch(payload: OssMensagensBatchIn, adapter=Depends(get_ixc_adapter)):
+    return {'items': oss_messages.get_oss_mensagens_batch(adapter, [item.id for item in payload.items])}
+
+
 @router.get('/{id_chamado}/mensagens')
 def get_oss_mensagens(id_chamado: str, adapter=Depends(get_ixc_adapter)):
-    registros = adapter.list_oss_mensagens(id_chamado)
-    registros = sorted(registros, key=lambda r: str(r.get('data') or ''))
-    return {'total': len(registros), 'registros': registros}
+    return oss_messages.get_oss_mensagens(adapter, id_chamado)
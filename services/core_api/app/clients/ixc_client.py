@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import base64
+from contextlib import nullcontext
 import json
 import logging
 import time
@@ -8,8 +9,11 @@ from typing import Any
 
 import httpx
 
+from app.clients.ixc_resilience import HALF_OPEN, OPEN, AdaptiveTimeout, CircuitBreakers
+from app.clients.ixc_scheduler import IXCScheduler, IXCSchedulerTimeout
 from app.config import get_settings
-from app.utils.profiling import log_profile_event, now_ms
+from app.utils.metrics import IXC_REQUESTS, observe_ixc_call
+from app.utils.profiling import get_request_trace, log_profile_event, now_ms, record_ixc_span
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +22,21 @@ class IXCClientError(RuntimeError):
     pass
 
 
+class IXCCallBudgetExceeded(IXCClientError):
+    pass
+
+
+class IXCUnavailableError(IXCClientError):
+    # IXC fora do ar ou degradado (rede, timeout, 408/429/5xx): a API pode responder com cache antigo
+    def __init__(self, message: str, retry_after_s: float = 0.0) -> None:
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
+
+
+class IXCCircuitOpenError(IXCUnavailableError):
+    pass
+
+
 class IXCClient:
     def __init__(
         self,
@@ -28,14 +47,25 @@ class IXCClient:
         timeout_s: float = 20.0,
         max_retries: int = 3,
         backoff_base: float = 0.5,
+        scheme: str = 'https',
+        transport: httpx.BaseTransport | None = None,
+        breaker_failures: int = 5,
+        breaker_open_s: float = 30.0,
+        adaptive_timeout: bool = True,
+        timeout_min_s: float = 2.0,
+        timeout_p99_factor: float = 3.0,
+        scheduler: IXCScheduler | None = None,
     ) -> None:
-        self.base_url = f'https://{host}/webservice/v1'
+        self.base_url = f'{scheme}://{host}/webservice/v1'
         self.verify_tls = verify_tls
         self.timeout_s = timeout_s
         self.max_retries = max_retries
         self.backoff_base = backoff_base
         self.auth_header = build_basic_auth_header(user, token)
-        self._client = httpx.Client(verify=self.verify_tls, timeout=self.timeout_s)
+        self._client = httpx.Client(verify=self.verify_tls, timeout=self.timeout_s, transport=transport)
+        self.breakers = CircuitBreakers(breaker_failures, breaker_open_s)
+        self.scheduler = scheduler
+        self.timeouts = AdaptiveTimeout(timeout_s, min_s=timeout_min_s, p99_factor=timeout_p99_factor, enabled=adaptive_timeout)
 
     def _headers(self, action: str = 'listar') -> dict[str, str]:
         return {
@@ -65,11 +95,25 @@ class IXCClient:
             'sortorder': sortorder,
         }
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        breaker = self.breakers.get(endpoint)
         for attempt in range(1, self.max_retries + 1):
+            if not self._within_call_budget(endpoint):
+                return {'registros': [], 'total': 0}
+            if not breaker.allow():
+                IXC_REQUESTS.inc(endpoint='/' + endpoint.strip('/'), status='circuit_open')
+                raise IXCCircuitOpenError(f'IXC circuit open for {endpoint}', retry_after_s=breaker.retry_after_s())
+            # sonda do half_open usa o timeout cheio: um IXC lento mas vivo não pode reabrir o circuito por timeout curto
+            timeout = self.timeouts.max_s if breaker.state == HALF_OPEN else self.timeouts.timeout_for(endpoint)
             started = now_ms()
             try:
-                response = self._client.post(url, headers=self._headers(action=action), json=payload)
+                with self.scheduler.slot() if self.scheduler is not None else nullcontext():
+                    # latência medida só depois da fila, para não contaminar o timeout adaptativo
+                    started = now_ms()
+                    response = self._client.post(url, headers=self._headers(action=action), json=payload, timeout=timeout)
                 elapsed_ms = now_ms() - started
+                content_size = len(getattr(response, 'content', b'') or b'')
+                observe_ixc_call(endpoint, response.status_code, elapsed_ms / 1000, content_size)
+                record_ixc_span(endpoint, elapsed_ms, {'status_code': response.status_code, 'page': page, 'rp': rp, 'attempt': attempt, 'content_size': content_size})
                 if get_settings().softhub_profile:
                     log_profile_event(
                         logger,
@@ -84,9 +128,12 @@ class IXCClient:
                         },
                     )
                 if response.status_code in {408, 429} or response.status_code >= 500:
-                    raise IXCClientError(
+                    raise IXCUnavailableError(
                         f'IXC retryable status for {endpoint} on attempt {attempt}: {response.status_code}'
                     )
+                # o IXC respondeu: mesmo 4xx ou erro lógico contam como endpoint vivo para o breaker
+                breaker.record_success()
+                self.timeouts.observe(endpoint, elapsed_ms / 1000)
 
                 response.raise_for_status()
 
@@ -120,14 +167,47 @@ class IXCClient:
                     )
 
                 return data
+            except IXCSchedulerTimeout as exc:
+                # fila cheia é sobrecarga nossa, não falha do IXC: não conta para o breaker nem tenta de novo
+                IXC_REQUESTS.inc(endpoint='/' + endpoint.strip('/'), status='scheduler_timeout')
+                raise IXCUnavailableError(f'IXC scheduler timeout for {endpoint}: {exc}', retry_after_s=1.0) from exc
             except (httpx.TimeoutException, httpx.NetworkError, IXCClientError) as exc:
+                if isinstance(exc, httpx.TransportError):
+                    observe_ixc_call(endpoint, 'error', (now_ms() - started) / 1000, 0)
+                    record_ixc_span(endpoint, now_ms() - started, {'error': type(exc).__name__, 'page': page, 'attempt': attempt})
+                if isinstance(exc, httpx.TimeoutException):
+                    self.timeouts.observe_timeout(endpoint, timeout)
+                unavailable = isinstance(exc, (httpx.TransportError, IXCUnavailableError))
+                if unavailable:
+                    breaker.record_failure()
+                    # breaker abriu no meio dos retries: desiste já, sem dormir o backoff restante
+                    if breaker.state == OPEN:
+                        self.timeouts.reset(endpoint)
+                        raise IXCCircuitOpenError(
+                            f'IXC circuit opened for {endpoint} on attempt {attempt}: {exc}', retry_after_s=breaker.retry_after_s()
+                        ) from exc
                 if attempt >= self.max_retries:
-                    raise IXCClientError(f'Failed IXC call for {endpoint} on attempt {attempt}: {exc}') from exc
+                    error_cls = IXCUnavailableError if unavailable else IXCClientError
+                    raise error_cls(f'Failed IXC call for {endpoint} on attempt {attempt}: {exc}') from exc
                 time.sleep(self.backoff_base * (2 ** (attempt - 1)))
             except httpx.HTTPStatusError as exc:
                 raise IXCClientError(f'IXC HTTP error for {endpoint} on attempt {attempt}: {exc}') from exc
         raise IXCClientError(f'Unexpected IXC failure for {endpoint}')
 
+    def _within_call_budget(self, endpoint: str) -> bool:
+        trace = get_request_trace()
+        if trace is None:
+            return True
+        calls = trace.reserve_ixc_call()
+        budget = get_settings().ixc_call_budget
+        if budget <= 0 or calls <= budget:
+            return True
+        trace.budget_exceeded = True
+        if get_settings().ixc_call_budget_mode.lower() == 'degrade':
+            logger.warning('IXC call budget exceeded (%s > %s); skipping %s', calls, budget, endpoint)
+            return False
+        raise IXCCallBudgetExceeded(f'IXC call budget exceeded for request {trace.request_id}: {calls} > {budget} ({endpoint})')
+
     def iterate_all(
         self,
         endpoint: str,
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from typing import Callable, Iterable
+
+from app.utils.metrics import GaugeCallback, register
+from app.utils.quantiles import WindowedSketches
+
+# Proteções do IXCClient quando o IXC degrada: circuit breaker por endpoint (falha rápido em vez de empilhar
+# retries) e timeout por endpoint ajustado pela latência observada (p99 recente), limitado ao IXC_TIMEOUT_S.
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    # closed -> open após N falhas seguidas; depois de open_s vira half_open e deixa passar uma sonda:
+    # sucesso fecha, falha abre de novo
+    def __init__(self, failure_threshold: int, open_s: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.failure_threshold = failure_threshold
+        self.open_s = open_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: float | None = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        if self.failure_threshold <= 0:
+            return True
+        with self._lock:
+            now = self._clock()
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if now - self._opened_at < self.open_s:
+                    return False
+                self._state = HALF_OPEN
+                self._probe_started = now
+                return True
+            # sonda que nunca respondeu (erro não classificado) não trava o half_open para sempre
+            if self._probe_started is not None and now - self._probe_started < self.open_s:
+                return False
+            self._probe_started = now
+            return True
+
+    def retry_after_s(self) -> float:
+        with self._lock:
+            if self._state == CLOSED:
+                return 0.0
+            return max(0.0, self.open_s - (self._clock() - self._opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_started = None
+
+    def record_failure(self) -> None:
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._probe_started = None
+
+
+class CircuitBreakers:
+    def __init__(self, failure_threshold: int, open_s: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.failure_threshold = failure_threshold
+        self.open_s = open_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._breakers: dict[str, CircuitBreaker] = {}
+        _registries.add(self)
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        key = '/' + endpoint.strip('/')
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(key, CircuitBreaker(self.failure_threshold, self.open_s, self._clock))
+        return breaker
+
+    def states(self) -> dict[str, str]:
+        with self._lock:
+            items = list(self._breakers.items())
+        return {endpoint: breaker.state for endpoint, breaker in items}
+
+
+class AdaptiveTimeout:
+    # timeout = p99 dos últimos window_min minutos × p99_factor, entre min_s e max_s; sem amostras suficientes usa max_s.
+    # Chamada que estourou o timeout entra como amostra no valor do timeout (a latência real é pelo menos isso),
+    # senão um IXC que ficou lento só geraria timeouts e o p99 nunca subiria.
+    def __init__(
+        self,
+        max_s: float,
+        min_s: float = 2.0,
+        p99_factor: float = 3.0,
+        min_samples: int = 20,
+        window_min: int = 5,
+        refresh_s: float = 5.0,
+        enabled: bool = True,
+    ) -> None:
+        self.max_s = max_s
+        self.min_s = min(min_s, max_s)
+        self.p99_factor = p99_factor
+        self.min_samples = min_samples
+        self.window_min = window_min
+        self.refresh_s = refresh_s
+        self.enabled = enabled
+        self._sketches = WindowedSketches(horizon_min=window_min, relative_accuracy=0.02)
+        self._timeouts: dict[str, float] = {}
+        self._computed_at = float('-inf')
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint: str, elapsed_s: float) -> None:
+        if self.enabled:
+            self._sketches.record('/' + endpoint.strip('/'), elapsed_s)
+
+    def observe_timeout(self, endpoint: str, timeout_s: float) -> None:
+        self.observe(endpoint, timeout_s)
+
+    def reset(self, endpoint: str) -> None:
+        # breaker abriu: a latência mudou de patamar, a janela antiga não vale; volta para max_s até juntar amostras
+        key = '/' + endpoint.strip('/')
+        self._sketches.discard(key)
+        with self._lock:
+            self._timeouts = {k: v for k, v in self._timeouts.items() if k != key}
+
+    def timeout_for(self, endpoint: str) -> float:
+        if not self.enabled:
+            return self.max_s
+        now = time.monotonic()
+        if now - self._computed_at >= self.refresh_s:
+            # recalcula todos os endpoints de uma vez a cada refresh_s; entre um e outro é só um dict lookup
+            timeouts: dict[str, float] = {}
+            for key, sketch in self._sketches.merged(self.window_min).items():
+                p99 = sketch.quantile(0.99)
+                if sketch.count >= self.min_samples and p99 is not None:
+                    timeouts[key] = round(min(self.max_s, max(self.min_s, p99 * self.p99_factor)), 3)
+            with self._lock:
+                self._timeouts = timeouts
+                self._computed_at = now
+        return self._timeouts.get('/' + endpoint.strip('/'), self.max_s)
+
+
+_registries: weakref.WeakSet[CircuitBreakers] = weakref.WeakSet()
+
+
+def _collect_breaker_states() -> Iterable[tuple[dict[str, str], float]]:
+    # vários clients no mesmo processo: vale o pior estado por endpoint
+    worst: dict[str, int] = {}
+    for registry in list(_registries):
+        for endpoint, state in registry.states().items():
+            worst[endpoint] = max(worst.get(endpoint, 0), STATE_VALUES[state])
+    for endpoint, value in sorted(worst.items()):
+        yield {'endpoint': endpoint}, value
+
+
+IXC_CIRCUIT_STATE = register(
+    GaugeCallback('softhub_ixc_circuit_state', 'Estado do circuit breaker por endpoint IXC (0=closed, 1=half_open, 2=open).', _collect_breaker_states)
+)
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+from app.config import Settings
+from app.utils.cache import get_redis
+from app.utils.metrics import Histogram, register
+
+logger = logging.getLogger(__name__)
+
+# Fila única para as chamadas ao IXC: token bucket global no Redis (todos os processos: API, worker, jobs)
+# + semáforos por processo. Chamadas de background (worker, sync/reconcile/lotes) têm teto próprio de
+# concorrência e só consomem tokens acima da reserva, então não tomam a vez das telas.
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+ixc_priority_ctx: ContextVar[str | None] = ContextVar('ixc_priority', default=None)
+_default_priority = INTERACTIVE
+
+BUCKET_KEY = 'softhub:ixc:bucket'
+REDIS_RETRY_S = 30.0
+
+# KEYS[1] = bucket; ARGV = taxa/s, burst, reserva. Usa o relógio do Redis para todos os processos
+# enxergarem o mesmo bucket. Devolve '0' quando levou o token, senão quantos segundos esperar.
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local reserve = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens - 1 >= reserve then
+  tokens = tokens - 1
+else
+  wait = (reserve + 1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+IXC_SCHEDULER_WAIT = register(
+    Histogram('softhub_ixc_scheduler_wait_seconds', 'Espera na fila do IXC (tokens + concorrência) por prioridade.', ('priority',))
+)
+
+
+class IXCSchedulerTimeout(TimeoutError):
+    pass
+
+
+def set_default_ixc_priority(priority: str) -> None:
+    # processo inteiro (ex.: worker do Celery) roda como background
+    global _default_priority
+    _default_priority = priority
+
+
+def current_ixc_priority() -> str:
+    return ixc_priority_ctx.get() or _default_priority
+
+
+@contextmanager
+def ixc_priority(priority: str) -> Iterator[None]:
+    token = ixc_priority_ctx.set(priority)
+    try:
+        yield
+    finally:
+        ixc_priority_ctx.reset(token)
+
+
+async def background_ixc_priority() -> None:
+    # dependency das rotas que disparam lotes: async para o ContextVar valer na thread do endpoint síncrono
+    ixc_priority_ctx.set(BACKGROUND)
+
+
+class LocalTokenBucket:
+    # mesmo algoritmo do Lua, só no processo: usado enquanto o Redis está fora
+    def __init__(self, rate_per_s: float, burst: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate_per_s = rate_per_s
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._ts = clock()
+        self._lock = threading.Lock()
+
+    def take(self, reserve: float) -> float:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + max(0.0, now - self._ts) * self.rate_per_s)
+            self._ts = now
+            if self._tokens - 1 >= reserve:
+                self._tokens -= 1
+                return 0.0
+            return (reserve + 1 - self._tokens) / self.rate_per_s
+
+
+class IXCScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        background_concurrency: int = 4,
+        rate_per_s: float = 0.0,
+        burst: int = 20,
+        interactive_reserve: float = 0.25,
+        timeout_s: float = 10.0,
+        redis_factory: Callable[[], Any] | None = get_redis,
+    ) -> None:
+        self.timeout_s = timeout_s
+        self.rate_per_s = rate_per_s
+        self.burst = max(1, burst)
+        # background só leva token se sobrar mais que a reserva das telas
+        self.reserves = {INTERACTIVE: 0.0, BACKGROUND: max(0.0, min(1.0, interactive_reserve)) * self.burst}
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+        background_limit = min(background_concurrency, max_concurrency) if max_concurrency > 0 else background_concurrency
+        self._background_slots = threading.BoundedSemaphore(background_limit) if background_limit > 0 else None
+        self._redis_factory = redis_factory
+        self._script = None
+        self._redis_down_until = 0.0
+        self._local = LocalTokenBucket(rate_per_s, self.burst) if rate_per_s > 0 else None
+
+    def _take_token(self, priority: str) -> float:
+        reserve = self.reserves.get(priority, 0.0)
+        if self._redis_factory is not None and time.monotonic() >= self._redis_down_until:
+            try:
+                if self._script is None:
+                    self._script = self._redis_factory().register_script(TOKEN_BUCKET_LUA)
+                return float(self._script(keys=[BUCKET_KEY], args=[self.rate_per_s, self.burst, reserve]))
+            except Exception as exc:
+                self._script = None
+                self._redis_down_until = time.monotonic() + REDIS_RETRY_S
+                logger.warning('IXC token bucket on redis failed, using local bucket for %ss err=%s', REDIS_RETRY_S, exc)
+        return self._local.take(reserve)
+
+    def _wait_token(self, priority: str, deadline: float) -> None:
+        while True:
+            wait = self._take_token(priority)
+            if wait <= 0:
+                return
+            if time.monotonic() + wait > deadline:
+                raise IXCSchedulerTimeout(f'IXC rate limit wait exceeded {self.timeout_s}s ({priority})')
+            time.sleep(wait)
+
+    @staticmethod
+    def _acquire(semaphore: threading.BoundedSemaphore, deadline: float, priority: str) -> None:
+        if not semaphore.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise IXCSchedulerTimeout(f'IXC concurrency wait exceeded ({priority})')
+
+    @contextmanager
+    def slot(self) -> Iterator[str]:
+        priority = current_ixc_priority()
+        started = time.monotonic()
+        deadline = started + self.timeout_s
+        held: list[threading.BoundedSemaphore] = []
+        try:
+            if priority == BACKGROUND and self._background_slots is not None:
+                self._acquire(self._background_slots, deadline, priority)
+                held.append(self._background_slots)
+            # token antes da vaga global: quem espera taxa não segura vaga de ninguém
+            if self._local is not None:
+                self._wait_token(priority, deadline)
+            if self._slots is not None:
+                self._acquire(self._slots, deadline, priority)
+                held.append(self._slots)
+            IXC_SCHEDULER_WAIT.observe(time.monotonic() - started, priority=priority)
+            yield priority
+        finally:
+            for semaphore in reversed(held):
+                semaphore.release()
+
+
+def build_ixc_scheduler(config: Settings) -> IXCScheduler:
+    return IXCScheduler(
+        max_concurrency=config.ixc_max_concurrency,
+        background_concurrency=config.ixc_background_concurrency,
+        rate_per_s=config.ixc_rate_limit_per_s,
+        burst=config.ixc_rate_burst,
+        interactive_reserve=config.ixc_rate_interactive_reserve,
+        timeout_s=config.ixc_scheduler_timeout_s,
+    )
@@ -4,16 +4,33 @@ from datetime import date, datetime, timedelta
 from decimal import Decimal
 from uuid import uuid4
 
-from sqlalchemy import JSON, Boolean, Date, DateTime, ForeignKey, Integer, Numeric, String, Text, create_engine
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
+from functools import lru_cache
+from typing import Any, Iterable
 
-from app.config import get_settings
+from sqlalchemy import JSON, Boolean, Date, DateTime, ForeignKey, Index, Integer, Numeric, String, Text, create_engine, event, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, sessionmaker
+
+from app.config import Settings, get_settings
+from app.utils.metrics import DB_SESSIONS, GaugeCallback, register
 
 
 class Base(DeclarativeBase):
     pass
 
 
+# JSONB no Postgres (filtros por chave com índice GIN), JSON genérico no SQLite
+JSONDocument = JSON().with_variant(JSONB(), 'postgresql')
+
+
+def json_key_equals(column: Any, key: str, value: str, dialect_name: str) -> Any:
+    if dialect_name == 'postgresql':
+        # `@>` é o operador que o índice GIN jsonb_path_ops atende
+        return type_coerce(column, JSONB).contains({key: value})
+    return column[key].as_string() == value
+
+
 class BillingAction(Base):
     __tablename__ = 'billing_actions'
 
@@ -55,15 +72,29 @@ class BillingCase(Base):
     last_seen_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
     action_state: Mapped[str] = mapped_column(String(64), nullable=False, default='NONE')
     last_action_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
-    snapshot_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    snapshot_json: Mapped[dict | None] = mapped_column(JSONDocument, nullable=True)
 
-    contract_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
-    client_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    contract_json: Mapped[dict | None] = mapped_column(JSONDocument, nullable=True)
+    client_json: Mapped[dict | None] = mapped_column(JSONDocument, nullable=True)
     contract_missing: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
 
     ticket_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
     ticket_status: Mapped[str | None] = mapped_column(String(32), nullable=True)
 
+    __table_args__ = (
+        Index('ix_billing_case_contract_json', 'contract_json', postgresql_using='gin', postgresql_ops={'contract_json': 'jsonb_path_ops'}).ddl_if(dialect='postgresql'),
+        Index('ix_billing_case_client_json', 'client_json', postgresql_using='gin', postgresql_ops={'client_json': 'jsonb_path_ops'}).ddl_if(dialect='postgresql'),
+    )
+
+
+class SchemaMigration(Base):
+    # revisões de app/migrations já aplicadas (python -m app.migrate)
+    __tablename__ = 'schema_migrations'
+
+    revision: Mapped[str] = mapped_column(String(32), primary_key=True)
+    description: Mapped[str] = mapped_column(String(255), nullable=False)
+    applied_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
 
 class BillingActionLog(Base):
     __tablename__ = 'billing_action_log'
@@ -76,14 +107,88 @@ class BillingActionLog(Base):
     success: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
 
+    __table_args__ = (
+        Index('ix_billing_action_log_case_created', 'case_id', 'created_at'),
+        # varredura da retenção (app/services/action_log_retention.py)
+        Index('ix_billing_action_log_created_at', 'created_at'),
+    )
+
+
+def engine_kwargs(config: Settings) -> dict[str, Any]:
+    # SQLite (testes/dev) fica com o pool padrão do dialeto; os parâmetros de fila valem para o Postgres
+    if config.database_url.startswith('sqlite'):
+        return {}
+    return {
+        'pool_size': config.db_pool_size,
+        'max_overflow': config.db_max_overflow,
+        'pool_timeout': config.db_pool_timeout_s,
+        'pool_recycle': config.db_pool_recycle_s,
+        'pool_pre_ping': config.db_pool_pre_ping,
+    }
+
 
 settings = get_settings()
-engine = create_engine(settings.database_url, future=True)
+engine = create_engine(settings.database_url, future=True, **engine_kwargs(settings))
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 
+def async_db_enabled() -> bool:
+    # rotas async só usam o AsyncSession com DB_ASYNC_ENABLED e driver async (postgresql+psycopg)
+    return settings.db_async_enabled and not settings.database_url.startswith('sqlite')
+
+
+@lru_cache
+def get_async_engine():
+    # criado sob demanda: sem DB_ASYNC_ENABLED nenhum pool async é aberto
+    return create_async_engine(settings.database_url, **engine_kwargs(settings))
+
+
+class _AsyncBackedSession(Session):
+    pass
+
+
+@lru_cache
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(bind=get_async_engine(), sync_session_class=_AsyncBackedSession, autoflush=False, expire_on_commit=False)
+
+
+async def dispose_async_engine() -> None:
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+
+
+def _pool_samples(name: str, pool: Any) -> Iterable[tuple[dict[str, str], float]]:
+    # só pools com fila (QueuePool e afins) expõem tamanho/ocupação
+    if not hasattr(pool, 'checkedout'):
+        return
+    yield {'engine': name, 'state': 'size'}, pool.size()
+    yield {'engine': name, 'state': 'checked_out'}, pool.checkedout()
+    yield {'engine': name, 'state': 'idle'}, pool.checkedin()
+    yield {'engine': name, 'state': 'overflow'}, max(0, pool.overflow())
+
+
+def _collect_pool_gauges() -> Iterable[tuple[dict[str, str], float]]:
+    yield from _pool_samples('sync', engine.pool)
+    if get_async_engine.cache_info().currsize:
+        yield from _pool_samples('async', get_async_engine().sync_engine.pool)
+
+
+DB_POOL_CONNECTIONS = register(
+    GaugeCallback('softhub_db_pool_connections', 'Conexões do pool SQLAlchemy por estado.', _collect_pool_gauges)
+)
+
+
+@event.listens_for(SessionLocal, 'after_begin')
+@event.listens_for(_AsyncBackedSession, 'after_begin')
+def _count_session_begin(session, transaction, connection) -> None:
+    DB_SESSIONS.inc()
+
+
 def init_db() -> None:
-    Base.metadata.create_all(bind=engine)
+    # fora do boot da API: `python -m app.migrate`, testes, benchmarks e loadtest
+    from app.migrate import upgrade
+
+    upgrade(engine)
     _seed_billing_cases_for_dev()
 
 
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass
+import json
+import os
+from random import Random
+import threading
+import time
+from typing import Any
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.devtools.synthetic import GridParamError, SyntheticDataset
+
+# Servidor IXC falso para benchmark/carga: exercita o caminho HTTP real do IXCClient
+# (grid_param, paginação, retries, decode JSON) sem depender do ambiente IXC.
+
+WEBSERVICE_PREFIX = '/webservice/v1/'
+
+
+@dataclass
+class FakeIXCConfig:
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    support_in: bool = True
+    max_rp: int = 5000
+    seed: int = 42
+
+    @classmethod
+    def from_env(cls) -> FakeIXCConfig:
+        return cls(
+            latency_ms=float(os.getenv('FAKE_IXC_LATENCY_MS', '0')),
+            latency_jitter_ms=float(os.getenv('FAKE_IXC_LATENCY_JITTER_MS', '0')),
+            error_rate=float(os.getenv('FAKE_IXC_ERROR_RATE', '0')),
+            throttle_rate=float(os.getenv('FAKE_IXC_THROTTLE_RATE', '0')),
+            support_in=os.getenv('FAKE_IXC_SUPPORT_IN', '1') not in {'0', 'false', 'False'},
+            seed=int(os.getenv('FAKE_IXC_SEED', '42')),
+        )
+
+
+class FakeIXCBackend:
+    def __init__(
+        self,
+        dataset: SyntheticDataset | None = None,
+        config: FakeIXCConfig | None = None,
+        size: int = 1000,
+    ) -> None:
+        self.config = config or FakeIXCConfig()
+        self.dataset = dataset if dataset is not None else SyntheticDataset(size=size, seed=self.config.seed)
+        self.calls = 0
+        self._rng = Random(self.config.seed)
+        self._lock = threading.Lock()
+
+    def delay_s(self) -> float:
+        cfg = self.config
+        if cfg.latency_ms <= 0 and cfg.latency_jitter_ms <= 0:
+            return 0.0
+        with self._lock:
+            jitter = self._rng.uniform(0, cfg.latency_jitter_ms) if cfg.latency_jitter_ms > 0 else 0.0
+        return (cfg.latency_ms + jitter) / 1000
+
+    def _injected_failure(self) -> tuple[int, dict[str, Any]] | None:
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.config.throttle_rate:
+            return 429, {'type': 'error', 'message': 'Too Many Requests'}
+        if roll < self.config.throttle_rate + self.config.error_rate:
+            return 500, {'type': 'error', 'message': 'Internal Server Error'}
+        return None
+
+    def handle(self, endpoint: str, action: str, body: bytes) -> tuple[int, dict[str, Any]]:
+        with self._lock:
+            self.calls += 1
+        table = endpoint.strip('/')
+        if table not in self.dataset:
+            return 404, {'type': 'error', 'message': f'Endpoint {table} não encontrado'}
+        failure = self._injected_failure()
+        if failure is not None:
+            return failure
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            return 400, {'type': 'error', 'message': 'JSON inválido'}
+
+        if action and action != 'listar':
+            return 200, self._write(table, action, payload)
+
+        try:
+            page = max(1, int(payload.get('page') or 1))
+            total, rows = self.dataset.table(table).query(
+                json.loads(payload.get('grid_param') or '[]'),
+                sortname=str(payload.get('sortname') or 'id'),
+                sortorder=str(payload.get('sortorder') or 'asc'),
+                page=page,
+                rp=min(max(1, int(payload.get('rp') or 20)), self.config.max_rp),
+                support_in=self.config.support_in,
+            )
+        except (GridParamError, ValueError, TypeError) as exc:
+            # o IXC responde 200 com type=error para filtros inválidos
+            return 200, {'type': 'error', 'message': str(exc)}
+        return 200, {'page': str(page), 'total': str(total), 'registros': rows}
+
+    def _write(self, table: str, action: str, payload: dict[str, Any]) -> dict[str, Any]:
+        target = self.dataset.table(table)
+        if action == 'inserir' and hasattr(target, 'insert'):
+            new_id = target.insert({k: v for k, v in payload.items() if k != 'grid_param'})
+            return {'type': 'success', 'message': 'Registro inserido com sucesso!', 'id': new_id}
+        return {'type': 'success', 'message': 'Registro atualizado com sucesso!'}
+
+
+def _split_endpoint(path: str) -> str | None:
+    if not path.startswith(WEBSERVICE_PREFIX):
+        return None
+    return path[len(WEBSERVICE_PREFIX) :]
+
+
+class FakeIXCTransport(httpx.BaseTransport):
+    # uso em processo: IXCClient(..., transport=FakeIXCTransport(backend))
+    def __init__(self, backend: FakeIXCBackend) -> None:
+        self.backend = backend
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = _split_endpoint(request.url.path)
+        if endpoint is None:
+            return httpx.Response(404, json={'type': 'error', 'message': 'Not Found'})
+        delay = self.backend.delay_s()
+        if delay:
+            time.sleep(delay)
+        status, payload = self.backend.handle(endpoint, request.headers.get('ixcsoft', 'listar'), request.read())
+        return httpx.Response(status, json=payload)
+
+
+def create_app(backend: FakeIXCBackend | None = None) -> Starlette:
+    backend = backend or FakeIXCBackend(
+        config=FakeIXCConfig.from_env(),
+        size=int(os.getenv('FAKE_IXC_SIZE', '1000')),
+    )
+
+    async def webservice(request: Request) -> JSONResponse:
+        if not request.headers.get('authorization', '').startswith('Basic '):
+            return JSONResponse({'type': 'error', 'message': 'Não autorizado'}, status_code=401)
+        delay = backend.delay_s()
+        if delay:
+            await asyncio.sleep(delay)
+        status, payload = backend.handle(
+            request.path_params['endpoint'],
+            request.headers.get('ixcsoft', 'listar'),
+            await request.body(),
+        )
+        return JSONResponse(payload, status_code=status)
+
+    app = Starlette(routes=[Route(WEBSERVICE_PREFIX + '{endpoint}', webservice, methods=['POST'])])
+    app.state.backend = backend
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Servidor IXC falso para testes de carga.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run('app.devtools.fake_ixc:create_app', factory=True, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import asdict, dataclass, field
+import json
+import os
+from random import Random
+import sys
+from time import perf_counter
+from typing import Any, Iterable
+
+import httpx
+
+from app.devtools.fake_ixc import FakeIXCBackend, FakeIXCConfig, FakeIXCTransport
+from app.devtools.synthetic import SyntheticDataset
+
+# Gerador de carga em processo: a API real (ASGI) atendendo um mix de dashboard/billing,
+# com o RealIXCAdapter falando com o IXC falso. O relatório JSON é estável para diff entre commits.
+
+DEFAULT_DATABASE_URL = 'sqlite:///./loadtest_softhub.db'
+DEFAULT_CONCURRENCY = (1, 4, 16)
+REPORT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    path: str
+    weight: int
+    variants: tuple[dict[str, str], ...] = ({},)
+
+
+DEFAULT_MIX: tuple[Scenario, ...] = (
+    Scenario(
+        'dashboard.summary',
+        '/dashboard/summary',
+        25,
+        ({'period': 'today'}, {'period': '7d'}, {'period': '30d'}, {'period': '7d', 'filial_id': '1'}, {'period': '7d', 'filial_id': '2'}),
+    ),
+    Scenario(
+        'dashboard.agenda_week',
+        '/dashboard/agenda-week',
+        20,
+        ({}, {'filter_json': '{"category": "instalacao"}'}, {'filial_id': '1'}),
+    ),
+    Scenario(
+        'dashboard.maintenances',
+        '/dashboard/maintenances',
+        15,
+        ({'tab': 'open'}, {'tab': 'scheduled'}, {'tab': 'done'}),
+    ),
+    Scenario('billing.open', '/billing/open', 15),
+    Scenario('billing.cases', '/billing/cases', 10, ({}, {'group_by': 'client'}, {'only_20p': 'false', 'limit': '200'})),
+    Scenario('billing.cases_db', '/billing/cases/db', 10, ({}, {'only_over_20_days': 'true'}, {'filial_id': '1', 'limit': '200'})),
+    Scenario('billing.cases_summary', '/billing/cases/summary', 5),
+)
+
+
+@dataclass
+class Sample:
+    scenario: str
+    status: int
+    elapsed_ms: float
+    ixc_calls: int
+    cache: str | None
+
+
+@dataclass
+class LoadTestConfig:
+    size: int = 10000
+    seed: int = 42
+    requests: int = 200
+    concurrency: tuple[int, ...] = DEFAULT_CONCURRENCY
+    threads: int = 40
+    sync_billing: bool = True
+    flush_cache: bool = False
+    ixc: FakeIXCConfig = field(default_factory=FakeIXCConfig)
+
+
+def build_schedule(mix: Iterable[Scenario], total: int, seed: int) -> list[tuple[str, str, dict[str, str]]]:
+    # sequência fixa por seed: o mesmo commit sempre recebe as mesmas requisições na mesma ordem
+    scenarios = list(mix)
+    rng = Random(seed)
+    weights = [s.weight for s in scenarios]
+    schedule = []
+    for scenario in rng.choices(scenarios, weights=weights, k=total):
+        schedule.append((scenario.name, scenario.path, dict(rng.choice(scenario.variants))))
+    return schedule
+
+
+def percentile(sorted_values: list[float], q: float) -> float | None:
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _latency_stats(values: list[float]) -> dict[str, Any]:
+    ordered = sorted(values)
+    stats: dict[str, Any] = {'mean': round(sum(ordered) / len(ordered), 1) if ordered else None}
+    for label, q in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+        value = percentile(ordered, q)
+        stats[label] = round(value, 1) if value is not None else None
+    stats['max'] = round(ordered[-1], 1) if ordered else None
+    return stats
+
+
+def summarize(samples: list[Sample]) -> dict[str, Any]:
+    cache_samples = [s.cache for s in samples if s.cache]
+    hits = sum(1 for c in cache_samples if c == 'HIT')
+    ixc_calls = sorted(s.ixc_calls for s in samples)
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for s in samples if s.status >= 400),
+        'latency_ms': _latency_stats([s.elapsed_ms for s in samples]),
+        'ixc_calls_per_request': {
+            'mean': round(sum(ixc_calls) / len(ixc_calls), 2) if ixc_calls else None,
+            'p90': percentile(ixc_calls, 0.9),
+            'max': ixc_calls[-1] if ixc_calls else None,
+        },
+        'cache': {
+            'hit': hits,
+            'miss': len(cache_samples) - hits,
+            'hit_rate': round(hits / len(cache_samples), 3) if cache_samples else None,
+        },
+    }
+
+
+def summarize_level(concurrency: int, samples: list[Sample], wall_s: float, backend_calls: int) -> dict[str, Any]:
+    by_scenario: dict[str, list[Sample]] = {}
+    for sample in samples:
+        by_scenario.setdefault(sample.scenario, []).append(sample)
+    level = {'concurrency': concurrency, **summarize(samples)}
+    level['throughput_rps'] = round(len(samples) / wall_s, 1) if wall_s > 0 else None
+    level['wall_s'] = round(wall_s, 2)
+    level['ixc_backend_calls'] = backend_calls
+    level['by_scenario'] = {name: summarize(items) for name, items in sorted(by_scenario.items())}
+    return level
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    queue: asyncio.Queue[tuple[str, str, dict[str, str]]],
+    samples: list[Sample],
+) -> None:
+    while True:
+        try:
+            name, path, params = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        started = perf_counter()
+        try:
+            response = await client.get(path, params=params)
+            status = response.status_code
+            ixc_calls = int(response.headers.get('x-ixc-calls', '0'))
+            cache = response.headers.get('x-cache')
+        except Exception:
+            status, ixc_calls, cache = 599, 0, None
+        samples.append(Sample(name, status, (perf_counter() - started) * 1000, ixc_calls, cache))
+
+
+async def run_level(
+    app: Any,
+    schedule: list[tuple[str, str, dict[str, str]]],
+    concurrency: int,
+    backend: FakeIXCBackend,
+) -> dict[str, Any]:
+    queue: asyncio.Queue[tuple[str, str, dict[str, str]]] = asyncio.Queue()
+    for item in schedule:
+        queue.put_nowait(item)
+    samples: list[Sample] = []
+    calls_before = backend.calls
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://loadtest', timeout=None) as client:
+        started = perf_counter()
+        await asyncio.gather(*(_worker(client, queue, samples) for _ in range(concurrency)))
+        wall_s = perf_counter() - started
+    return summarize_level(concurrency, samples, wall_s, backend.calls - calls_before)
+
+
+def _flush_cache() -> int:
+    from app.utils.cache import get_redis
+
+    try:
+        client = get_redis()
+        keys = [*client.scan_iter('softhub:dash:*'), *client.scan_iter('softhub:billing:*')]
+        if keys:
+            client.delete(*keys)
+        return len(keys)
+    except Exception as exc:
+        print(f'cache flush skipped: {exc}', file=sys.stderr)
+        return 0
+
+
+def prepare_app(config: LoadTestConfig) -> tuple[Any, FakeIXCBackend]:
+    # imports tardios: o ambiente (DATABASE_URL etc.) precisa estar definido antes de carregar app.config
+    from app.adapters.ixc_adapter import RealIXCAdapter
+    from app.clients.ixc_client import IXCClient
+    from app.db import init_db
+    from app.main import app
+    from app.services.adapters import get_ixc_adapter
+    from app.services.billing_sync import sync_billing_cases
+
+    dataset = SyntheticDataset(size=config.size, seed=config.seed)
+    backend = FakeIXCBackend(dataset, config.ixc)
+    client = IXCClient(
+        host='fake-ixc',
+        user='loadtest',
+        token='loadtest',
+        scheme='http',
+        transport=FakeIXCTransport(backend),
+        backoff_base=0.05,
+    )
+    app.dependency_overrides[get_ixc_adapter] = lambda: RealIXCAdapter(client)
+    init_db()
+    if config.sync_billing:
+        # popula billing_cases para as rotas que leem do banco (/billing/cases/db, /billing/cases/summary)
+        sync_billing_cases(RealIXCAdapter(client), limit_pages=20)
+    if config.flush_cache:
+        _flush_cache()
+    backend.calls = 0
+    return app, backend
+
+
+async def run_loadtest(config: LoadTestConfig, mix: Iterable[Scenario] = DEFAULT_MIX) -> dict[str, Any]:
+    import anyio.to_thread
+
+    # rotas síncronas rodam no threadpool do anyio; o limite equivale a threads por worker uvicorn
+    anyio.to_thread.current_default_thread_limiter().total_tokens = config.threads
+    app, backend = prepare_app(config)
+    mix = tuple(mix)
+    levels = []
+    for concurrency in config.concurrency:
+        schedule = build_schedule(mix, config.requests, config.seed)
+        levels.append(await run_level(app, schedule, concurrency, backend))
+    return {
+        'version': REPORT_VERSION,
+        'config': {
+            'size': config.size,
+            'seed': config.seed,
+            'requests_per_level': config.requests,
+            'threads': config.threads,
+            'fake_ixc': asdict(config.ixc),
+            'mix': {s.name: s.weight for s in mix},
+        },
+        'levels': levels,
+    }
+
+
+def compare_reports(old: dict[str, Any], new: dict[str, Any]) -> list[str]:
+    old_levels = {level['concurrency']: level for level in old.get('levels', [])}
+    lines = []
+    for level in new.get('levels', []):
+        before = old_levels.get(level['concurrency'])
+        if before is None:
+            continue
+        parts = [f"c={level['concurrency']}"]
+        for label, old_value, new_value in (
+            ('rps', before['throughput_rps'], level['throughput_rps']),
+            ('p50', before['latency_ms']['p50'], level['latency_ms']['p50']),
+            ('p90', before['latency_ms']['p90'], level['latency_ms']['p90']),
+            ('p99', before['latency_ms']['p99'], level['latency_ms']['p99']),
+            ('ixc/req', before['ixc_calls_per_request']['mean'], level['ixc_calls_per_request']['mean']),
+        ):
+            if old_value:
+                parts.append(f'{label} {old_value} -> {new_value} ({(new_value - old_value) / old_value:+.1%})')
+            else:
+                parts.append(f'{label} {old_value} -> {new_value}')
+        lines.append('  '.join(parts))
+    return lines
+
+
+def _parse_concurrency(raw: str) -> tuple[int, ...]:
+    return tuple(int(part) for part in raw.split(',') if part.strip())
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Teste de carga da API contra o IXC falso em processo.')
+    parser.add_argument('--size', type=int, default=10000, help='número de OS do dataset sintético')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=200, help='requisições por nível de concorrência')
+    parser.add_argument('--concurrency', default=','.join(map(str, DEFAULT_CONCURRENCY)))
+    parser.add_argument('--threads', type=int, default=40, help='limite do threadpool (rotas síncronas)')
+    parser.add_argument('--ixc-latency-ms', type=float, default=50.0)
+    parser.add_argument('--ixc-jitter-ms', type=float, default=20.0)
+    parser.add_argument('--ixc-error-rate', type=float, default=0.0)
+    parser.add_argument('--ixc-throttle-rate', type=float, default=0.0)
+    parser.add_argument('--no-sync', action='store_true', help='não popular billing_cases antes da carga')
+    parser.add_argument('--flush-cache', action='store_true', help='apaga softhub:dash:* e softhub:billing:* no Redis antes')
+    parser.add_argument('--output', help='grava o relatório JSON neste arquivo (padrão: stdout)')
+    parser.add_argument('--compare', help='relatório anterior para comparar')
+    args = parser.parse_args(argv)
+
+    # banco próprio da carga: nunca o DATABASE_URL do ambiente (no container da API é o Postgres de produção)
+    os.environ['DATABASE_URL'] = os.getenv('LOADTEST_DATABASE_URL', DEFAULT_DATABASE_URL)
+    os.environ['IXC_MODE'] = 'real'
+    os.environ.setdefault('IXC_CALL_BUDGET', '0')
+    from app.config import get_settings
+
+    get_settings.cache_clear()
+
+    config = LoadTestConfig(
+        size=args.size,
+        seed=args.seed,
+        requests=args.requests,
+        concurrency=_parse_concurrency(args.concurrency),
+        threads=args.threads,
+        sync_billing=not args.no_sync,
+        flush_cache=args.flush_cache,
+        ixc=FakeIXCConfig(
+            latency_ms=args.ixc_latency_ms,
+            latency_jitter_ms=args.ixc_jitter_ms,
+            error_rate=args.ixc_error_rate,
+            throttle_rate=args.ixc_throttle_rate,
+            seed=args.seed,
+        ),
+    )
+    report = asyncio.run(run_loadtest(config))
+    rendered = json.dumps(report, indent=2, sort_keys=True) + '\n'
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            fh.write(rendered)
+    else:
+        sys.stdout.write(rendered)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as fh:
+            previous = json.load(fh)
+        for line in compare_reports(previous, report):
+            print(line, file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
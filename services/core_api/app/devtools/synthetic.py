@@ -0,0 +1,500 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from itertools import compress
+import operator
+import re
+import threading
+from random import Random
+from typing import Any, Callable, Protocol
+
+# Dataset sintético determinístico (seed) em armazenamento colunar compacto:
+# strings repetidas são codificadas por dicionário (1-2 bytes por linha) e ids ficam em array de inteiros.
+
+OS_STATUS_WEIGHTS = {'F': 45, 'AG': 15, 'A': 12, 'EN': 8, 'AN': 5, 'DS': 5, 'EX': 4, 'AS': 3, 'RAG': 3}
+OS_ASSUNTO_WEIGHTS = {'1': 25, '17': 25, '34': 15, '31': 15, '15': 10, '99': 10}
+FILIAL_WEIGHTS = {'1': 60, '2': 40}
+CIDADE_WEIGHTS = {'Vitória': 30, 'Vila Velha': 30, 'Serra': 25, 'Cariacica': 15}
+BAIRROS = ['Centro', 'Praia', 'Jardim', 'Industrial', 'Itapuã', 'Laranjeiras', 'Jacaraípe', 'Campo Grande']
+PLANOS = {'Fibra 300Mb': 89.9, 'Fibra 600Mb': 119.9, 'Fibra 1Gb': 149.9, 'Fibra 100Mb Empresarial': 199.9}
+CONTRATO_STATUS_WEIGHTS = {'A': 88, 'I': 7, 'D': 5}
+STATUS_INTERNET_WEIGHTS = {'A': 80, 'CM': 6, 'CA': 6, 'FA': 5, 'AA': 3}
+MENSAGENS_OS = ['ONU', 'Sem conexão', 'Suporte', 'Mudança', 'Lentidão', 'Troca de equipamento']
+MENSAGENS_EVENTO = {'10': 'OS criada', '20': 'Técnico a caminho', '30': 'Em execução', '40': 'Reagendada', '99': 'OS finalizada'}
+
+# proporções em relação ao número de OS
+CLIENTES_PER_OS = 0.5
+CONTRATOS_PER_CLIENTE = 1.1
+TITULOS_PER_OS = 2.0
+OS_WINDOW_DAYS = 60
+
+
+class GridParamError(ValueError):
+    pass
+
+
+def as_number(value: str) -> float | None:
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def compare(left: str, right: str) -> int:
+    # o IXC compara colunas numéricas como número e o resto como texto
+    ln, rn = as_number(left), as_number(right)
+    if ln is not None and rn is not None:
+        return (ln > rn) - (ln < rn)
+    return (left > right) - (left < right)
+
+
+def like_regex(pattern: str) -> re.Pattern[str]:
+    parts = ('.*' if ch == '%' else '.' if ch == '_' else re.escape(ch) for ch in pattern)
+    return re.compile(''.join(parts), re.IGNORECASE | re.DOTALL)
+
+
+def value_predicate(op: str, param: str, support_in: bool = True) -> Callable[[str], bool]:
+    if op == '=':
+        return lambda v: compare(v, param) == 0
+    if op == '!=':
+        return lambda v: compare(v, param) != 0
+    if op == '>':
+        return lambda v: compare(v, param) > 0
+    if op == '<':
+        return lambda v: compare(v, param) < 0
+    if op == '>=':
+        return lambda v: compare(v, param) >= 0
+    if op == '<=':
+        return lambda v: compare(v, param) <= 0
+    if op == 'LIKE':
+        rx = like_regex(param)
+        return lambda v: rx.fullmatch(v) is not None
+    if op == 'IN':
+        if not support_in:
+            raise GridParamError('Operador IN não suportado')
+        wanted = {x.strip() for x in param.split(',') if x.strip()}
+        return lambda v: v in wanted
+    raise GridParamError(f'Operador inválido: {op}')
+
+
+def _parse_grid(table: str, grid: list[dict[str, Any]]) -> list[tuple[str, str, str]]:
+    parsed = []
+    for item in grid:
+        tb, op, param = str(item.get('TB') or ''), str(item.get('OP') or '=').upper(), str(item.get('P') or '')
+        prefix, _, column = tb.rpartition('.')
+        if prefix and prefix != table:
+            raise GridParamError(f'Campo {tb} não pertence a {table}')
+        parsed.append((column, op, param))
+    return parsed
+
+
+def _sort_key(raw: str) -> tuple[int, float, str]:
+    number = as_number(raw)
+    return (0, number, '') if number is not None else (1, 0.0, raw)
+
+
+class Column(Protocol):
+    def get(self, i: int) -> str: ...
+
+    def mask(self, op: str, param: str, support_in: bool) -> bytearray: ...
+
+
+class DictColumn:
+    def __init__(self, values: list[str], codes: array) -> None:
+        self.values = values
+        # até 256 valores distintos os códigos cabem em bytes e o filtro vira um bytes.translate em C
+        self.codes: bytes | array = array('B', codes).tobytes() if len(values) <= 256 else codes
+
+    def get(self, i: int) -> str:
+        return self.values[self.codes[i]]
+
+    def mask(self, op: str, param: str, support_in: bool) -> bytearray:
+        pred = value_predicate(op, param, support_in)
+        lut = [1 if pred(v) else 0 for v in self.values]
+        if isinstance(self.codes, bytes):
+            return bytearray(self.codes.translate(bytes(lut + [0] * (256 - len(lut)))))
+        return bytearray(lut[c] for c in self.codes)
+
+
+_NUMERIC_OPS = {'=': operator.eq, '!=': operator.ne, '>': operator.gt, '<': operator.lt, '>=': operator.ge, '<=': operator.le}
+
+
+class IntColumn:
+    def __init__(self, values: array, is_sorted: bool = False) -> None:
+        self.values = values
+        self.is_sorted = is_sorted
+
+    def get(self, i: int) -> str:
+        return str(self.values[i])
+
+    def _range_mask(self, lo: int, hi: int) -> bytearray:
+        out = bytearray(len(self.values))
+        if hi > lo:
+            out[lo:hi] = b'\x01' * (hi - lo)
+        return out
+
+    def mask(self, op: str, param: str, support_in: bool) -> bytearray:
+        number = as_number(param)
+        if self.is_sorted and number is not None and op in {'=', '>', '<', '>=', '<='}:
+            vals, n = self.values, len(self.values)
+            if op == '=':
+                return self._range_mask(bisect_left(vals, number), bisect_right(vals, number))
+            if op == '>':
+                return self._range_mask(bisect_right(vals, number), n)
+            if op == '>=':
+                return self._range_mask(bisect_left(vals, number), n)
+            if op == '<':
+                return self._range_mask(0, bisect_left(vals, number))
+            return self._range_mask(0, bisect_right(vals, number))
+        if self.is_sorted and op == 'IN':
+            if not support_in:
+                raise GridParamError('Operador IN não suportado')
+            out = bytearray(len(self.values))
+            for raw in {x.strip() for x in param.split(',') if x.strip()}:
+                if raw.lstrip('-').isdigit():
+                    lo, hi = bisect_left(self.values, int(raw)), bisect_right(self.values, int(raw))
+                    out[lo:hi] = b'\x01' * (hi - lo)
+            return out
+        if number is not None and op in _NUMERIC_OPS:
+            cmp, target = _NUMERIC_OPS[op], number
+            return bytearray(1 if cmp(v, target) else 0 for v in self.values)
+        pred = value_predicate(op, param, support_in)
+        return bytearray(1 if pred(str(v)) else 0 for v in self.values)
+
+
+class DerivedColumn:
+    def __init__(self, source: IntColumn, fn: Callable[[int], str]) -> None:
+        self.source = source
+        self.fn = fn
+
+    def get(self, i: int) -> str:
+        return self.fn(self.source.values[i])
+
+    def mask(self, op: str, param: str, support_in: bool) -> bytearray:
+        pred = value_predicate(op, param, support_in)
+        fn = self.fn
+        return bytearray(1 if pred(fn(v)) else 0 for v in self.source.values)
+
+
+def _and_masks(masks: list[bytearray], n: int) -> bytes:
+    acc = int.from_bytes(masks[0], 'big')
+    for other in masks[1:]:
+        acc &= int.from_bytes(other, 'big')
+    return acc.to_bytes(n, 'big')
+
+
+class ColumnTable:
+    def __init__(self, name: str, columns: dict[str, Column], length: int) -> None:
+        self.name = name
+        self.columns = columns
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def row(self, i: int) -> dict[str, str]:
+        return {name: col.get(i) for name, col in self.columns.items()}
+
+    def matching(self, grid: list[dict[str, Any]], support_in: bool = True) -> list[int]:
+        masks = []
+        for column, op, param in _parse_grid(self.name, grid):
+            col = self.columns.get(column)
+            if col is None:
+                raise GridParamError(f'Campo {self.name}.{column} não existe')
+            masks.append(col.mask(op, param, support_in))
+        if not masks:
+            return list(range(self.length))
+        return list(compress(range(self.length), _and_masks(masks, self.length)))
+
+    def query(
+        self,
+        grid: list[dict[str, Any]],
+        sortname: str = 'id',
+        sortorder: str = 'asc',
+        page: int = 1,
+        rp: int | None = None,
+        support_in: bool = True,
+    ) -> tuple[int, list[dict[str, str]]]:
+        idx = self.matching(grid, support_in)
+        column = sortname.rpartition('.')[2] or 'id'
+        col = self.columns.get(column)
+        desc = sortorder.lower() == 'desc'
+        if col is not None and not (isinstance(col, IntColumn) and col.is_sorted):
+            if isinstance(col, IntColumn):
+                values = col.values
+                idx.sort(key=values.__getitem__, reverse=desc)
+            else:
+                idx.sort(key=lambda i: _sort_key(col.get(i)), reverse=desc)
+        elif desc:
+            idx.reverse()
+        total = len(idx)
+        if rp is not None:
+            idx = idx[(page - 1) * rp : page * rp]
+        return total, [self.row(i) for i in idx]
+
+
+class RowTable:
+    # tabela pequena e gravável (ex.: su_ticket), linhas como dict
+    def __init__(self, name: str, rows: list[dict[str, Any]] | None = None) -> None:
+        self.name = name
+        self.rows = rows if rows is not None else []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def insert(self, values: dict[str, Any]) -> str:
+        with self._lock:
+            new_id = str(len(self.rows) + 1)
+            self.rows.append({'id': new_id, **values})
+        return new_id
+
+    def query(
+        self,
+        grid: list[dict[str, Any]],
+        sortname: str = 'id',
+        sortorder: str = 'asc',
+        page: int = 1,
+        rp: int | None = None,
+        support_in: bool = True,
+    ) -> tuple[int, list[dict[str, Any]]]:
+        checks = [
+            (column, value_predicate(op, param, support_in))
+            for column, op, param in _parse_grid(self.name, grid)
+        ]
+        rows = [
+            row for row in self.rows
+            if all(pred('' if row.get(column) is None else str(row.get(column))) for column, pred in checks)
+        ]
+        column = sortname.rpartition('.')[2] or 'id'
+        rows.sort(key=lambda r: _sort_key('' if r.get(column) is None else str(r.get(column))), reverse=sortorder.lower() == 'desc')
+        total = len(rows)
+        if rp is not None:
+            rows = rows[(page - 1) * rp : page * rp]
+        return total, rows
+
+
+def _weighted_codes(rng: Random, weights: dict[str, int], n: int) -> DictColumn:
+    values = list(weights)
+    return DictColumn(values, array('H', rng.choices(range(len(values)), weights=list(weights.values()), k=n)))
+
+
+def _constant(value: str, n: int) -> DictColumn:
+    return DictColumn([value], array('H', bytes(2 * n)))
+
+
+class _Encoder:
+    def __init__(self) -> None:
+        self.values: list[str] = []
+        self.index: dict[str, int] = {}
+        self.codes = array('H')
+
+    def add(self, value: str) -> None:
+        code = self.index.get(value)
+        if code is None:
+            code = len(self.values)
+            self.index[value] = code
+            self.values.append(value)
+        self.codes.append(code)
+
+    def column(self) -> DictColumn:
+        return DictColumn(self.values, self.codes)
+
+
+class SyntheticDataset:
+    TABLES = ('su_oss_chamado', 'cliente', 'cliente_contrato', 'fn_areceber', 'su_oss_chamado_mensagem', 'su_ticket')
+
+    def __init__(self, size: int = 1000, seed: int = 42, today: date | None = None, window_days: int = OS_WINDOW_DAYS) -> None:
+        self.size = max(1, size)
+        self.seed = seed
+        self.today = today or date.today()
+        self.window_days = max(0, window_days)
+        self.n_clientes = max(1, int(self.size * CLIENTES_PER_OS))
+        self.n_contratos = max(1, int(self.n_clientes * CONTRATOS_PER_CLIENTE))
+        self.n_titulos = max(1, int(self.size * TITULOS_PER_OS))
+        self._tables: dict[str, ColumnTable | RowTable] = {'su_ticket': RowTable('su_ticket')}
+        # reentrante: fn_areceber e mensagens são gerados a partir de outras tabelas
+        self._lock = threading.RLock()
+
+    def _rng(self, table: str) -> Random:
+        return Random(f'{self.seed}:{table}')
+
+    def table(self, name: str) -> ColumnTable | RowTable:
+        name = name.strip('/')
+        if name not in self.TABLES:
+            raise KeyError(name)
+        with self._lock:
+            table = self._tables.get(name)
+            if table is None:
+                table = getattr(self, f'_build_{name}')()
+                self._tables[name] = table
+            return table
+
+    def __contains__(self, name: str) -> bool:
+        return name.strip('/') in self.TABLES
+
+    def row_counts(self) -> dict[str, int]:
+        return {name: len(self.table(name)) for name in self.TABLES}
+
+    def _build_cliente(self) -> ColumnTable:
+        rng, n = self._rng('cliente'), self.n_clientes
+        ids = IntColumn(array('q', range(100, 100 + n)), is_sorted=True)
+        columns: dict[str, Column] = {
+            'id': ids,
+            'nome': DerivedColumn(ids, lambda v: f'Cliente {v}'),
+            'razao_social': DerivedColumn(ids, lambda v: f'Cliente {v} LTDA'),
+            'cidade': _weighted_codes(rng, CIDADE_WEIGHTS, n),
+            'bairro': _weighted_codes(rng, {b: 1 for b in BAIRROS}, n),
+            'endereco': DerivedColumn(ids, lambda v: f'Av. Cliente {v}'),
+            'telefone': DerivedColumn(ids, lambda v: f'2799{v % 10_000_000:07d}'),
+            'filial_id': _weighted_codes(rng, FILIAL_WEIGHTS, n),
+        }
+        return ColumnTable('cliente', columns, n)
+
+    def _build_cliente_contrato(self) -> ColumnTable:
+        rng, n = self._rng('cliente_contrato'), self.n_contratos
+        # todo cliente tem um contrato; os excedentes vão para clientes sorteados
+        id_cliente = array('q', range(100, 100 + min(n, self.n_clientes)))
+        id_cliente.extend(100 + rng.randrange(self.n_clientes) for _ in range(n - len(id_cliente)))
+        pago_ate, ativacao = _Encoder(), _Encoder()
+        for _ in range(n):
+            pago_ate.add((self.today - timedelta(days=int(rng.expovariate(1 / 20)))).isoformat())
+            ativacao.add((self.today - timedelta(days=rng.randrange(30, 2000))).isoformat())
+        columns: dict[str, Column] = {
+            'id': IntColumn(array('q', range(1, 1 + n)), is_sorted=True),
+            'id_cliente': IntColumn(id_cliente),
+            'id_vendedor': _weighted_codes(rng, {str(v): 1 for v in range(10, 20)}, n),
+            'status': _weighted_codes(rng, CONTRATO_STATUS_WEIGHTS, n),
+            'status_internet': _weighted_codes(rng, STATUS_INTERNET_WEIGHTS, n),
+            'situacao_financeira_contrato': _weighted_codes(rng, {'N': 85, 'R': 15}, n),
+            'pago_ate_data': pago_ate.column(),
+            'contrato': _weighted_codes(rng, {plano: 1 for plano in PLANOS}, n),
+            'data_ativacao': ativacao.column(),
+        }
+        return ColumnTable('cliente_contrato', columns, n)
+
+    def _build_fn_areceber(self) -> ColumnTable:
+        rng, n = self._rng('fn_areceber'), self.n_titulos
+        contratos = self.table('cliente_contrato')
+        assert isinstance(contratos, ColumnTable)
+        contrato_clientes = contratos.columns['id_cliente'].values  # type: ignore[attr-defined]
+        planos = contratos.columns['contrato']
+        assert isinstance(planos, DictColumn)
+
+        # vencimentos mensais nos dias 5/10/15/20/25, do próximo mês até um ano atrás;
+        # quanto mais antigo, menor a chance de ainda estar em aberto
+        current = self.today.year * 12 + self.today.month - 1
+        dues: list[tuple[str, str, float]] = []
+        for months_back in range(-1, 12):
+            # mês de calendário (ano*12 + mês): 30 dias fixos pulam ou repetem meses ao longo de um ano
+            year, month_idx = divmod(current - months_back, 12)
+            month = date(year, month_idx + 1, 1)
+            for day in (5, 10, 15, 20, 25):
+                due = month.replace(day=day)
+                overdue_days = (self.today - due).days
+                p_open = 0.92 if overdue_days < 0 else 0.25 if overdue_days < 30 else 0.06
+                dues.append((due.isoformat(), (due - timedelta(days=20)).isoformat(), p_open))
+
+        precos = [f'{PLANOS[plano]:.2f}' for plano in planos.values]
+        contrato_idx = [rng.randrange(len(contrato_clientes)) for _ in range(n)]
+        due_idx = array('H', rng.choices(range(len(dues)), k=n))
+        plano_codes = array('H', (planos.codes[c] for c in contrato_idx))
+        is_open = [rng.random() < dues[d][2] for d in due_idx]
+        filiais = list(FILIAL_WEIGHTS)
+
+        columns: dict[str, Column] = {
+            'id': IntColumn(array('q', range(9000, 9000 + n)), is_sorted=True),
+            'id_contrato': IntColumn(array('q', (c + 1 for c in contrato_idx))),
+            'id_cliente': IntColumn(array('q', (contrato_clientes[c] for c in contrato_idx))),
+            'filial_id': DictColumn(filiais, array('H', (c % len(filiais) for c in contrato_idx))),
+            'data_emissao': DictColumn([d[1] for d in dues], due_idx),
+            'data_vencimento': DictColumn([d[0] for d in dues], due_idx),
+            'valor': DictColumn(precos, plano_codes),
+            'valor_aberto': DictColumn(
+                [*precos, '0.00'],
+                array('H', (code if open_ else len(precos) for code, open_ in zip(plano_codes, is_open))),
+            ),
+            'status': DictColumn(['A', 'R'], array('H', (0 if open_ else 1 for open_ in is_open))),
+            'tipo_recebimento': _weighted_codes(rng, {'Boleto': 55, 'PIX': 35, 'Cartão': 10}, n),
+            'linha_digitavel': _constant('', n),
+            'id_cobranca': _constant('', n),
+        }
+        return ColumnTable('fn_areceber', columns, n)
+
+    def _build_su_oss_chamado(self) -> ColumnTable:
+        rng, n, window = self._rng('su_oss_chamado'), self.size, self.window_days
+        statuses = list(OS_STATUS_WEIGHTS)
+        open_statuses = [s for s in statuses if s != 'F']
+        # agenda em dias úteis/sábado ao redor de hoje; domingo recua para sábado
+        days: dict[int, str] = {}
+        for offset in range(-window, window + 1):
+            day = self.today + timedelta(days=offset)
+            days[offset] = (day - timedelta(days=1) if day.weekday() == 6 else day).isoformat()
+        horarios = [f'{8 + h:02d}:{m:02d}:00' for h in range(10) for m in (0, 30)]
+
+        offsets = rng.choices(range(-window, window + 1), k=n)
+        slots = rng.choices(range(len(horarios)), k=n)
+        drawn = rng.choices(statuses, weights=list(OS_STATUS_WEIGHTS.values()), k=n)
+        id_cliente = array('q', (100 + rng.randrange(self.n_clientes) for _ in range(n)))
+        agenda, reservada, abertura, fechamento, status = _Encoder(), _Encoder(), _Encoder(), _Encoder(), _Encoder()
+        for offset, slot, st in zip(offsets, slots, drawn):
+            # OS futuras ainda não podem estar finalizadas
+            if offset >= 0 and st == 'F':
+                st = rng.choice(open_statuses)
+            day = days[offset]
+            when = f'{day} {horarios[slot]}'
+            agenda.add(when)
+            reservada.add(when if st in {'AG', 'RAG'} else '')
+            abertura.add(f'{days[max(offset - 1 - rng.randrange(7), -window)]} 09:00:00')
+            fechamento.add(f'{day} 18:00:00' if st == 'F' else '')
+            status.add(st)
+        ids = IntColumn(array('q', range(1000, 1000 + n)), is_sorted=True)
+        columns: dict[str, Column] = {
+            'id': ids,
+            'id_cliente': IntColumn(id_cliente),
+            'id_assunto': _weighted_codes(rng, OS_ASSUNTO_WEIGHTS, n),
+            'id_filial': _weighted_codes(rng, FILIAL_WEIGHTS, n),
+            'status': status.column(),
+            'data_agenda': agenda.column(),
+            'data_reservada': reservada.column(),
+            'data_abertura': abertura.column(),
+            'data_fechamento': fechamento.column(),
+            'endereco': DerivedColumn(ids, lambda v: f'Rua {v % 997}, {10 + v % 890}'),
+            'bairro': _weighted_codes(rng, {b: 1 for b in BAIRROS}, n),
+            'protocolo': DerivedColumn(ids, lambda v: f'P{9000 + v}'),
+            'mensagem': _weighted_codes(rng, {m: 1 for m in MENSAGENS_OS}, n),
+        }
+        return ColumnTable('su_oss_chamado', columns, n)
+
+    def _build_su_oss_chamado_mensagem(self) -> ColumnTable:
+        rng = self._rng('su_oss_chamado_mensagem')
+        oss = self.table('su_oss_chamado')
+        assert isinstance(oss, ColumnTable)
+        abertura = oss.columns['data_abertura']
+        os_status = oss.columns['status']
+        eventos = list(MENSAGENS_EVENTO)
+        id_chamado = array('q')
+        data, mensagem, evento, status = _Encoder(), _Encoder(), _Encoder(), _Encoder()
+        for i in range(len(oss)):
+            opened = abertura.get(i)
+            final = os_status.get(i)
+            k = 1 + min(4, int(rng.expovariate(1 / 2)))
+            for seq in range(k):
+                ev = eventos[min(seq, len(eventos) - 2)] if seq < k - 1 or final != 'F' else '99'
+                id_chamado.append(1000 + i)
+                data.add(f'{opened[:10]} {9 + seq * 2:02d}:00:00')
+                mensagem.add(MENSAGENS_EVENTO[ev])
+                evento.add(ev)
+                status.add('F' if ev == '99' else 'A')
+        n = len(id_chamado)
+        columns: dict[str, Column] = {
+            'id': IntColumn(array('q', range(1, 1 + n)), is_sorted=True),
+            'id_chamado': IntColumn(id_chamado, is_sorted=True),
+            'data': data.column(),
+            'mensagem': mensagem.column(),
+            'id_evento': evento.column(),
+            'status': status.column(),
+        }
+        return ColumnTable('su_oss_chamado_mensagem', columns, n)
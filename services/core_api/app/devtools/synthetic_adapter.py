@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any
+
+from app.adapters.ixc_adapter import MockIXCAdapter
+from app.devtools.synthetic import SyntheticDataset
+from app.utils.ixc_filters import (
+    build_filters_contas_atrasadas,
+    build_filters_contas_em_aberto,
+    build_filters_contas_para_sync,
+    build_filters_contrato_by_id,
+)
+
+# Modo mock sobre o gerador sintético (IXC_MOCK_DATASET_SIZE > 0): as mesmas consultas grid_param do
+# RealIXCAdapter, respondidas pelo dataset em memória. Tickets continuam os do MockIXCAdapter.
+
+
+class SyntheticIXCAdapter(MockIXCAdapter):
+    def __init__(self, dataset: SyntheticDataset) -> None:
+        self.dataset = dataset
+
+    def _select(self, table: str, grid_filters: list[dict[str, Any]], sortname: str = 'id', sortorder: str = 'asc') -> list[dict[str, Any]]:
+        return self.dataset.table(table).query(grid_filters, sortname=sortname, sortorder=sortorder)[1]
+
+    def _in_filter(self, tb: str, ids: list[str]) -> list[dict[str, Any]]:
+        return [{'TB': tb, 'OP': 'IN', 'P': ','.join(str(i).strip() for i in ids if str(i).strip())}]
+
+    def list_contratos(self, filters: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+        grid_filters: list[dict[str, Any]] = []
+        if filters and filters.get('id') is not None:
+            grid_filters = build_filters_contrato_by_id(filters['id'])
+        elif filters and filters.get('status') is not None:
+            grid_filters = [{'TB': 'cliente_contrato.status', 'OP': '=', 'P': str(filters['status'])}]
+        return self._select('cliente_contrato', grid_filters)
+
+    def list_contratos_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        return self._select('cliente_contrato', self._in_filter('cliente_contrato.id', ids))
+
+    def list_contas_receber_abertas(self) -> list[dict[str, Any]]:
+        return self._select('fn_areceber', build_filters_contas_em_aberto())
+
+    def list_contas_receber_atrasadas(
+        self,
+        min_days: int = 20,
+        due_from: date | None = None,
+        due_to: date | None = None,
+        filial_id: str | None = None,
+    ) -> list[dict[str, Any]]:
+        cutoff = date.today() - timedelta(days=max(min_days, 0))
+        filters = build_filters_contas_atrasadas(cutoff_due_date=cutoff, due_from=due_from, due_to=due_to, filial_id=filial_id)
+        return self._select('fn_areceber', filters)
+
+    def list_contas_receber_by_ids(self, external_ids: list[str]) -> list[dict[str, Any]]:
+        return self._select('fn_areceber', self._in_filter('fn_areceber.id', external_ids))
+
+    def list_contas_receber_para_sync(
+        self,
+        due_from: date,
+        only_open: bool = True,
+        filial_id: str | None = None,
+        rp: int = 500,
+        limit_pages: int = 5,
+    ) -> list[dict[str, Any]]:
+        filters = build_filters_contas_para_sync(due_from=due_from, only_open=only_open, filial_id=filial_id)
+        return self.dataset.table('fn_areceber').query(filters, page=1, rp=max(1, rp) * max(1, limit_pages))[1]
+
+    def list_service_orders(self, grid_filters: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return self._select('su_oss_chamado', grid_filters)
+
+    def list_clientes_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        return self._select('cliente', self._in_filter('cliente.id', ids))
+
+    def list_oss_mensagens(self, id_chamado: str) -> list[dict[str, Any]]:
+        filters = [{'TB': 'su_oss_chamado_mensagem.id_chamado', 'OP': '=', 'P': str(id_chamado)}]
+        return self._select('su_oss_chamado_mensagem', filters, sortname='data')
+
+    def list_oss_mensagens_batch(self, ids: list[str]) -> dict[str, list[dict[str, Any]]]:
+        uniq = list(dict.fromkeys(str(i).strip() for i in ids if str(i).strip()))
+        out: dict[str, list[dict[str, Any]]] = {i: [] for i in uniq}
+        for row in self._select('su_oss_chamado_mensagem', self._in_filter('su_oss_chamado_mensagem.id_chamado', uniq), sortname='data'):
+            out[str(row.get('id_chamado'))].append(row)
+        return out
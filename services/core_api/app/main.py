@@ -1,28 +1,46 @@
+import logging
+import math
+import mimetypes
+import re
 import uuid
 from pathlib import Path
+from time import perf_counter
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, RedirectResponse
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, RedirectResponse
 from starlette.requests import Request
 
 from app.api.billing import router as billing_router
 from app.api.debug import router as debug_router
 from app.api.dashboard import router as dashboard_router
 from app.api.filters import router as filters_router
+from app.api.jobs import router as jobs_router
+from app.api.metrics import router as metrics_router
 from app.api.settings import router as settings_router
 from app.api.oss import router as oss_router
+from app.clients.ixc_client import IXCCallBudgetExceeded, IXCUnavailableError
 from app.config import get_settings
-from app.db import init_db
+from app.db import dispose_async_engine, engine
+from app.migrate import check_schema
 from app.services.adapters import close_ixc_resources
-from app.utils.profiling import set_request_id
+from app.utils.cache import cache_get_stale_entry
+from app.utils.compression import CompressionMiddleware, negotiate_encoding
+from app.utils.metrics import HTTP_REQUEST_DURATION
+from app.utils.profiling import finish_request_trace, server_timing_header, set_request_id, start_request_trace
+from app.utils.responses import cached_json_response
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 WEBAPP_DIST_DIR = Path(__file__).resolve().parents[2] / 'webapp' / 'dist'
 WEBAPP_INDEX_FILE = WEBAPP_DIST_DIR / 'index.html'
-EXCLUDED_FRONTEND_PREFIXES = {'billing', 'dashboard', 'filters', 'settings', 'debug', 'healthz', 'docs', 'redoc', 'openapi.json', 'oss'}
+# arquivos do build do Vite com hash no nome (assets/index-<hash>.js) nunca mudam de conteúdo
+HASHED_ASSET_RE = re.compile(r'-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+PRECOMPRESSED_SUFFIXES = (('br', '.br'), ('gzip', '.gz'))
+EXCLUDED_FRONTEND_PREFIXES = {'billing', 'dashboard', 'filters', 'settings', 'debug', 'healthz', 'docs', 'redoc', 'openapi.json', 'oss', 'jobs', 'metrics'}
 
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,29 +49,78 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=settings.response_compression_min_bytes)
 
 app.include_router(billing_router)
 app.include_router(debug_router)
 app.include_router(dashboard_router)
 app.include_router(filters_router)
+app.include_router(jobs_router)
+app.include_router(metrics_router)
 app.include_router(settings_router)
 app.include_router(oss_router)
 
 
 @app.on_event('startup')
 def startup() -> None:
-    init_db()
+    # migrações e seed rodam fora do boot (`python -m app.migrate`); aqui só confere a revisão
+    check_schema(engine)
+
+
+@app.on_event('shutdown')
+async def dispose_db_engines() -> None:
+    await dispose_async_engine()
 
 
 @app.middleware('http')
 async def request_id_middleware(request: Request, call_next):
     request_id = request.headers.get('x-request-id') or str(uuid.uuid4())
     set_request_id(request_id)
+    trace = start_request_trace(request_id)
     response = await call_next(request)
+    finish_request_trace(trace)
     response.headers['X-Request-Id'] = request_id
+    response.headers['X-IXC-Calls'] = str(trace.ixc_calls)
+    response.headers['Server-Timing'] = server_timing_header(trace)
+    if trace.budget_exceeded:
+        response.headers['X-IXC-Budget'] = 'exceeded'
     return response
 
 
+@app.exception_handler(IXCCallBudgetExceeded)
+async def ixc_call_budget_handler(request: Request, exc: IXCCallBudgetExceeded):
+    return JSONResponse(status_code=503, content={'detail': str(exc)})
+
+
+@app.exception_handler(IXCUnavailableError)
+async def ixc_unavailable_handler(request: Request, exc: IXCUnavailableError):
+    # rotas com cache marcam a chave em request.state: com o IXC fora, vale a última cópia longa em vez do 503
+    key = getattr(request.state, 'stale_cache_key', None)
+    stale = cache_get_stale_entry(key) if key else None
+    if stale is not None:
+        logger.warning('serving stale cache key=%s err=%s', key, exc)
+        return cached_json_response(request, *stale, headers={'X-Cache': 'STALE'})
+    return JSONResponse(status_code=503, content={'detail': str(exc)}, headers={'Retry-After': str(max(1, math.ceil(exc.retry_after_s)))})
+
+
+@app.middleware('http')
+async def metrics_middleware(request: Request, call_next):
+    started = perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get('route')
+        HTTP_REQUEST_DURATION.observe(
+            perf_counter() - started,
+            method=request.method,
+            route=getattr(route, 'path', 'unmatched'),
+            status=status,
+        )
+
+
 @app.on_event('shutdown')
 def shutdown() -> None:
     close_ixc_resources()
@@ -64,8 +131,24 @@ def healthz():
     return {'status': 'ok'}
 
 
+def _static_file_response(request: Request, path: Path) -> FileResponse:
+    relative = path.relative_to(WEBAPP_DIST_DIR.resolve())
+    immutable = relative.parts[0] == 'assets' and HASHED_ASSET_RE.search(path.name)
+    headers = {'Cache-Control': IMMUTABLE_CACHE_CONTROL if immutable else 'no-cache'}
+
+    # irmãos .br/.gz gerados no build (vite.config.ts): servidos sem comprimir de novo a cada request
+    siblings = {encoding: path.with_name(path.name + suffix) for encoding, suffix in PRECOMPRESSED_SUFFIXES}
+    available = tuple(encoding for encoding, sibling in siblings.items() if sibling.is_file())
+    encoding = negotiate_encoding(request.headers.get('accept-encoding'), available)
+    if encoding is None:
+        return FileResponse(path, headers=headers)
+    headers.update({'Content-Encoding': encoding, 'Vary': 'Accept-Encoding'})
+    media_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+    return FileResponse(siblings[encoding], media_type=media_type, headers=headers)
+
+
 @app.get('/{full_path:path}', include_in_schema=False)
-def spa_fallback(full_path: str):
+def spa_fallback(full_path: str, request: Request):
     normalized = full_path.strip('/')
     requested_path = normalized or 'index.html'
 
@@ -75,13 +158,13 @@ def spa_fallback(full_path: str):
     if WEBAPP_DIST_DIR.exists():
         candidate = (WEBAPP_DIST_DIR / requested_path).resolve()
         if WEBAPP_DIST_DIR.resolve() in candidate.parents and candidate.exists() and candidate.is_file():
-            return FileResponse(candidate)
+            return _static_file_response(request, candidate)
 
     if normalized and '.' in normalized:
         raise HTTPException(status_code=404, detail='Not Found')
 
     if WEBAPP_INDEX_FILE.exists():
-        return FileResponse(WEBAPP_INDEX_FILE)
+        return _static_file_response(request, WEBAPP_INDEX_FILE.resolve())
 
     if not normalized:
         return RedirectResponse(settings.frontend_dev_url.rstrip('/'))
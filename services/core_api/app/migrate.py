@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from datetime import datetime
+import importlib
+import logging
+import pkgutil
+import sys
+from types import ModuleType
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+from app.db import SchemaMigration
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_PACKAGE = 'app.migrations'
+# chave fixa do pg_advisory_lock: dois `migrate` simultâneos rodam em fila
+MIGRATION_LOCK_KEY = 4507310
+
+
+@dataclass(frozen=True)
+class Revision:
+    revision: str
+    down_revision: str | None
+    description: str
+    module: ModuleType
+
+
+def load_revisions() -> list[Revision]:
+    # ordena pela cadeia down_revision (estilo Alembic), não pelo nome do arquivo
+    package = importlib.import_module(MIGRATIONS_PACKAGE)
+    by_parent: dict[str | None, Revision] = {}
+    for info in pkgutil.iter_modules(package.__path__):
+        module = importlib.import_module(f'{MIGRATIONS_PACKAGE}.{info.name}')
+        rev = Revision(module.revision, module.down_revision, module.description, module)
+        if rev.down_revision in by_parent:
+            raise RuntimeError(f'migration branch at {rev.down_revision}: {by_parent[rev.down_revision].revision} and {rev.revision}')
+        by_parent[rev.down_revision] = rev
+
+    ordered: list[Revision] = []
+    current = by_parent.pop(None, None)
+    while current is not None:
+        ordered.append(current)
+        current = by_parent.pop(current.revision, None)
+    if by_parent:
+        raise RuntimeError(f'orphan migrations: {sorted(r.revision for r in by_parent.values())}')
+    return ordered
+
+
+def head_revision() -> str | None:
+    revisions = load_revisions()
+    return revisions[-1].revision if revisions else None
+
+
+def applied_revisions(connection: Connection) -> set[str]:
+    try:
+        return set(connection.scalars(select(SchemaMigration.revision)))
+    except DBAPIError:
+        # tabela ainda não existe: banco novo ou criado pelo create_all antigo
+        connection.rollback()
+        return set()
+
+
+def upgrade(engine: Engine) -> list[str]:
+    applied_now: list[str] = []
+    with engine.connect() as connection:
+        if connection.dialect.name == 'postgresql':
+            connection.execute(text('SELECT pg_advisory_lock(:key)'), {'key': MIGRATION_LOCK_KEY})
+            connection.commit()
+        try:
+            SchemaMigration.__table__.create(connection, checkfirst=True)
+            connection.commit()
+            done = applied_revisions(connection)
+            connection.commit()
+            for rev in load_revisions():
+                if rev.revision in done:
+                    continue
+                # cada revisão e o seu registro na mesma transação
+                with connection.begin():
+                    rev.module.upgrade(connection)
+                    connection.execute(
+                        SchemaMigration.__table__.insert().values(
+                            revision=rev.revision,
+                            description=rev.description,
+                            applied_at=datetime.utcnow(),
+                        )
+                    )
+                logger.info('migration applied revision=%s description=%s', rev.revision, rev.description)
+                applied_now.append(rev.revision)
+        finally:
+            if connection.dialect.name == 'postgresql':
+                connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': MIGRATION_LOCK_KEY})
+                connection.commit()
+    return applied_now
+
+
+def check_schema(engine: Engine) -> None:
+    # boot da API: uma leitura, sem DDL. Banco atrás do código falha; revisões desconhecidas (deploy
+    # com banco à frente) só geram aviso.
+    expected = [rev.revision for rev in load_revisions()]
+    with engine.connect() as connection:
+        done = applied_revisions(connection)
+    missing = [revision for revision in expected if revision not in done]
+    if missing:
+        raise RuntimeError(f'database schema is behind: missing revisions {missing}; run `python -m app.migrate upgrade`')
+    unknown = sorted(done - set(expected))
+    if unknown:
+        logger.warning('database has unknown migration revisions=%s', unknown)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Migrações do banco do core_api.')
+    parser.add_argument('command', nargs='?', default='upgrade', choices=('upgrade', 'current', 'check'))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    from app.db import engine, init_db
+
+    if args.command == 'upgrade':
+        # aplica as revisões pendentes e o seed de dev (BILLING_CASE_SEED_DEV)
+        init_db()
+        print(f'head={head_revision()}')
+    elif args.command == 'current':
+        with engine.connect() as connection:
+            print(' '.join(sorted(applied_revisions(connection))) or '-')
+    else:
+        try:
+            check_schema(engine)
+        except RuntimeError as exc:
+            print(exc, file=sys.stderr)
+            sys.exit(1)
+        print('ok')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from sqlalchemy import JSON, Boolean, Column, Date, DateTime, ForeignKey, Integer, MetaData, Numeric, String, Table, Text
+from sqlalchemy.engine import Connection
+
+revision = '0001'
+down_revision = None
+description = 'tabelas iniciais'
+
+# retrato do schema que o create_all gerava: bancos antigos já têm essas tabelas (checkfirst) e só ganham o registro
+
+
+def upgrade(connection: Connection) -> None:
+    metadata = MetaData()
+    Table(
+        'billing_actions',
+        metadata,
+        Column('action_key', String(255), primary_key=True),
+        Column('external_id', String(64), nullable=False),
+    )
+    Table(
+        'saved_filters',
+        metadata,
+        Column('id', String(36), primary_key=True),
+        Column('name', String(255), nullable=False),
+        Column('scope', String(64), nullable=False),
+        Column('definition_json', JSON, nullable=False),
+        Column('created_at', DateTime, nullable=False),
+    )
+    Table(
+        'settings',
+        metadata,
+        Column('key', String(128), primary_key=True),
+        Column('value_json', JSON, nullable=False),
+    )
+    Table(
+        'billing_case',
+        metadata,
+        Column('id', String(36), primary_key=True),
+        Column('external_id', String(64), nullable=False, unique=True),
+        Column('id_cliente', String(64), nullable=False),
+        Column('id_contrato', String(64), nullable=True),
+        Column('filial_id', String(64), nullable=True),
+        Column('due_date', Date, nullable=True),
+        Column('amount_open', Numeric(12, 2), nullable=False),
+        Column('open_days', Integer, nullable=False),
+        Column('payment_type', String(64), nullable=True),
+        Column('status_case', String(32), nullable=False),
+        Column('first_seen_at', DateTime, nullable=False),
+        Column('last_seen_at', DateTime, nullable=False),
+        Column('action_state', String(64), nullable=False),
+        Column('last_action_at', DateTime, nullable=True),
+        Column('snapshot_json', JSON, nullable=True),
+        Column('contract_json', JSON, nullable=True),
+        Column('client_json', JSON, nullable=True),
+        Column('contract_missing', Boolean, nullable=False),
+        Column('ticket_id', String(64), nullable=True),
+        Column('ticket_status', String(32), nullable=True),
+    )
+    Table(
+        'billing_action_log',
+        metadata,
+        Column('id', String(36), primary_key=True),
+        Column('case_id', String(36), ForeignKey('billing_case.id'), nullable=False),
+        Column('action_type', String(64), nullable=False),
+        Column('created_at', DateTime, nullable=False),
+        Column('payload_json', JSON, nullable=True),
+        Column('success', Boolean, nullable=False),
+        Column('error', Text, nullable=True),
+    )
+    metadata.create_all(connection, checkfirst=True)
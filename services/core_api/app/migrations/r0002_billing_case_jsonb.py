@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+revision = '0002'
+down_revision = '0001'
+description = 'billing_case: JSONB e índices GIN'
+
+JSONB_COLUMNS = ('snapshot_json', 'contract_json', 'client_json')
+GIN_INDEXES = {
+    'ix_billing_case_contract_json': 'contract_json',
+    'ix_billing_case_client_json': 'client_json',
+}
+
+
+def upgrade(connection: Connection) -> None:
+    # SQLite continua com JSON genérico e sem índice: nada a fazer
+    if connection.dialect.name != 'postgresql':
+        return
+    for column in JSONB_COLUMNS:
+        connection.execute(text(f'ALTER TABLE billing_case ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb'))
+    for name, column in GIN_INDEXES.items():
+        connection.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON billing_case USING gin ({column} jsonb_path_ops)'))
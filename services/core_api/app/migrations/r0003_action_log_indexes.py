@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+revision = '0003'
+down_revision = '0002'
+description = 'billing_action_log: índices por caso e por data'
+
+
+def upgrade(connection: Connection) -> None:
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_billing_action_log_case_created ON billing_action_log (case_id, created_at)'))
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_billing_action_log_created_at ON billing_action_log (created_at)'))
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import Any, Literal
+
+from pydantic import BaseModel
+
+
+class JobProgressOut(BaseModel):
+    done: int = 0
+    total: int | None = None
+
+
+class JobOut(BaseModel):
+    id: str
+    kind: Literal['billing_sync', 'billing_enrich', 'billing_reconcile']
+    status: Literal['queued', 'running', 'succeeded', 'failed', 'skipped']
+    params: dict[str, Any]
+    progress: JobProgressOut
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    created_at: str
+    started_at: str | None = None
+    finished_at: str | None = None
+    deduplicated: bool = False
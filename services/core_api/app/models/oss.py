@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+OSS_MESSAGES_BATCH_LIMIT = 200
+
+
+class OssMensagensBatchItem(BaseModel):
+    id: str
+
+
+class OssMensagensBatchIn(BaseModel):
+    items: list[OssMensagensBatchItem] = Field(default_factory=list, max_length=OSS_MESSAGES_BATCH_LIMIT)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import gzip
+import logging
+from pathlib import Path
+from time import perf_counter
+
+from sqlalchemy import delete, select
+
+from app.config import get_settings
+from app.db import BillingActionLog, SessionLocal
+from app.utils.streaming import encode_line
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BATCH_SIZE = 5000
+ARCHIVE_FIELDS = ('id', 'case_id', 'action_type', 'created_at', 'payload_json', 'success', 'error')
+
+
+@dataclass
+class ActionLogArchiveResult:
+    archived: int
+    files: list[str]
+    duration_ms: float
+
+
+def _archive_path(archive_dir: Path, created_at: datetime) -> Path:
+    # um arquivo por mês: cada mês funciona como uma partição que sai do banco inteira com o tempo
+    return archive_dir / f"billing_action_log-{created_at.strftime('%Y-%m')}.ndjson.gz"
+
+
+def archive_action_logs(retention_days: int | None = None, archive_dir: str | None = None, now: datetime | None = None) -> ActionLogArchiveResult:
+    settings = get_settings()
+    retention_days = settings.action_log_retention_days if retention_days is None else retention_days
+    target_dir = Path(archive_dir or settings.action_log_archive_dir)
+    cutoff = (now or datetime.utcnow()) - timedelta(days=max(1, retention_days))
+    started = perf_counter()
+    archived = 0
+    files: set[str] = set()
+
+    target_dir.mkdir(parents=True, exist_ok=True)
+    while True:
+        with SessionLocal() as db:
+            rows = list(
+                db.scalars(
+                    select(BillingActionLog)
+                    .where(BillingActionLog.created_at < cutoff)
+                    .order_by(BillingActionLog.created_at)
+                    .limit(ARCHIVE_BATCH_SIZE)
+                )
+            )
+            if not rows:
+                break
+
+            by_file: dict[Path, list[bytes]] = {}
+            for row in rows:
+                by_file.setdefault(_archive_path(target_dir, row.created_at), []).append(
+                    encode_line({field: getattr(row, field) for field in ARCHIVE_FIELDS})
+                )
+            # gzip aceita membros concatenados: cada lote é anexado ao arquivo do mês sem reescrevê-lo.
+            # O arquivo é gravado antes do delete; se o delete falhar, o próximo run só duplica linhas no arquivo.
+            for path, lines in by_file.items():
+                with gzip.open(path, 'ab') as fh:
+                    fh.writelines(lines)
+                files.add(str(path))
+
+            db.execute(delete(BillingActionLog).where(BillingActionLog.id.in_([row.id for row in rows])))
+            db.commit()
+            archived += len(rows)
+
+    duration_ms = round((perf_counter() - started) * 1000, 2)
+    if archived:
+        logger.info('action log archived rows=%s files=%s cutoff=%s', archived, len(files), cutoff.isoformat())
+    return ActionLogArchiveResult(archived=archived, files=sorted(files), duration_ms=duration_ms)
@@ -1,8 +1,22 @@
 from app.adapters.ixc_adapter import MockIXCAdapter, RealIXCAdapter
 from app.clients.ixc_client import IXCClient
+from app.clients.ixc_scheduler import build_ixc_scheduler
 from app.config import get_settings
+from app.devtools.synthetic import SyntheticDataset
+from app.devtools.synthetic_adapter import SyntheticIXCAdapter
 
 _real_client: IXCClient | None = None
+_mock_dataset: SyntheticDataset | None = None
+
+
+def get_mock_dataset() -> SyntheticDataset | None:
+    global _mock_dataset
+    settings = get_settings()
+    if settings.ixc_mock_dataset_size <= 0:
+        return None
+    if _mock_dataset is None or (_mock_dataset.size, _mock_dataset.seed) != (settings.ixc_mock_dataset_size, settings.ixc_mock_dataset_seed):
+        _mock_dataset = SyntheticDataset(size=settings.ixc_mock_dataset_size, seed=settings.ixc_mock_dataset_seed)
+    return _mock_dataset
 
 
 def get_ixc_adapter():
@@ -16,8 +30,18 @@ def get_ixc_adapter():
                 token=settings.ixc_token,
                 verify_tls=settings.ixc_verify_tls,
                 timeout_s=settings.ixc_timeout_s,
+                scheme=settings.ixc_scheme,
+                breaker_failures=settings.ixc_breaker_failures,
+                breaker_open_s=settings.ixc_breaker_open_s,
+                adaptive_timeout=settings.ixc_adaptive_timeout,
+                timeout_min_s=settings.ixc_timeout_min_s,
+                timeout_p99_factor=settings.ixc_timeout_p99_factor,
+                scheduler=build_ixc_scheduler(settings),
             )
         return RealIXCAdapter(_real_client)
+    dataset = get_mock_dataset()
+    if dataset is not None:
+        return SyntheticIXCAdapter(dataset)
     return MockIXCAdapter()
 
 
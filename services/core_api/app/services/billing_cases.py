@@ -3,7 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Any
+from itertools import chain
+from typing import Any, Iterator
 
 from app.adapters.ixc_adapter import IXCAdapter
 
@@ -49,14 +50,14 @@ def _normalize_contract_id(row: dict[str, Any]) -> str | None:
     return None
 
 
-def build_grouped_billing_cases(
+def _group_billing_cases(
     adapter: IXCAdapter,
     only_20p: bool = True,
     group_by: str = 'contract',
     limit: int = 500,
     min_due_date: date | None = None,
     max_due_date: date | None = None,
-) -> dict[str, Any]:
+) -> tuple[dict[str, Any], list[_AggCase]]:
     today = date.today()
 
     if only_20p:
@@ -155,28 +156,53 @@ def build_grouped_billing_cases(
     titles_total = sum(c.qtd_titulos for c in cases)
     cases_20p = sum(1 for c in cases if c.max_open_days >= 20)
 
+    summary = {
+        'cases_total': len(cases),
+        'cases_20p': cases_20p,
+        'titles_total': titles_total,
+        'amount_open_total': str(amount_open_total),
+        'oldest_due_date': min(all_oldest).isoformat() if all_oldest else None,
+        'generated_at': datetime.utcnow().isoformat(),
+    }
+    return summary, cases
+
+
+def _case_out(c: _AggCase) -> dict[str, Any]:
     return {
-        'summary': {
-            'cases_total': len(cases),
-            'cases_20p': cases_20p,
-            'titles_total': titles_total,
-            'amount_open_total': str(amount_open_total),
-            'oldest_due_date': min(all_oldest).isoformat() if all_oldest else None,
-            'generated_at': datetime.utcnow().isoformat(),
-        },
-        'cases': [
-            {
-                'case_key': c.case_key,
-                'id_cliente': c.id_cliente,
-                'id_contrato': c.id_contrato,
-                'cliente_nome': c.cliente_nome,
-                'qtd_titulos': c.qtd_titulos,
-                'total_aberto': str(c.total_aberto),
-                'oldest_due_date': c.oldest_due_date.isoformat() if c.oldest_due_date else None,
-                'newest_due_date': c.newest_due_date.isoformat() if c.newest_due_date else None,
-                'max_open_days': c.max_open_days,
-                'titles': c.titles,
-            }
-            for c in cases
-        ],
+        'case_key': c.case_key,
+        'id_cliente': c.id_cliente,
+        'id_contrato': c.id_contrato,
+        'cliente_nome': c.cliente_nome,
+        'qtd_titulos': c.qtd_titulos,
+        'total_aberto': str(c.total_aberto),
+        'oldest_due_date': c.oldest_due_date.isoformat() if c.oldest_due_date else None,
+        'newest_due_date': c.newest_due_date.isoformat() if c.newest_due_date else None,
+        'max_open_days': c.max_open_days,
+        'titles': c.titles,
     }
+
+
+def build_grouped_billing_cases(
+    adapter: IXCAdapter,
+    only_20p: bool = True,
+    group_by: str = 'contract',
+    limit: int = 500,
+    min_due_date: date | None = None,
+    max_due_date: date | None = None,
+) -> dict[str, Any]:
+    summary, cases = _group_billing_cases(adapter, only_20p, group_by, limit, min_due_date, max_due_date)
+    return {'summary': summary, 'cases': [_case_out(c) for c in cases]}
+
+
+def iter_grouped_billing_cases(
+    adapter: IXCAdapter,
+    only_20p: bool = True,
+    group_by: str = 'contract',
+    limit: int = 500,
+    min_due_date: date | None = None,
+    max_due_date: date | None = None,
+) -> Iterator[dict[str, Any]]:
+    # agrupamento e ordenação precisam de todos os títulos (e rodam já aqui, antes do primeiro byte);
+    # o que fica lazy é a montagem de cada caso. O resumo vai como última linha ({"summary": ...}).
+    summary, cases = _group_billing_cases(adapter, only_20p, group_by, limit, min_due_date, max_due_date)
+    return chain(map(_case_out, cases), ({'summary': summary},))
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from time import perf_counter
+from typing import Callable
 
 from sqlalchemy import or_, select
 
@@ -28,7 +29,12 @@ def _pick_contract_id(snapshot_json: dict | None) -> tuple[str | None, bool]:
     return None, True
 
 
-def enrich_billing_cases(adapter: IXCAdapter, limit: int = 2000, only_missing: bool = True) -> BillingEnrichResult:
+def enrich_billing_cases(
+    adapter: IXCAdapter,
+    limit: int = 2000,
+    only_missing: bool = True,
+    progress: Callable[[int, int], None] | None = None,
+) -> BillingEnrichResult:
     started = perf_counter()
 
     with SessionLocal() as db:
@@ -66,7 +72,9 @@ def enrich_billing_cases(adapter: IXCAdapter, limit: int = 2000, only_missing: b
         clients_by_id = {str(c.get('id')): c for c in clients if c.get('id') is not None}
 
         updated = 0
-        for case in rows:
+        for idx, case in enumerate(rows, start=1):
+            if progress is not None:
+                progress(idx, len(rows))
             cid = selected_contract_by_case.get(case.id)
             contract = contracts_by_id.get(str(cid)) if cid else None
             client = clients_by_id.get(str(case.id_cliente))
@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 from decimal import Decimal
 from time import perf_counter
-from typing import Any
+from typing import Any, Callable
 
 from sqlalchemy import select
 
@@ -45,6 +45,7 @@ def sync_billing_cases(
     filial_id: str | None = None,
     rp: int = 500,
     limit_pages: int = 5,
+    progress: Callable[[int, int], None] | None = None,
 ) -> BillingSyncResult:
     started_at = perf_counter()
     now = datetime.utcnow()
@@ -61,7 +62,9 @@ def sync_billing_cases(
 
     upserted = 0
     with SessionLocal() as db:
-        for row in rows:
+        for idx, row in enumerate(rows, start=1):
+            if progress is not None:
+                progress(idx, len(rows))
             external_id = str(row.get('id') or '').strip()
             id_cliente = str(row.get('id_cliente') or '').strip()
             if not external_id or not id_cliente:
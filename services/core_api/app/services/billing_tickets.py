@@ -3,9 +3,10 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import date, datetime
 from time import perf_counter
-from typing import Any
+from typing import Any, Callable
+from uuid import uuid4
 
-from sqlalchemy import and_, select
+from sqlalchemy import and_, insert, select
 
 from app.adapters.ixc_adapter import IXCAdapter
 from app.config import get_settings
@@ -33,6 +34,18 @@ def _action_key(case: BillingCase) -> str:
     return f'billing:{case.external_id}:ticket_created'
 
 
+def _action_log(case_id: str, action_type: str, payload: dict[str, Any], success: bool, error: str | None = None) -> dict[str, Any]:
+    return {
+        'id': str(uuid4()),
+        'case_id': case_id,
+        'action_type': action_type,
+        'created_at': datetime.utcnow(),
+        'payload_json': payload,
+        'success': success,
+        'error': error,
+    }
+
+
 def dry_run_case_ticket(case_id: str) -> dict[str, Any]:
     with SessionLocal() as db:
         case = db.scalar(select(BillingCase).where(BillingCase.id == case_id))
@@ -166,7 +179,7 @@ def batch_create_tickets(adapter: IXCAdapter, case_ids: list[str] | None, filter
     return BatchTicketResult(created=created, skipped=skipped, errors=errors, duration_ms=round((perf_counter() - started) * 1000, 2))
 
 
-def reconcile_tickets(adapter: IXCAdapter, limit: int = 1000) -> dict[str, Any]:
+def reconcile_tickets(adapter: IXCAdapter, limit: int = 1000, progress: Callable[[int, int], None] | None = None) -> dict[str, Any]:
     settings = get_settings()
     with SessionLocal() as db:
         rows = list(db.scalars(select(BillingCase).where(and_(BillingCase.status_case == 'OPEN', BillingCase.ticket_id.is_not(None))).limit(max(1, limit))))
@@ -176,17 +189,24 @@ def reconcile_tickets(adapter: IXCAdapter, limit: int = 1000) -> dict[str, Any]:
         closed = 0
         would_close = 0
         errors = 0
-        for case in rows:
+        # logs vão num único INSERT em lote no fim, junto com o commit dos casos
+        logs: list[dict[str, Any]] = []
+        for idx, case in enumerate(rows, start=1):
+            if progress is not None:
+                progress(idx, len(rows))
             row = ixc_by_id.get(case.external_id)
             paid = row is None or str(row.get('valor_aberto') or '0') in {'0', '0.00'}
             if not paid:
                 continue
 
             if not settings.billing_autoclose_enabled:
+                would_close += 1
+                if case.action_state == 'READY_TO_CLOSE':
+                    # já registrado numa execução anterior: não repete o log a cada reconcile
+                    continue
                 case.action_state = 'READY_TO_CLOSE'
                 case.last_action_at = datetime.utcnow()
-                would_close += 1
-                db.add(BillingActionLog(case_id=case.id, action_type='close_ticket', payload_json={'would_close': True}, success=True))
+                logs.append(_action_log(case.id, 'close_ticket', {'would_close': True}, success=True))
                 continue
 
             try:
@@ -196,13 +216,15 @@ def reconcile_tickets(adapter: IXCAdapter, limit: int = 1000) -> dict[str, Any]:
                 case.action_state = 'TICKET_CLOSED'
                 case.last_action_at = datetime.utcnow()
                 closed += 1
-                db.add(BillingActionLog(case_id=case.id, action_type='close_ticket', payload_json={'ticket_id': case.ticket_id}, success=True))
+                logs.append(_action_log(case.id, 'close_ticket', {'ticket_id': case.ticket_id}, success=True))
             except Exception as exc:
                 errors += 1
                 case.ticket_status = 'ERROR'
                 case.action_state = 'ERROR'
                 case.last_action_at = datetime.utcnow()
-                db.add(BillingActionLog(case_id=case.id, action_type='close_ticket', payload_json={'ticket_id': case.ticket_id}, success=False, error=str(exc)))
+                logs.append(_action_log(case.id, 'close_ticket', {'ticket_id': case.ticket_id}, success=False, error=str(exc)))
 
+        if logs:
+            db.execute(insert(BillingActionLog), logs)
         db.commit()
         return {'closed': closed, 'would_close': would_close, 'errors': errors}
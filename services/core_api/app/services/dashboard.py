@@ -2,13 +2,23 @@ from __future__ import annotations
 
 from datetime import date, datetime, timedelta
 import logging
-from typing import Any
+from typing import Any, Iterator
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from app.adapters.ixc_adapter import IXCAdapter
 from app.services.ixc_grid_builder import TB_OS_ID_ASSUNTO, TB_OS_ID_FILIAL, TB_OS_STATUS, expand_os_query_grids
+from app.services import summary_engine
+from app.services.filter_plans import (
+    STATUS_GROUPS,
+    get_filter_plan,
+    load_subject_ids,
+    undated_grids,
+)
+from app.services.service_orders import ServiceOrder, ServiceOrderBatch, as_service_order, as_service_orders, collect_service_orders
 from app.services.settings import get_settings_payload
+from app.utils.cache import stable_json_hash
 from app.utils.profiling import timer
+from app.utils.timestamps import parse_ixc_datetime
 
 STATUS_LABELS = {
     'A': 'Aberta',
@@ -21,18 +31,6 @@ STATUS_LABELS = {
     'F': 'Finalizada',
     'RAG': 'Aguardando agendamento',
 }
-STATUS_GROUPS = {
-    'open_like': ['A', 'AN', 'EN', 'AS', 'DS', 'EX', 'RAG'],
-    'scheduled': ['AG', 'RAG', 'AS', 'DS', 'EX'],
-    'done': ['F'],
-}
-MAINTENANCE_TAB_STATUS = {
-    'open': ['A', 'AN', 'EN', 'AS', 'DS', 'EX', 'AG', 'RAG'],
-    'scheduled': ['AG', 'RAG'],
-    'done': ['F'],
-}
-DEFAULT_INSTALL_ASSUNTOS = {'1', '15'}
-DEFAULT_MAINTENANCE_ASSUNTOS = {'17', '34', '31'}
 DEFAULT_SUMMARY_TZ = 'America/Sao_Paulo'
 WEEKDAY_KEYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
 CAPACITY_STATUS_CODES = ['AG', 'RAG', 'AS', 'DS', 'EX', 'F', 'A', 'AN', 'EN']
@@ -47,46 +45,12 @@ def _clients_to_map(rows: Any) -> dict[str, dict[str, Any]]:
     return {}
 
 
-def _load_subject_ids() -> tuple[set[str], set[str]]:
-    settings = get_settings_payload()
-    install_subject_ids = {
-        str(x)
-        for x in (
-            settings.get('installation_subject_ids')
-            or settings.get('subject_groups', {}).get('instalacao')
-            or sorted(DEFAULT_INSTALL_ASSUNTOS)
-        )
-    }
-    maintenance_subject_ids = {
-        str(x)
-        for x in (
-            settings.get('maintenance_subject_ids')
-            or settings.get('subject_groups', {}).get('manutencao')
-            or sorted(DEFAULT_MAINTENANCE_ASSUNTOS)
-        )
-    }
-    return install_subject_ids, maintenance_subject_ids
-
-
 def parse_date_or_default(raw: str | None, default: date) -> date:
     if not raw:
         return default
     return datetime.strptime(raw, '%Y-%m-%d').date()
 
 
-def _parse_dt(raw: str | None) -> datetime | None:
-    if not raw:
-        return None
-    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
-        try:
-            return datetime.strptime(raw[:19], fmt)
-        except Exception:
-            pass
-    return None
-
-
-
-
 def resolve_period(period: str | None, start: str | None, days: int, today_override: date | None = None) -> tuple[str | None, int]:
     if not period:
         return start, days
@@ -104,6 +68,14 @@ def agenda_week_range(start_raw: str | None, days: int) -> tuple[date, date]:
     return start, start + timedelta(days=total_days - 1)
 
 
+def summary_cache_key(date_start: date, days: int, filial_id: str | None, definition_json: dict[str, Any] | None) -> str:
+    return f"softhub:dash:summary:{date_start.strftime('%Y-%m-%d')}:{days}:{filial_id or 'all'}:{stable_json_hash(definition_json)}"
+
+
+def agenda_week_cache_key(date_start: date, days: int, filial_id: str | None, definition_json: dict[str, Any] | None) -> str:
+    return f"softhub:dash:agenda:{date_start.strftime('%Y-%m-%d')}:{days}:{filial_id or 'all'}:{stable_json_hash(definition_json)}"
+
+
 def maintenances_range(from_raw: str | None, to_raw: str | None) -> tuple[date, date]:
     default_start = date.today() - timedelta(days=7)
     default_end = date.today() + timedelta(days=7)
@@ -113,27 +85,7 @@ def maintenances_range(from_raw: str | None, to_raw: str | None) -> tuple[date,
 
 
 def resolve_definition(definition_json: dict[str, Any] | None, scope: str) -> dict[str, Any]:
-    install_subject_ids, maintenance_subject_ids = _load_subject_ids()
-
-    d = dict(definition_json or {})
-    category = d.get('category')
-    if category == 'instalacao':
-        d['assunto_ids'] = sorted(install_subject_ids)
-    elif category == 'manutencao':
-        d['assunto_ids'] = sorted(maintenance_subject_ids)
-
-    if not d.get('status_codes'):
-        if scope == 'agenda_week':
-            merged = STATUS_GROUPS['open_like'] + STATUS_GROUPS['scheduled'] + STATUS_GROUPS['done']
-            d['status_codes'] = sorted(set(merged))
-        else:
-            merged = STATUS_GROUPS['open_like'] + STATUS_GROUPS['scheduled']
-            d['status_codes'] = sorted(set(merged))
-
-    if scope == 'maintenances' and not d.get('assunto_ids'):
-        d['assunto_ids'] = sorted(maintenance_subject_ids)
-
-    return d
+    return dict(get_filter_plan(definition_json, scope).definition)
 
 
 def _infer_type(assunto_id: str, install_subject_ids: set[str], maintenance_subject_ids: set[str]) -> str:
@@ -149,33 +101,31 @@ def _extract_customer_name(c: dict[str, Any]) -> str | None:
 
 
 def normalize_row(
-    row: dict[str, Any],
+    row: ServiceOrder | dict[str, Any],
     customer: dict[str, Any] | None,
     install_subject_ids: set[str],
     maintenance_subject_ids: set[str],
 ) -> dict[str, Any]:
+    order = as_service_order(row)
     c = customer or {}
-    scheduled_at = row.get('data_agenda')
-    dt = _parse_dt(scheduled_at)
-    assunto_id = str(row.get('id_assunto') or '')
-    status_code = str(row.get('status') or '')
+    dt = order.scheduled
     return {
-        'id': str(row.get('id') or ''),
-        'scheduled_at': scheduled_at,
-        'date': dt.strftime('%Y-%m-%d') if dt else (scheduled_at or '')[:10],
-        'time': dt.strftime('%H:%M') if dt else None,
-        'status_code': status_code,
-        'status_label': STATUS_LABELS.get(status_code, status_code),
-        'assunto_id': assunto_id,
-        'type': _infer_type(assunto_id, install_subject_ids, maintenance_subject_ids),
-        'id_cliente': str(row.get('id_cliente') or ''),
-        'id_filial': str(row.get('id_filial') or ''),
+        'id': order.id,
+        'scheduled_at': order.data_agenda,
+        'date': dt.date().isoformat() if dt else (order.data_agenda or '')[:10],
+        'time': f'{dt.hour:02d}:{dt.minute:02d}' if dt else None,
+        'status_code': order.status,
+        'status_label': STATUS_LABELS.get(order.status, order.status),
+        'assunto_id': order.assunto_id,
+        'type': _infer_type(order.assunto_id, install_subject_ids, maintenance_subject_ids),
+        'id_cliente': order.id_cliente,
+        'id_filial': order.id_filial,
         'customer_name': _extract_customer_name(c),
         'phone': c.get('telefone') or c.get('whatsapp') or c.get('celular'),
-        'address': row.get('endereco') or c.get('endereco'),
-        'bairro': row.get('bairro') or c.get('bairro'),
-        'cidade': c.get('cidade') or row.get('cidade'),
-        'protocolo': str(row.get('protocolo') or ''),
+        'address': order.endereco or c.get('endereco'),
+        'bairro': order.bairro or c.get('bairro'),
+        'cidade': c.get('cidade') or order.cidade,
+        'protocolo': order.protocolo,
         'source': 'ixc',
     }
 
@@ -213,7 +163,7 @@ def _fetch_order_rows(
     assunto_ids: list[str],
     date_field: str = 'su_oss_chamado.data_agenda',
     filial_id: str | None = None,
-) -> list[dict[str, Any]]:
+) -> list[ServiceOrder]:
     with timer(
         'dashboard.fetch_order_rows',
         logger,
@@ -235,52 +185,23 @@ def _fetch_order_rows(
         if filial_id:
             grids = [grid + [{'TB': TB_OS_ID_FILIAL, 'OP': '=', 'P': filial_id}] for grid in grids]
 
-        seen: set[str] = set()
-        rows: list[dict[str, Any]] = []
-        for grid in grids:
-            for row in adapter.list_service_orders(grid):
-                key = str(row.get('id') or '')
-                if key and key not in seen:
-                    seen.add(key)
-                    rows.append(row)
-        return rows
-
+        return _collect_orders(adapter, grids)
 
-def _fetch_order_rows_without_date(
-    adapter: IXCAdapter,
-    statuses: list[str],
-    assunto_ids: list[str],
-    filial_id: str | None = None,
-) -> list[dict[str, Any]]:
-    status_list = statuses or [None]
-    assunto_list = assunto_ids or [None]
-    grids: list[list[dict[str, str]]] = []
-    for status in status_list:
-        for assunto in assunto_list:
-            grid: list[dict[str, str]] = []
-            if status:
-                grid.append({'TB': TB_OS_STATUS, 'OP': '=', 'P': status})
-            if assunto:
-                grid.append({'TB': TB_OS_ID_ASSUNTO, 'OP': '=', 'P': assunto})
-            grids.append(grid)
 
+def _collect_orders(adapter: IXCAdapter, grids: list[list[dict[str, str]]]) -> list[ServiceOrder]:
     seen: set[str] = set()
-    rows: list[dict[str, Any]] = []
+    orders = ServiceOrderBatch()
     for grid in grids:
-        for row in adapter.list_service_orders(grid):
-            key = str(row.get('id') or '')
-            if key and key not in seen:
-                seen.add(key)
-                rows.append(row)
-    return rows
+        collect_service_orders(adapter.list_service_orders(grid), seen, orders)
+    return orders
 
 
-def _sort_rows(rows: list[dict[str, Any]], field: str, reverse: bool = False) -> list[dict[str, Any]]:
-    def key_fn(row: dict[str, Any]):
-        dt = _parse_dt(row.get(field))
-        if dt is None:
-            return datetime.max if not reverse else datetime.min
-        return dt
+def _sort_rows(rows: list[ServiceOrder], attr: str, reverse: bool = False) -> list[ServiceOrder]:
+    missing = datetime.max if not reverse else datetime.min
+
+    def key_fn(order: ServiceOrder):
+        dt = getattr(order, attr)
+        return missing if dt is None else dt
 
     return sorted(rows, key=key_fn, reverse=reverse)
 
@@ -293,21 +214,17 @@ def fetch_dashboard_items(
     definition_json: dict[str, Any] | None,
     filial_id: str | None = None,
 ) -> list[dict[str, Any]]:
-    install_subject_ids, maintenance_subject_ids = _load_subject_ids()
-    definition = resolve_definition(definition_json, scope)
-    statuses = [str(x) for x in definition.get('status_codes') or []]
-    assunto_ids = [str(x) for x in definition.get('assunto_ids') or []]
+    plan = get_filter_plan(definition_json, scope)
+    statuses = list(plan.status_codes)
+    assunto_ids = list(plan.assunto_ids)
 
     rows = _fetch_order_rows(adapter, date_start, date_end, statuses, assunto_ids, filial_id=filial_id)
 
-    ids = sorted({str(r.get('id_cliente')) for r in rows if r.get('id_cliente')})
+    ids = sorted({r.id_cliente for r in rows if r.id_cliente})
     with timer('dashboard.customer_lookup', logger, {'ids_count': len(ids)}):
         clientes = _clients_to_map(adapter.list_clientes_by_ids(ids)) if ids else {}
 
-    return [
-        normalize_row(r, clientes.get(str(r.get('id_cliente') or '')), install_subject_ids, maintenance_subject_ids)
-        for r in rows
-    ]
+    return [normalize_row(r, clientes.get(r.id_cliente), plan.install_subject_ids, plan.maintenance_subject_ids) for r in rows]
 
 
 def _capacity_entry(limit: int, count: int) -> dict[str, Any]:
@@ -360,6 +277,25 @@ def _build_day_capacity(counts: dict[str, int], day: date, agenda_capacity: dict
     }
 
 
+def _capacity_counts(rows: list[ServiceOrder], date_start: date, total_days: int) -> dict[str, dict[str, int]]:
+    if summary_engine.should_vectorize(len(rows)):
+        per_day = summary_engine.count_by_day_and_filial(rows, 'scheduled', date_start, total_days)
+        return {(date_start + timedelta(days=idx)).strftime('%Y-%m-%d'): counts for idx, counts in enumerate(per_day)}
+
+    counts_by_day: dict[str, dict[str, int]] = {}
+    for row in rows:
+        dt = row.scheduled
+        if not dt:
+            continue
+        day_key = dt.date().isoformat()
+        row_filial = row.id_filial
+        if row_filial not in ('1', '2'):
+            continue
+        counts_by_day.setdefault(day_key, {'1': 0, '2': 0})
+        counts_by_day[day_key][row_filial] += 1
+    return counts_by_day
+
+
 def build_agenda_week(
     adapter: IXCAdapter,
     date_start: date,
@@ -367,7 +303,7 @@ def build_agenda_week(
     definition_json: dict[str, Any] | None,
     filial_id: str | None = None,
 ) -> dict[str, Any]:
-    install_subject_ids, _ = _load_subject_ids()
+    install_subject_ids, _ = load_subject_ids()
     total_days = max(1, min(days, 31))
     date_end = date_start + timedelta(days=total_days - 1)
     items = fetch_dashboard_items(adapter, 'agenda_week', date_start, date_end, definition_json, filial_id=filial_id)
@@ -384,17 +320,7 @@ def build_agenda_week(
         date_field='su_oss_chamado.data_agenda',
         filial_id=filial_id,
     )
-    counts_by_day: dict[str, dict[str, int]] = {}
-    for row in capacity_rows:
-        dt = _parse_dt(row.get('data_agenda'))
-        if not dt:
-            continue
-        day_key = dt.strftime('%Y-%m-%d')
-        row_filial = str(row.get('id_filial') or '')
-        if row_filial not in ('1', '2'):
-            continue
-        counts_by_day.setdefault(day_key, {'1': 0, '2': 0})
-        counts_by_day[day_key][row_filial] += 1
+    counts_by_day = _capacity_counts(capacity_rows, date_start, total_days)
 
     settings = get_settings_payload()
     agenda_capacity = settings.get('agenda_capacity') or {}
@@ -422,14 +348,20 @@ def fetch_maintenance_items(
     date_start: date | None = None,
     date_end: date | None = None,
 ) -> list[dict[str, Any]]:
-    install_subject_ids, maintenance_subject_ids = _load_subject_ids()
-    definition = resolve_definition(definition_json, 'maintenances')
-    assunto_ids = [str(x) for x in (definition.get('assunto_ids') or sorted(maintenance_subject_ids))]
-    statuses = MAINTENANCE_TAB_STATUS.get(tab, MAINTENANCE_TAB_STATUS['open'])
+    return list(iter_maintenance_items(adapter, definition_json, tab=tab, date_start=date_start, date_end=date_end))
+
 
-    selected_statuses = {str(s) for s in definition.get('status_codes') or []}
-    if selected_statuses:
-        statuses = [status for status in statuses if status in selected_statuses]
+def iter_maintenance_items(
+    adapter: IXCAdapter,
+    definition_json: dict[str, Any] | None,
+    tab: str = 'open',
+    date_start: date | None = None,
+    date_end: date | None = None,
+) -> Iterator[dict[str, Any]]:
+    plan = get_filter_plan(definition_json, 'maintenances')
+    tab_key = tab if tab in plan.tab_statuses else 'open'
+    statuses = list(plan.tab_statuses[tab_key])
+    assunto_ids = list(plan.assunto_ids)
 
     if date_start and date_end:
         if tab == 'done':
@@ -439,19 +371,18 @@ def fetch_maintenance_items(
         else:
             rows = _fetch_order_rows(adapter, date_start, date_end, statuses, assunto_ids, date_field='su_oss_chamado.data_agenda')
     else:
-        rows = _fetch_order_rows_without_date(adapter, statuses, assunto_ids)
+        # grids sem data já vêm prontas do plano
+        rows = _collect_orders(adapter, [list(grid) for grid in plan.tab_grids[tab_key]])
 
     if tab == 'done':
-        rows = _sort_rows(rows, 'data_fechamento', reverse=True)
+        rows = _sort_rows(rows, 'closed', reverse=True)
     elif tab == 'open':
-        rows = _sort_rows(rows, 'data_abertura', reverse=False)
+        rows = _sort_rows(rows, 'opened', reverse=False)
 
-    ids = sorted({str(r.get('id_cliente')) for r in rows if r.get('id_cliente')})
+    ids = sorted({r.id_cliente for r in rows if r.id_cliente})
     clientes = _clients_to_map(adapter.list_clientes_by_ids(ids)) if ids else {}
-    return [
-        normalize_row(r, clientes.get(str(r.get('id_cliente') or '')), install_subject_ids, maintenance_subject_ids)
-        for r in rows
-    ]
+    # o fetch roda já aqui (erros do IXC saem antes do primeiro byte); a normalização fica lazy, item a item
+    return (normalize_row(r, clientes.get(r.id_cliente), plan.install_subject_ids, plan.maintenance_subject_ids) for r in rows)
 
 
 def _resolve_today(today: str | None, tz_name: str | None) -> date:
@@ -468,14 +399,14 @@ def _resolve_today(today: str | None, tz_name: str | None) -> date:
 
 
 def _is_same_day(raw: str | None, reference: date) -> bool:
-    dt = _parse_dt(raw)
+    dt = parse_ixc_datetime(raw)
     if not dt:
         return False
     return dt.date() == reference
 
 
 def _is_within_day_bounds(raw: str | None, day_start: datetime, day_end: datetime) -> bool:
-    dt = _parse_dt(raw)
+    dt = parse_ixc_datetime(raw)
     if not dt:
         return False
     return day_start <= dt <= day_end
@@ -487,7 +418,7 @@ def _fetch_rows_for_exact_day(
     day: date,
     assunto_ids: list[str],
     filial_id: str | None = None,
-) -> list[dict[str, Any]]:
+) -> list[ServiceOrder]:
     start = f"{day.strftime('%Y-%m-%d')} 00:00:00"
     next_day = day + timedelta(days=1)
     end = f"{next_day.strftime('%Y-%m-%d')} 00:00:00"
@@ -506,34 +437,26 @@ def _fetch_rows_for_exact_day(
         grids.append(grid)
 
     with timer('dashboard.fetch_rows_for_exact_day', logger, {'date_field': date_field, 'day': day.strftime('%Y-%m-%d'), 'assunto_count': len(assunto_ids), 'filial_id': filial_id}):
-        seen: set[str] = set()
-        rows: list[dict[str, Any]] = []
-        for grid in grids:
-            for row in adapter.list_service_orders(grid):
-                key = str(row.get('id') or '')
-                if key and key not in seen:
-                    seen.add(key)
-                    rows.append(row)
-        return rows
+        return _collect_orders(adapter, grids)
 
 
-def fetch_install_period_rows(adapter: IXCAdapter, date_start: date, date_end: date, install_subject_ids: set[str], filial_id: str | None = None) -> list[dict[str, Any]]:
+def fetch_install_period_rows(adapter: IXCAdapter, date_start: date, date_end: date, install_subject_ids: set[str], filial_id: str | None = None) -> list[ServiceOrder]:
     return _fetch_order_rows(adapter, date_start, date_end, STATUS_GROUPS['open_like'] + STATUS_GROUPS['scheduled'] + STATUS_GROUPS['done'], sorted(install_subject_ids), date_field='su_oss_chamado.data_agenda', filial_id=filial_id)
 
 
-def fetch_maint_period_rows(adapter: IXCAdapter, date_start: date, date_end: date, maintenance_subject_ids: set[str], filial_id: str | None = None) -> list[dict[str, Any]]:
+def fetch_maint_period_rows(adapter: IXCAdapter, date_start: date, date_end: date, maintenance_subject_ids: set[str], filial_id: str | None = None) -> list[ServiceOrder]:
     return _fetch_order_rows(adapter, date_start, date_end, STATUS_GROUPS['open_like'] + STATUS_GROUPS['scheduled'] + STATUS_GROUPS['done'], sorted(maintenance_subject_ids), date_field='su_oss_chamado.data_abertura', filial_id=filial_id)
 
 
-def fetch_maint_open_rows(adapter: IXCAdapter, date_start: date, date_end: date, maintenance_subject_ids: set[str], filial_id: str | None = None) -> list[dict[str, Any]]:
+def fetch_maint_open_rows(adapter: IXCAdapter, date_start: date, date_end: date, maintenance_subject_ids: set[str], filial_id: str | None = None) -> list[ServiceOrder]:
     return _fetch_order_rows(adapter, date_start, date_end, STATUS_GROUPS['open_like'], sorted(maintenance_subject_ids), date_field='su_oss_chamado.data_abertura', filial_id=filial_id)
 
 
-def fetch_maint_done_rows(adapter: IXCAdapter, date_start: date, date_end: date, maintenance_subject_ids: set[str], filial_id: str | None = None) -> list[dict[str, Any]]:
+def fetch_maint_done_rows(adapter: IXCAdapter, date_start: date, date_end: date, maintenance_subject_ids: set[str], filial_id: str | None = None) -> list[ServiceOrder]:
     return _fetch_order_rows(adapter, date_start, date_end, STATUS_GROUPS['done'], sorted(maintenance_subject_ids), date_field='su_oss_chamado.data_fechamento', filial_id=filial_id)
 
 
-def fetch_maint_backlog_rows(adapter: IXCAdapter, maintenance_subject_ids: set[str], filial_id: str | None = None) -> list[dict[str, Any]]:
+def fetch_maint_backlog_rows(adapter: IXCAdapter, maintenance_subject_ids: set[str], filial_id: str | None = None) -> list[ServiceOrder]:
     status_list = STATUS_GROUPS['open_like'] + STATUS_GROUPS['scheduled']
     grids: list[list[dict[str, str]]] = []
     for assunto in sorted(maintenance_subject_ids):
@@ -544,34 +467,26 @@ def fetch_maint_backlog_rows(adapter: IXCAdapter, maintenance_subject_ids: set[s
             ]
             grids.append(grid)
 
-    seen: set[str] = set()
-    rows: list[dict[str, Any]] = []
-    for grid in grids:
-        for row in adapter.list_service_orders(grid):
-            key = str(row.get('id') or '')
-            if key and key not in seen:
-                seen.add(key)
-                rows.append(row)
-    return rows
+    return _collect_orders(adapter, grids)
 
 
-def fetch_maint_opened_today_rows(adapter: IXCAdapter, today_date: date, maintenance_subject_ids: set[str], filial_id: str | None = None) -> list[dict[str, Any]]:
+def fetch_maint_opened_today_rows(adapter: IXCAdapter, today_date: date, maintenance_subject_ids: set[str], filial_id: str | None = None) -> list[ServiceOrder]:
     return _fetch_rows_for_exact_day(adapter, date_field='su_oss_chamado.data_abertura', day=today_date, assunto_ids=sorted(maintenance_subject_ids), filial_id=filial_id)
 
 
-def fetch_install_scheduled_today_rows(adapter: IXCAdapter, today_date: date, install_subject_ids: set[str], filial_id: str | None = None) -> list[dict[str, Any]]:
+def fetch_install_scheduled_today_rows(adapter: IXCAdapter, today_date: date, install_subject_ids: set[str], filial_id: str | None = None) -> list[ServiceOrder]:
     rows = _fetch_rows_for_exact_day(adapter, date_field='su_oss_chamado.data_agenda', day=today_date, assunto_ids=sorted(install_subject_ids), filial_id=filial_id)
-    return [row for row in rows if str(row.get('status') or '') != 'F']
+    return [row for row in rows if row.status != 'F']
 
 
-def fetch_install_done_today_rows(adapter: IXCAdapter, today_date: date, install_subject_ids: set[str], filial_id: str | None = None) -> list[dict[str, Any]]:
+def fetch_install_done_today_rows(adapter: IXCAdapter, today_date: date, install_subject_ids: set[str], filial_id: str | None = None) -> list[ServiceOrder]:
     rows = _fetch_rows_for_exact_day(adapter, date_field='su_oss_chamado.data_fechamento', day=today_date, assunto_ids=sorted(install_subject_ids), filial_id=filial_id)
-    return [row for row in rows if str(row.get('status') or '') == 'F']
+    return [row for row in rows if row.status == 'F']
 
 
-def fetch_maint_done_today_rows(adapter: IXCAdapter, today_date: date, maintenance_subject_ids: set[str], filial_id: str | None = None) -> list[dict[str, Any]]:
+def fetch_maint_done_today_rows(adapter: IXCAdapter, today_date: date, maintenance_subject_ids: set[str], filial_id: str | None = None) -> list[ServiceOrder]:
     rows = _fetch_rows_for_exact_day(adapter, date_field='su_oss_chamado.data_fechamento', day=today_date, assunto_ids=sorted(maintenance_subject_ids), filial_id=filial_id)
-    return [row for row in rows if str(row.get('status') or '') == 'F']
+    return [row for row in rows if row.status == 'F']
 
 
 def compose_dashboard_summary(
@@ -579,39 +494,44 @@ def compose_dashboard_summary(
     total_days: int,
     today_date: date,
     definition_json: dict[str, Any] | None,
-    install_rows: list[dict[str, Any]],
-    maint_period_rows: list[dict[str, Any]],
-    maint_done_rows: list[dict[str, Any]],
-    maint_backlog_rows: list[dict[str, Any]],
-    maint_opened_today_rows: list[dict[str, Any]],
-    maint_done_today_rows: list[dict[str, Any]],
-    install_overdue_rows: list[dict[str, Any]],
+    install_rows: list[ServiceOrder] | list[dict[str, Any]],
+    maint_period_rows: list[ServiceOrder] | list[dict[str, Any]],
+    maint_done_rows: list[ServiceOrder] | list[dict[str, Any]],
+    maint_backlog_rows: list[ServiceOrder] | list[dict[str, Any]],
+    maint_opened_today_rows: list[ServiceOrder] | list[dict[str, Any]],
+    maint_done_today_rows: list[ServiceOrder] | list[dict[str, Any]],
+    install_overdue_rows: list[ServiceOrder] | list[dict[str, Any]],
 ) -> dict[str, Any]:
     date_end = date_start + timedelta(days=total_days - 1)
-    install_rows = _status_filtered(install_rows, definition_json)
-    maint_period_rows = _status_filtered(maint_period_rows, definition_json)
-    maint_done_rows = _status_filtered(maint_done_rows, definition_json)
-
-    scheduled_total = 0
-    completed_today = 0
-    pending_today = 0
-    for row in install_rows:
-        status = str(row.get('status') or '')
-        scheduled_dt = _parse_dt(row.get('data_agenda') or row.get('data_reservada'))
-        closed_dt = _parse_dt(row.get('data_fechamento'))
-
-        if scheduled_dt and scheduled_dt.date() == today_date:
-            scheduled_total += 1
-            if _is_open_installation_status(status):
-                pending_today += 1
-        if closed_dt and closed_dt.date() == today_date and _is_done_status(status):
-            completed_today += 1
+    # linhas em dict (testes, chamadas antigas) viram ServiceOrder aqui; as do fetch já chegam convertidas
+    install_rows = as_service_orders(install_rows)
+    maint_period_rows = as_service_orders(maint_period_rows)
+    maint_done_rows = as_service_orders(maint_done_rows)
+    selected_statuses = _selected_statuses(definition_json)
+
+    if summary_engine.should_vectorize(len(install_rows) + len(maint_period_rows) + len(maint_done_rows)):
+        counters = summary_engine.summary_counters(
+            install_rows,
+            maint_period_rows,
+            maint_done_rows,
+            selected_statuses,
+            date_start,
+            total_days,
+            today_date,
+            is_open_install=_is_open_installation_status,
+            is_done=_is_done_status,
+        )
+    else:
+        counters = _summary_counters(install_rows, maint_period_rows, maint_done_rows, selected_statuses, date_start, total_days, today_date)
 
+    scheduled_total = counters['scheduled_total']
+    completed_today = counters['completed_today']
+    pending_today = counters['pending_today']
     overdue_total = len(install_overdue_rows)
     completion_rate = 0.0 if scheduled_total <= 0 else round(completed_today / scheduled_total, 4)
 
-    finalizadas_periodo = sum(1 for row in install_rows if _is_done_status(str(row.get('status') or '')))
-    pendentes_periodo = max(0, len(install_rows) - finalizadas_periodo)
+    finalizadas_periodo = counters['finalizadas_periodo']
+    pendentes_periodo = max(0, counters['install_total'] - finalizadas_periodo)
 
     return {
         'period': {'start': date_start.strftime('%Y-%m-%d'), 'end': date_end.strftime('%Y-%m-%d')},
@@ -621,15 +541,15 @@ def compose_dashboard_summary(
             'pendentes_hoje': pending_today,
             'finalizadas_periodo': finalizadas_periodo,
             'pendentes_periodo': pendentes_periodo,
-            'total_periodo': len(install_rows),
+            'total_periodo': counters['install_total'],
             'pendentes_instalacao_total': overdue_total,
         },
         'manutencoes': {
             'abertas_total': len(maint_backlog_rows),
             'abertas_hoje': len(maint_opened_today_rows),
             'finalizadas_hoje': len(maint_done_today_rows),
-            'resolvidas_periodo': len(maint_done_rows),
-            'total_periodo': len(maint_period_rows),
+            'resolvidas_periodo': counters['maint_done_total'],
+            'total_periodo': counters['maint_period_total'],
         },
         'today': {
             'date': today_date.strftime('%Y-%m-%d'),
@@ -645,30 +565,80 @@ def compose_dashboard_summary(
                 'closed_today': len(maint_done_today_rows),
             },
         },
-        'installations_scheduled_by_day': _count_by_day(install_rows, 'data_agenda', date_start, total_days),
-        'maint_opened_by_day': _count_by_day(maint_period_rows, 'data_abertura', date_start, total_days),
-        'maint_closed_by_day': _count_by_day(maint_done_rows, 'data_fechamento', date_start, total_days),
+        'installations_scheduled_by_day': _day_series(date_start, counters['installations_scheduled_by_day']),
+        'maint_opened_by_day': _day_series(date_start, counters['maint_opened_by_day']),
+        'maint_closed_by_day': _day_series(date_start, counters['maint_closed_by_day']),
     }
 
 
-def _count_by_day(rows: list[dict[str, Any]], field: str, date_start: date, total_days: int) -> list[dict[str, Any]]:
-    counts = { (date_start + timedelta(days=idx)).strftime('%Y-%m-%d'): 0 for idx in range(total_days) }
+def _summary_counters(
+    install_rows: list[ServiceOrder],
+    maint_period_rows: list[ServiceOrder],
+    maint_done_rows: list[ServiceOrder],
+    selected_statuses: set[str],
+    date_start: date,
+    total_days: int,
+    today_date: date,
+) -> dict[str, Any]:
+    # mesmo contrato de summary_engine.summary_counters, para listas pequenas ou sem numpy
+    install_rows = _status_filtered(install_rows, selected_statuses)
+    maint_period_rows = _status_filtered(maint_period_rows, selected_statuses)
+    maint_done_rows = _status_filtered(maint_done_rows, selected_statuses)
+
+    scheduled_total = 0
+    completed_today = 0
+    pending_today = 0
+    for row in install_rows:
+        status = row.status
+        scheduled_dt = row.scheduled_or_reserved
+        closed_dt = row.closed
+
+        if scheduled_dt and scheduled_dt.date() == today_date:
+            scheduled_total += 1
+            if _is_open_installation_status(status):
+                pending_today += 1
+        if closed_dt and closed_dt.date() == today_date and _is_done_status(status):
+            completed_today += 1
+
+    return {
+        'scheduled_total': scheduled_total,
+        'pending_today': pending_today,
+        'completed_today': completed_today,
+        'finalizadas_periodo': sum(1 for row in install_rows if _is_done_status(row.status)),
+        'install_total': len(install_rows),
+        'maint_period_total': len(maint_period_rows),
+        'maint_done_total': len(maint_done_rows),
+        'installations_scheduled_by_day': _count_by_day(install_rows, 'scheduled', date_start, total_days),
+        'maint_opened_by_day': _count_by_day(maint_period_rows, 'opened', date_start, total_days),
+        'maint_closed_by_day': _count_by_day(maint_done_rows, 'closed', date_start, total_days),
+    }
+
+
+def _count_by_day(rows: list[ServiceOrder], attr: str, date_start: date, total_days: int) -> list[int]:
+    start = date_start.toordinal()
+    counts = [0] * total_days
     for row in rows:
-        dt = _parse_dt(row.get(field))
+        dt = getattr(row, attr)
         if not dt:
             continue
-        key = dt.strftime('%Y-%m-%d')
-        if key in counts:
-            counts[key] += 1
-    return [{'date': day, 'count': counts[day]} for day in sorted(counts.keys())]
+        idx = dt.toordinal() - start
+        if 0 <= idx < total_days:
+            counts[idx] += 1
+    return counts
+
+
+def _day_series(date_start: date, counts: list[int]) -> list[dict[str, Any]]:
+    return [{'date': (date_start + timedelta(days=idx)).strftime('%Y-%m-%d'), 'count': count} for idx, count in enumerate(counts)]
 
 
-def _status_filtered(rows: list[dict[str, Any]], definition_json: dict[str, Any] | None) -> list[dict[str, Any]]:
-    definition = dict(definition_json or {})
-    selected_statuses = {str(s) for s in definition.get('status_codes') or []}
+def _selected_statuses(definition_json: dict[str, Any] | None) -> set[str]:
+    return {str(s) for s in (definition_json or {}).get('status_codes') or []}
+
+
+def _status_filtered(rows: list[ServiceOrder], selected_statuses: set[str]) -> list[ServiceOrder]:
     if not selected_statuses:
         return rows
-    return [row for row in rows if str(row.get('status') or '') in selected_statuses]
+    return [row for row in rows if row.status in selected_statuses]
 
 
 def build_dashboard_summary(
@@ -681,7 +651,7 @@ def build_dashboard_summary(
     tz_name: str | None = DEFAULT_SUMMARY_TZ,
 ) -> dict[str, Any]:
     with timer('dashboard.summary.total', logger, {'date_start': date_start.strftime('%Y-%m-%d'), 'days': days, 'filial_id': filial_id}):
-        install_subject_ids, maintenance_subject_ids = _load_subject_ids()
+        install_subject_ids, maintenance_subject_ids = load_subject_ids()
         total_days = max(1, min(days, 31))
         date_end = date_start + timedelta(days=total_days - 1)
         today_date = _resolve_today(today, tz_name)
@@ -723,16 +693,15 @@ def fetch_installations_pending_rows(
     today_date: date,
     install_subject_ids: set[str],
     filial_id: str | None = None,
-) -> list[dict[str, Any]]:
+) -> list[ServiceOrder]:
     statuses = STATUS_GROUPS['open_like'] + STATUS_GROUPS['scheduled']
-    rows = _fetch_order_rows_without_date(adapter, statuses, sorted(install_subject_ids), filial_id=filial_id)
+    rows = _collect_orders(adapter, [list(grid) for grid in undated_grids(statuses, sorted(install_subject_ids))])
 
-    pending: list[dict[str, Any]] = []
+    pending: list[ServiceOrder] = []
     for row in rows:
-        status = str(row.get('status') or '')
-        if not _is_open_installation_status(status):
+        if not _is_open_installation_status(row.status):
             continue
-        dt = _parse_dt(row.get('data_agenda') or row.get('data_reservada'))
+        dt = row.scheduled_or_reserved
         if not dt:
             continue
         if dt.date() >= today_date:
@@ -747,32 +716,32 @@ def build_installations_pending_response(
     limit: int = 200,
     filial_id: str | None = None,
 ) -> dict[str, Any]:
-    install_subject_ids, _ = _load_subject_ids()
+    install_subject_ids, _ = load_subject_ids()
     rows = fetch_installations_pending_rows(adapter, today_date, install_subject_ids, filial_id=filial_id)
 
-    ids = sorted({str(r.get('id_cliente')) for r in rows if r.get('id_cliente')})
+    ids = sorted({r.id_cliente for r in rows if r.id_cliente})
     clientes = _clients_to_map(adapter.list_clientes_by_ids(ids)) if ids else {}
 
     items: list[dict[str, Any]] = []
     for row in rows:
-        dt = _parse_dt(row.get('data_agenda') or row.get('data_reservada'))
+        dt = row.scheduled_or_reserved
         if not dt:
             continue
-        cid = str(row.get('id_cliente') or '')
+        cid = row.id_cliente
         c = clientes.get(cid, {})
         items.append(
             {
-                'id': str(row.get('id') or ''),
+                'id': row.id,
                 'cliente': c.get('nome') or c.get('razao_social') or f'Cliente {cid}',
                 'id_cliente': cid or None,
-                'bairro_cidade': ', '.join([x for x in [c.get('bairro') or row.get('bairro'), c.get('cidade') or row.get('cidade')] if x]) or None,
-                'assunto_id': str(row.get('id_assunto') or '') or None,
+                'bairro_cidade': ', '.join([x for x in [c.get('bairro') or row.bairro, c.get('cidade') or row.cidade] if x]) or None,
+                'assunto_id': row.assunto_id or None,
                 'categoria': 'instalacao',
-                'status': str(row.get('status') or '') or None,
-                'data_agendada': dt.strftime('%Y-%m-%d'),
-                'hora': dt.strftime('%H:%M') if (dt.hour or dt.minute) else None,
+                'status': row.status or None,
+                'data_agendada': dt.date().isoformat(),
+                'hora': f'{dt.hour:02d}:{dt.minute:02d}' if (dt.hour or dt.minute) else None,
                 'dias_atraso': max(0, (today_date - dt.date()).days),
-                'filial': str(row.get('id_filial') or '') or None,
+                'filial': row.id_filial or None,
             }
         )
 
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import threading
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from app.services.ixc_grid_builder import TB_OS_ID_ASSUNTO, TB_OS_STATUS
+from app.services.settings import get_settings_snapshot
+from app.utils.cache import stable_json_hash
+
+# Filtros da dashboard compilados uma vez em um plano imutável (status/assuntos resolvidos, status por aba e
+# grids sem data). O cache é por conteúdo da definição + geração das settings: filtro salvo editado tem
+# outro hash, e settings novas (assuntos de instalação/manutenção) geram outra chave.
+
+STATUS_GROUPS = {
+    'open_like': ['A', 'AN', 'EN', 'AS', 'DS', 'EX', 'RAG'],
+    'scheduled': ['AG', 'RAG', 'AS', 'DS', 'EX'],
+    'done': ['F'],
+}
+MAINTENANCE_TAB_STATUS = {
+    'open': ['A', 'AN', 'EN', 'AS', 'DS', 'EX', 'AG', 'RAG'],
+    'scheduled': ['AG', 'RAG'],
+    'done': ['F'],
+}
+DEFAULT_INSTALL_ASSUNTOS = {'1', '15'}
+DEFAULT_MAINTENANCE_ASSUNTOS = {'17', '34', '31'}
+
+PLAN_CACHE_SIZE = 256
+
+Grid = tuple[dict[str, str], ...]
+
+
+def _subject_ids(settings: dict[str, Any]) -> tuple[frozenset[str], frozenset[str]]:
+    install = settings.get('installation_subject_ids') or settings.get('subject_groups', {}).get('instalacao') or sorted(DEFAULT_INSTALL_ASSUNTOS)
+    maintenance = (
+        settings.get('maintenance_subject_ids')
+        or settings.get('subject_groups', {}).get('manutencao')
+        or sorted(DEFAULT_MAINTENANCE_ASSUNTOS)
+    )
+    return frozenset(str(x) for x in install), frozenset(str(x) for x in maintenance)
+
+
+_subjects_lock = threading.Lock()
+_subjects: tuple[int, tuple[frozenset[str], frozenset[str]]] | None = None
+
+
+def load_subject_ids() -> tuple[frozenset[str], frozenset[str]]:
+    global _subjects
+    snapshot = get_settings_snapshot()
+    cached = _subjects
+    if cached is not None and cached[0] == snapshot.generation:
+        return cached[1]
+    with _subjects_lock:
+        _subjects = (snapshot.generation, _subject_ids(snapshot.payload))
+        return _subjects[1]
+
+
+def undated_grids(statuses: list[str] | tuple[str, ...], assunto_ids: list[str] | tuple[str, ...]) -> tuple[Grid, ...]:
+    grids: list[Grid] = []
+    for status in statuses or [None]:
+        for assunto in assunto_ids or [None]:
+            grid: list[dict[str, str]] = []
+            if status:
+                grid.append({'TB': TB_OS_STATUS, 'OP': '=', 'P': status})
+            if assunto:
+                grid.append({'TB': TB_OS_ID_ASSUNTO, 'OP': '=', 'P': assunto})
+            grids.append(tuple(grid))
+    return tuple(grids)
+
+
+@dataclass(frozen=True, slots=True)
+class FilterPlan:
+    scope: str
+    # definição resolvida, no mesmo formato de antes (status_codes/assunto_ids preenchidos); somente leitura
+    definition: Mapping[str, Any]
+    status_codes: tuple[str, ...]
+    assunto_ids: tuple[str, ...]
+    status_set: frozenset[str]
+    assunto_set: frozenset[str]
+    install_subject_ids: frozenset[str]
+    maintenance_subject_ids: frozenset[str]
+    # aba de manutenções -> status da aba já cruzados com os do filtro, e as grids sem data correspondentes
+    tab_statuses: Mapping[str, tuple[str, ...]]
+    tab_grids: Mapping[str, tuple[Grid, ...]]
+
+
+def compile_filter_plan(
+    definition_json: dict[str, Any] | None,
+    scope: str,
+    install_subject_ids: frozenset[str],
+    maintenance_subject_ids: frozenset[str],
+) -> FilterPlan:
+    d = dict(definition_json or {})
+    category = d.get('category')
+    if category == 'instalacao':
+        d['assunto_ids'] = sorted(install_subject_ids)
+    elif category == 'manutencao':
+        d['assunto_ids'] = sorted(maintenance_subject_ids)
+
+    if not d.get('status_codes'):
+        if scope == 'agenda_week':
+            merged = STATUS_GROUPS['open_like'] + STATUS_GROUPS['scheduled'] + STATUS_GROUPS['done']
+            d['status_codes'] = sorted(set(merged))
+        else:
+            merged = STATUS_GROUPS['open_like'] + STATUS_GROUPS['scheduled']
+            d['status_codes'] = sorted(set(merged))
+
+    if scope == 'maintenances' and not d.get('assunto_ids'):
+        d['assunto_ids'] = sorted(maintenance_subject_ids)
+
+    status_codes = tuple(str(x) for x in d.get('status_codes') or [])
+    assunto_ids = tuple(str(x) for x in d.get('assunto_ids') or [])
+    status_set = frozenset(status_codes)
+
+    tab_statuses: dict[str, tuple[str, ...]] = {}
+    tab_grids: dict[str, tuple[Grid, ...]] = {}
+    if scope == 'maintenances':
+        for tab, statuses in MAINTENANCE_TAB_STATUS.items():
+            selected = tuple(s for s in statuses if s in status_set) if status_set else tuple(statuses)
+            tab_statuses[tab] = selected
+            tab_grids[tab] = undated_grids(selected, assunto_ids)
+
+    return FilterPlan(
+        scope=scope,
+        definition=MappingProxyType(d),
+        status_codes=status_codes,
+        assunto_ids=assunto_ids,
+        status_set=status_set,
+        assunto_set=frozenset(assunto_ids),
+        install_subject_ids=install_subject_ids,
+        maintenance_subject_ids=maintenance_subject_ids,
+        tab_statuses=MappingProxyType(tab_statuses),
+        tab_grids=MappingProxyType(tab_grids),
+    )
+
+
+_plans: OrderedDict[tuple[str, str, int], FilterPlan] = OrderedDict()
+_plans_lock = threading.Lock()
+
+
+def get_filter_plan(definition_json: dict[str, Any] | None, scope: str) -> FilterPlan:
+    generation = get_settings_snapshot().generation
+    key = (stable_json_hash(definition_json), scope, generation)
+    with _plans_lock:
+        plan = _plans.get(key)
+        if plan is not None:
+            _plans.move_to_end(key)
+            return plan
+
+    install_subject_ids, maintenance_subject_ids = load_subject_ids()
+    plan = compile_filter_plan(definition_json, scope, install_subject_ids, maintenance_subject_ids)
+    with _plans_lock:
+        _plans[key] = plan
+        while len(_plans) > PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+    return plan
+
+
+def clear_filter_plans() -> None:
+    with _plans_lock:
+        _plans.clear()
@@ -1,8 +1,56 @@
 from __future__ import annotations
 
+import threading
+from time import monotonic
+
+import anyio
 from sqlalchemy import delete, select
 
-from app.db import SavedFilter, SessionLocal
+from app.config import get_settings
+from app.db import SavedFilter, SessionLocal, async_db_enabled, get_async_sessionmaker
+from app.utils.cache import bump_version_stamp, read_version_stamp
+
+# carimbo compartilhado entre processos: update/delete de filtro salvo incrementa e os caches em memória esvaziam
+FILTERS_VERSION_KEY = 'softhub:filters:version'
+
+_definitions: dict[str, dict] = {}
+_definitions_version: str | None = None
+_definitions_checked_at = 0.0
+# muda a cada invalidação (local ou por carimbo novo); leitura no banco que atravessou uma delas não entra no cache
+_definitions_generation = 0
+_definitions_lock = threading.Lock()
+
+
+def _sync_definitions() -> None:
+    global _definitions_version, _definitions_checked_at, _definitions_generation
+    if monotonic() - _definitions_checked_at < get_settings().app_settings_refresh_s:
+        return
+    with _definitions_lock:
+        version = read_version_stamp(FILTERS_VERSION_KEY)
+        if version is None or version != _definitions_version:
+            _definitions.clear()
+            _definitions_generation += 1
+        _definitions_version = version
+        _definitions_checked_at = monotonic()
+
+
+def invalidate_saved_filter(filter_id: str) -> None:
+    global _definitions_version, _definitions_generation
+    with _definitions_lock:
+        _definitions.pop(filter_id, None)
+        _definitions_generation += 1
+        _definitions_version = bump_version_stamp(FILTERS_VERSION_KEY)
+
+
+def _cached_definition(filter_id: str) -> tuple[dict | None, int]:
+    with _definitions_lock:
+        return _definitions.get(filter_id), _definitions_generation
+
+
+def _store_definition(filter_id: str, definition: dict, generation: int) -> None:
+    with _definitions_lock:
+        if generation == _definitions_generation:
+            _definitions[filter_id] = definition
 
 
 def list_saved_filters(scope: str) -> list[SavedFilter]:
@@ -35,16 +83,43 @@ def update_saved_filter(filter_id: str, name: str, scope: str, definition_json:
         row.definition_json = definition_json
         session.commit()
         session.refresh(row)
-        return row
+    invalidate_saved_filter(filter_id)
+    return row
 
 
 def delete_saved_filter(filter_id: str) -> bool:
     with SessionLocal() as session:
         result = session.execute(delete(SavedFilter).where(SavedFilter.id == filter_id))
         session.commit()
-        return bool(result.rowcount)
+    invalidate_saved_filter(filter_id)
+    return bool(result.rowcount)
 
 
 def get_saved_filter_definition(filter_id: str) -> dict | None:
+    # definição compartilhada entre requests (somente leitura); id inexistente não entra no cache
+    _sync_definitions()
+    definition, generation = _cached_definition(filter_id)
+    if definition is not None:
+        return definition
     row = get_saved_filter(filter_id)
-    return row.definition_json if row else None
+    if row is None:
+        return None
+    _store_definition(filter_id, row.definition_json, generation)
+    return row.definition_json
+
+
+async def get_saved_filter_definition_async(filter_id: str) -> dict | None:
+    # rotas async: com DB_ASYNC_ENABLED o miss vai pelo AsyncSession; sem ele, a versão sync roda numa thread
+    if not async_db_enabled():
+        return await anyio.to_thread.run_sync(get_saved_filter_definition, filter_id)
+    # conferir o carimbo é uma leitura síncrona no Redis
+    await anyio.to_thread.run_sync(_sync_definitions)
+    definition, generation = _cached_definition(filter_id)
+    if definition is not None:
+        return definition
+    async with get_async_sessionmaker()() as session:
+        definition = await session.scalar(select(SavedFilter.definition_json).where(SavedFilter.id == filter_id))
+    if definition is None:
+        return None
+    _store_definition(filter_id, definition, generation)
+    return definition
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+from datetime import date, datetime, timezone
+from functools import lru_cache
+import json
+import logging
+import threading
+from time import monotonic
+from typing import Any, Callable
+from uuid import uuid4
+
+from celery import Celery
+import redis
+
+from app.adapters.ixc_adapter import IXCAdapter
+from app.config import get_settings
+from app.services.billing_enrich import enrich_billing_cases
+from app.services.billing_sync import sync_billing_cases
+from app.services.billing_tickets import reconcile_tickets
+from app.utils.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+JOB_KEY_PREFIX = 'softhub:job:'
+JOB_LOCK_PREFIX = 'softhub:job-lock:'
+JOB_TTL_S = 24 * 3600
+PROGRESS_MIN_INTERVAL_S = 0.5
+LOCK_RENEW_MIN_S = 1.0
+
+# Lock por tipo de job no Redis, com o job_id como dono. Tomar, renovar e soltar são scripts Lua:
+# GET + SET/DEL separados deixam outro job pegar o lock no meio e ter o lock dele apagado.
+# KEYS[1] = lock; ARGV[1] = job_id, ARGV[2] = ttl. Devolve '' quando o lock é nosso, senão o dono atual.
+LOCK_ACQUIRE_LUA = """
+local holder = redis.call('GET', KEYS[1])
+if not holder then
+  redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+  return ''
+end
+if holder == ARGV[1] then
+  redis.call('EXPIRE', KEYS[1], ARGV[2])
+  return ''
+end
+return holder
+"""
+# ARGV[1] = dono esperado, ARGV[2] = novo dono, ARGV[3] = ttl; só troca se o lock ainda for do esperado
+LOCK_REPLACE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+  return 1
+end
+return 0
+"""
+# ARGV[1] = job_id, ARGV[2] = ttl
+LOCK_EXTEND_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+LOCK_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+JOB_TASK_NAMES = {
+    'billing_sync': 'softhub.jobs.billing_sync',
+    'billing_enrich': 'softhub.jobs.billing_enrich',
+    'billing_reconcile': 'softhub.jobs.billing_reconcile',
+}
+
+
+class JobEnqueueError(RuntimeError):
+    pass
+
+
+@lru_cache
+def get_celery_producer() -> Celery:
+    settings = get_settings()
+    return Celery('softhub', broker=settings.redis_url, backend=settings.celery_result_backend)
+
+
+def _job_key(job_id: str) -> str:
+    return f'{JOB_KEY_PREFIX}{job_id}'
+
+
+def _lock_key(kind: str) -> str:
+    return f'{JOB_LOCK_PREFIX}{kind}'
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def get_job(job_id: str) -> dict[str, Any] | None:
+    raw = get_redis().get(_job_key(job_id))
+    if not raw:
+        return None
+    return json.loads(raw)
+
+
+def _save_job(job: dict[str, Any]) -> None:
+    get_redis().set(_job_key(job['id']), json.dumps(job, ensure_ascii=False, separators=(',', ':')), ex=JOB_TTL_S)
+
+
+def update_job(job_id: str, **fields: Any) -> dict[str, Any] | None:
+    job = get_job(job_id)
+    if job is None:
+        return None
+    job.update(fields)
+    _save_job(job)
+    return job
+
+
+def _lock_script(source: str, kind: str, *args: Any) -> Any:
+    return get_redis().register_script(source)(keys=[_lock_key(kind)], args=list(args))
+
+
+def _acquire_lock(kind: str, job_id: str) -> str | None:
+    # retorna None quando o lock é nosso, senão o job_id que o detém
+    holder = _lock_script(LOCK_ACQUIRE_LUA, kind, job_id, get_settings().job_lock_ttl_s)
+    return holder or None
+
+
+def _replace_lock(kind: str, holder: str, job_id: str) -> bool:
+    return bool(_lock_script(LOCK_REPLACE_LUA, kind, holder, job_id, get_settings().job_lock_ttl_s))
+
+
+def _extend_lock(kind: str, job_id: str) -> bool:
+    return bool(_lock_script(LOCK_EXTEND_LUA, kind, job_id, get_settings().job_lock_ttl_s))
+
+
+def _release_lock(kind: str, job_id: str) -> None:
+    _lock_script(LOCK_RELEASE_LUA, kind, job_id)
+
+
+def _keep_lock_alive(kind: str, job_id: str, stop: threading.Event) -> None:
+    # renova o TTL enquanto o job roda: um sync maior que JOB_LOCK_TTL_S não deixa outro começar no meio
+    interval_s = max(LOCK_RENEW_MIN_S, get_settings().job_lock_ttl_s / 3)
+    while not stop.wait(interval_s):
+        try:
+            if not _extend_lock(kind, job_id):
+                logger.warning('job lock lost id=%s kind=%s', job_id, kind)
+                return
+        except redis.RedisError as exc:
+            logger.warning('job lock renew failed id=%s kind=%s err=%s', job_id, kind, exc)
+
+
+def enqueue_job(kind: str, params: dict[str, Any]) -> dict[str, Any]:
+    if kind not in JOB_TASK_NAMES:
+        raise ValueError(f'Unknown job kind: {kind}')
+
+    job_id = str(uuid4())
+    job = {
+        'id': job_id,
+        'kind': kind,
+        'status': 'queued',
+        'params': params,
+        'progress': {'done': 0, 'total': None},
+        'result': None,
+        'error': None,
+        'created_at': _now_iso(),
+        'started_at': None,
+        'finished_at': None,
+    }
+    try:
+        holder = _acquire_lock(kind, job_id)
+        while holder is not None:
+            running = get_job(holder)
+            if running is not None:
+                return {**running, 'deduplicated': True}
+            # lock órfão (job expirou): assume o lock, desde que ninguém tenha trocado o dono no meio
+            if _replace_lock(kind, holder, job_id):
+                break
+            holder = _acquire_lock(kind, job_id)
+        _save_job(job)
+    except redis.RedisError as exc:
+        raise JobEnqueueError(str(exc)) from exc
+
+    try:
+        get_celery_producer().send_task(JOB_TASK_NAMES[kind], kwargs={'job_id': job_id, 'params': params})
+    except Exception as exc:
+        _release_lock(kind, job_id)
+        update_job(job_id, status='failed', error=f'enqueue failed: {exc}', finished_at=_now_iso())
+        raise JobEnqueueError(str(exc)) from exc
+    return {**job, 'deduplicated': False}
+
+
+def _progress_reporter(job_id: str) -> Callable[[int, int], None]:
+    last_flush = 0.0
+
+    def report(done: int, total: int) -> None:
+        nonlocal last_flush
+        now = monotonic()
+        if done < total and now - last_flush < PROGRESS_MIN_INTERVAL_S:
+            return
+        last_flush = now
+        update_job(job_id, progress={'done': done, 'total': total})
+
+    return report
+
+
+def _run_billing_sync(adapter: IXCAdapter, params: dict[str, Any], progress: Callable[[int, int], None]) -> dict[str, Any]:
+    due_from = params.get('due_from')
+    result = sync_billing_cases(
+        adapter=adapter,
+        due_from=date.fromisoformat(due_from) if due_from else None,
+        only_open=bool(params.get('only_open', True)),
+        filial_id=params.get('filial_id'),
+        limit_pages=int(params.get('limit_pages', 5)),
+        rp=int(params.get('rp', 500)),
+        progress=progress,
+    )
+    return asdict(result)
+
+
+def _run_billing_enrich(adapter: IXCAdapter, params: dict[str, Any], progress: Callable[[int, int], None]) -> dict[str, Any]:
+    result = enrich_billing_cases(
+        adapter=adapter,
+        limit=int(params.get('limit', 2000)),
+        only_missing=bool(params.get('only_missing', True)),
+        progress=progress,
+    )
+    return asdict(result)
+
+
+def _run_billing_reconcile(adapter: IXCAdapter, params: dict[str, Any], progress: Callable[[int, int], None]) -> dict[str, Any]:
+    return reconcile_tickets(adapter=adapter, limit=int(params.get('limit', 1000)), progress=progress)
+
+
+JOB_RUNNERS: dict[str, Callable[[IXCAdapter, dict[str, Any], Callable[[int, int], None]], dict[str, Any]]] = {
+    'billing_sync': _run_billing_sync,
+    'billing_enrich': _run_billing_enrich,
+    'billing_reconcile': _run_billing_reconcile,
+}
+
+
+def run_job(job_id: str, kind: str, params: dict[str, Any], adapter: IXCAdapter) -> dict[str, Any] | None:
+    holder = _acquire_lock(kind, job_id)
+    if holder is not None:
+        logger.info('job skipped: %s already running as %s', kind, holder)
+        update_job(job_id, status='skipped', error=f'{kind} already running as job {holder}', finished_at=_now_iso())
+        return None
+
+    update_job(job_id, status='running', started_at=_now_iso())
+    stop = threading.Event()
+    keeper = threading.Thread(target=_keep_lock_alive, args=(kind, job_id, stop), name=f'job-lock-{kind}', daemon=True)
+    keeper.start()
+    try:
+        result = JOB_RUNNERS[kind](adapter, params, _progress_reporter(job_id))
+    except Exception as exc:
+        logger.exception('job failed id=%s kind=%s', job_id, kind)
+        update_job(job_id, status='failed', error=str(exc), finished_at=_now_iso())
+        raise
+    finally:
+        stop.set()
+        keeper.join()
+        _release_lock(kind, job_id)
+
+    update_job(job_id, status='succeeded', result=result, finished_at=_now_iso())
+    return result
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from typing import Any
+
+from app.clients.ixc_client import IXCClientError, IXCUnavailableError
+from app.config import get_settings
+from app.models.oss import OSS_MESSAGES_BATCH_LIMIT
+from app.utils.cache import cache_get_json, cache_get_many_json, cache_set_many_json
+
+# Mensagens de OS em cache por OS. OS finalizada não recebe mensagem nova, então fica em cache por dias;
+# as demais ficam pouco tempo para o drawer continuar mostrando o andamento. Busca que falhou no IXC
+# nunca vai para o cache e volta marcada com error=True, para a tela não confundir com OS sem mensagens.
+
+OSS_MESSAGES_CACHE_PREFIX = 'softhub:oss:msgs:'
+FINAL_STATUSES = {'F'}
+
+
+def oss_messages_cache_key(id_chamado: str) -> str:
+    return f'{OSS_MESSAGES_CACHE_PREFIX}{id_chamado}'
+
+
+def _ttl_s(registros: list[dict[str, Any]]) -> int:
+    # só o status gravado no IXC (última mensagem) decide o TTL longo; o status que a tela manda pode estar velho
+    settings = get_settings()
+    status = str(registros[-1].get('status') or '') if registros else ''
+    return settings.oss_messages_final_ttl_s if status.upper() in FINAL_STATUSES else settings.oss_messages_ttl_s
+
+
+def _payload(registros: list[dict[str, Any]]) -> dict[str, Any]:
+    registros = sorted(registros, key=lambda r: str(r.get('data') or ''))
+    return {'total': len(registros), 'registros': registros}
+
+
+def _failed_payload() -> dict[str, Any]:
+    return {'total': 0, 'registros': [], 'error': True}
+
+
+def get_oss_mensagens(adapter, id_chamado: str) -> dict[str, Any]:
+    key = oss_messages_cache_key(id_chamado)
+    cached = cache_get_json(key)
+    if cached is not None:
+        return cached
+    try:
+        payload = _payload(adapter.list_oss_mensagens(id_chamado))
+    except IXCUnavailableError:
+        raise
+    except IXCClientError:
+        # o adapter já logou a falha
+        return _failed_payload()
+    cache_set_many_json({key: (payload, _ttl_s(payload['registros']))})
+    return payload
+
+
+def get_oss_mensagens_batch(adapter, ids: list[str]) -> dict[str, dict[str, Any]]:
+    # Um MGET no Redis e uma consulta em lote no IXC só para os ausentes.
+    ids = [i for i in dict.fromkeys(str(i).strip() for i in ids) if i]
+    keys = {i: oss_messages_cache_key(i) for i in ids}
+    cached = cache_get_many_json(list(keys.values()))
+    result = {i: cached[keys[i]] for i in ids if keys[i] in cached}
+
+    missing = [i for i in ids if i not in result]
+    if missing:
+        fetched = adapter.list_oss_mensagens_batch(missing)
+        entries: dict[str, tuple[dict[str, Any], int]] = {}
+        for id_chamado in missing:
+            # id fora do retorno = busca falhou no IXC: marca o erro e não grava
+            if id_chamado not in fetched:
+                result[id_chamado] = _failed_payload()
+                continue
+            payload = _payload(fetched[id_chamado])
+            result[id_chamado] = payload
+            entries[keys[id_chamado]] = (payload, _ttl_s(payload['registros']))
+        cache_set_many_json(entries)
+    return {i: result[i] for i in ids}
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+import sys
+import threading
+from typing import Any, Iterable
+
+from app.utils.timestamps import day_ordinal, parse_ixc_datetime
+
+# Representação interna de OS (su_oss_chamado) para a dashboard: montada uma vez quando a linha sai
+# do adapter, com datas já convertidas e códigos internados; vira dict só na saída da API.
+
+
+def _code(value: Any) -> str:
+    # status/assunto/filial têm poucos valores distintos: todas as OS compartilham a mesma string
+    return sys.intern(str(value or ''))
+
+
+# status -> inteiro estável no processo, para colunas numéricas (summary_engine); o IXC tem poucos status
+STATUS_VOCAB: list[str] = []
+_status_codes: dict[str, int] = {}
+_status_lock = threading.Lock()
+
+
+def status_code(status: str) -> int:
+    code = _status_codes.get(status)
+    if code is None:
+        with _status_lock:
+            code = _status_codes.get(status)
+            if code is None:
+                code = len(STATUS_VOCAB)
+                STATUS_VOCAB.append(status)
+                _status_codes[status] = code
+    return code
+
+
+# filial -> código numérico da coluna: só '1' e '2' exatos (como _capacity_counts); '01', ' 1' etc. viram 0
+FILIAL_CODES = {'1': 1, '2': 2}
+
+
+def filial_code(id_filial: str) -> int:
+    return FILIAL_CODES.get(id_filial, 0)
+
+
+@dataclass(slots=True, eq=False)
+class ServiceOrder:
+    id: str
+    status: str
+    assunto_id: str
+    id_cliente: str
+    id_filial: str
+    protocolo: str
+    data_agenda: str | None
+    scheduled: datetime | None
+    scheduled_or_reserved: datetime | None
+    opened: datetime | None
+    closed: datetime | None
+    status_code: int
+    scheduled_day: int
+    scheduled_or_reserved_day: int
+    opened_day: int
+    closed_day: int
+    endereco: Any = None
+    bairro: Any = None
+    cidade: Any = None
+
+    @classmethod
+    def from_row(cls, row: dict[str, Any]) -> ServiceOrder:
+        data_agenda = row.get('data_agenda')
+        status = _code(row.get('status'))
+        scheduled = parse_ixc_datetime(data_agenda)
+        scheduled_or_reserved = scheduled if data_agenda else parse_ixc_datetime(row.get('data_reservada'))
+        opened = parse_ixc_datetime(row.get('data_abertura'))
+        closed = parse_ixc_datetime(row.get('data_fechamento'))
+        return cls(
+            str(row.get('id') or ''),
+            status,
+            _code(row.get('id_assunto')),
+            str(row.get('id_cliente') or ''),
+            _code(row.get('id_filial')),
+            str(row.get('protocolo') or ''),
+            data_agenda,
+            scheduled,
+            scheduled_or_reserved,
+            opened,
+            closed,
+            status_code(status),
+            day_ordinal(scheduled),
+            day_ordinal(scheduled_or_reserved),
+            day_ordinal(opened),
+            day_ordinal(closed),
+            row.get('endereco'),
+            row.get('bairro'),
+            row.get('cidade'),
+        )
+
+
+COLUMN_ATTRS = ('status_code', 'scheduled_day', 'scheduled_or_reserved_day', 'opened_day', 'closed_day')
+
+
+class ServiceOrderBatch(list):
+    # lista de ServiceOrder que já guarda as colunas inteiras preenchidas na coleta; o summary_engine
+    # lê direto daqui em vez de percorrer os objetos de novo (só vale enquanto nada mexer na lista)
+    def __init__(self) -> None:
+        super().__init__()
+        self.columns: dict[str, array] = {attr: array('i') for attr in (*COLUMN_ATTRS, 'filial_code')}
+
+    def add(self, order: ServiceOrder) -> None:
+        self.append(order)
+        columns = self.columns
+        columns['status_code'].append(order.status_code)
+        columns['scheduled_day'].append(order.scheduled_day)
+        columns['scheduled_or_reserved_day'].append(order.scheduled_or_reserved_day)
+        columns['opened_day'].append(order.opened_day)
+        columns['closed_day'].append(order.closed_day)
+        columns['filial_code'].append(filial_code(order.id_filial))
+
+    def columns_in_sync(self) -> bool:
+        return len(self.columns['status_code']) == len(self)
+
+
+def as_service_order(row: ServiceOrder | dict[str, Any]) -> ServiceOrder:
+    return row if isinstance(row, ServiceOrder) else ServiceOrder.from_row(row)
+
+
+def as_service_orders(rows: Iterable[ServiceOrder | dict[str, Any]]) -> list[ServiceOrder]:
+    if isinstance(rows, ServiceOrderBatch):
+        return rows
+    return [row if isinstance(row, ServiceOrder) else ServiceOrder.from_row(row) for row in rows]
+
+
+def collect_service_orders(rows: Iterable[dict[str, Any]], seen: set[str], out: ServiceOrderBatch) -> None:
+    # várias grids podem devolver a mesma OS: deduplica pelo id antes de montar o registro
+    for row in rows:
+        key = str(row.get('id') or '')
+        if key and key not in seen:
+            seen.add(key)
+            out.add(ServiceOrder.from_row(row))
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
 from copy import deepcopy
+from dataclasses import dataclass
+from itertools import count
+import threading
+from time import monotonic
 
 from sqlalchemy import select
 
+from app.config import get_settings
 from app.db import SessionLocal, Setting
+from app.utils.cache import bump_version_stamp, read_version_stamp
 
 SETTINGS_KEY = 'app_settings'
+# carimbo de versão compartilhado (API + worker): cada update incrementa e os outros processos recarregam
+SETTINGS_VERSION_KEY = 'softhub:settings:version'
 DEFAULT_SETTINGS = {
     'default_filters': {'agenda': None, 'manutencoes': None},
     'installation_subject_ids': ['1', '15'],
@@ -64,33 +72,71 @@ def _merge_defaults(payload: dict | None) -> dict:
     return merged
 
 
-def get_settings_payload() -> dict:
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    payload: dict
+    version: str | None
+    checked_at: float
+    # muda a cada payload novo neste processo; chave para caches derivados das settings (filter_plans)
+    generation: int
+
+
+_snapshot: SettingsSnapshot | None = None
+_snapshot_lock = threading.Lock()
+_generations = count(1)
+
+
+def _load_payload() -> dict:
+    # normaliza só na leitura: linha ausente ou JSON antigo viram os defaults sem gravar nada
     with SessionLocal() as session:
         row = session.scalar(select(Setting).where(Setting.key == SETTINGS_KEY))
-        if row is None:
-            row = Setting(key=SETTINGS_KEY, value_json=deepcopy(DEFAULT_SETTINGS))
-            session.add(row)
-            session.commit()
-            session.refresh(row)
-            return row.value_json
+        return _merge_defaults(row.value_json if row is not None else None)
+
+
+def get_settings_snapshot() -> SettingsSnapshot:
+    # snapshot em memória, compartilhado entre requests: quem chama não deve alterar o payload.
+    # A cada APP_SETTINGS_REFRESH_S confere o carimbo no Redis e só vai ao banco se a versão mudou.
+    global _snapshot
+    snapshot = _snapshot
+    interval = get_settings().app_settings_refresh_s
+    if snapshot is not None and monotonic() - snapshot.checked_at < interval:
+        return snapshot
+
+    with _snapshot_lock:
+        snapshot = _snapshot
+        if snapshot is not None and monotonic() - snapshot.checked_at < interval:
+            return snapshot
+        # versão lida antes do banco: um update concorrente deixa o carimbo à frente e força outro reload
+        version = read_version_stamp(SETTINGS_VERSION_KEY)
+        if snapshot is not None and version is not None and version == snapshot.version:
+            _snapshot = SettingsSnapshot(snapshot.payload, version, monotonic(), snapshot.generation)
+        else:
+            _snapshot = SettingsSnapshot(_load_payload(), version, monotonic(), next(_generations))
+        return _snapshot
+
+
+def get_settings_payload() -> dict:
+    return get_settings_snapshot().payload
+
 
-        merged = _merge_defaults(row.value_json)
-        if merged != row.value_json:
-            row.value_json = merged
-            session.commit()
-            session.refresh(row)
-        return row.value_json
+def invalidate_settings_snapshot() -> None:
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
 
 
 def update_settings_payload(payload: dict) -> dict:
+    global _snapshot
     normalized = _merge_defaults(payload)
     with SessionLocal() as session:
         row = session.scalar(select(Setting).where(Setting.key == SETTINGS_KEY))
         if row is None:
-            row = Setting(key=SETTINGS_KEY, value_json=normalized)
-            session.add(row)
+            session.add(Setting(key=SETTINGS_KEY, value_json=normalized))
         else:
             row.value_json = normalized
         session.commit()
-        session.refresh(row)
-        return row.value_json
+
+    version = bump_version_stamp(SETTINGS_VERSION_KEY)
+    with _snapshot_lock:
+        _snapshot = SettingsSnapshot(normalized, version, monotonic(), next(_generations))
+    return normalized
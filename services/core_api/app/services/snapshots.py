@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+import logging
+from time import perf_counter
+from typing import Any
+
+from app.adapters.ixc_adapter import IXCAdapter
+from app.config import get_settings
+from app.services.billing import BILLING_OPEN_CACHE_KEY, build_billing_open_response
+from app.services.dashboard import (
+    DEFAULT_SUMMARY_TZ,
+    _resolve_today,
+    agenda_week_cache_key,
+    build_agenda_week,
+    build_dashboard_summary,
+    resolve_period,
+    summary_cache_key,
+)
+from app.utils.cache import cache_set_json
+from app.utils.profiling import scoped_request_trace, timer
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_SNAPSHOT_PERIODS = ('today', '7d', '14d', '30d')
+SNAPSHOT_FILIAIS: tuple[str | None, ...] = (None, '1', '2')
+AGENDA_SNAPSHOT_DAYS = 7
+AGENDA_SNAPSHOT_WEEKS = 2
+# mesmo filtro que o webapp envia ao abrir a agenda
+AGENDA_SNAPSHOT_DEFINITION: dict[str, Any] = {'category': 'instalacao'}
+
+
+@dataclass
+class SnapshotRefreshResult:
+    written: int
+    failed: int
+    duration_ms: float
+
+
+def _snapshot_ttl_s() -> int:
+    settings = get_settings()
+    if settings.dashboard_snapshot_interval_s >= settings.dashboard_cache_ttl_s:
+        logger.warning(
+            'snapshot interval (%ss) >= cache ttl (%ss); cache will expire between refreshes',
+            settings.dashboard_snapshot_interval_s,
+            settings.dashboard_cache_ttl_s,
+        )
+    return settings.dashboard_cache_ttl_s
+
+
+def refresh_dashboard_summary_snapshots(adapter: IXCAdapter, today_date: date | None = None) -> SnapshotRefreshResult:
+    started = perf_counter()
+    today_date = today_date or _resolve_today(None, DEFAULT_SUMMARY_TZ)
+    ttl_s = _snapshot_ttl_s()
+    written = 0
+    failed = 0
+    for period in SUMMARY_SNAPSHOT_PERIODS:
+        _, days = resolve_period(period, None, 7, today_override=today_date)
+        for filial_id in SNAPSHOT_FILIAIS:
+            key = summary_cache_key(today_date, days, filial_id, {})
+            try:
+                with scoped_request_trace(f'snapshot:{key}') as trace, timer('snapshots.dashboard_summary', logger, {'period': period, 'filial_id': filial_id}):
+                    payload = build_dashboard_summary(
+                        adapter,
+                        today_date,
+                        days,
+                        {},
+                        filial_id=filial_id,
+                        today=today_date.strftime('%Y-%m-%d'),
+                    )
+            except Exception as exc:
+                failed += 1
+                logger.warning('snapshot dashboard summary failed key=%s err=%s', key, exc)
+                continue
+            if trace.budget_exceeded:
+                # payload parcial (IXC_CALL_BUDGET_MODE=degrade): melhor a chave expirar do que servir incompleto
+                failed += 1
+                logger.warning('snapshot dashboard summary incomplete, IXC call budget exceeded key=%s', key)
+                continue
+            cache_set_json(key, payload, ttl_s=ttl_s)
+            written += 1
+    return SnapshotRefreshResult(written=written, failed=failed, duration_ms=round((perf_counter() - started) * 1000, 2))
+
+
+def refresh_agenda_week_snapshots(adapter: IXCAdapter, today_date: date | None = None) -> SnapshotRefreshResult:
+    started = perf_counter()
+    today_date = today_date or _resolve_today(None, DEFAULT_SUMMARY_TZ)
+    ttl_s = _snapshot_ttl_s()
+    written = 0
+    failed = 0
+    for week in range(AGENDA_SNAPSHOT_WEEKS):
+        date_start = today_date + timedelta(days=week * AGENDA_SNAPSHOT_DAYS)
+        for filial_id in SNAPSHOT_FILIAIS:
+            key = agenda_week_cache_key(date_start, AGENDA_SNAPSHOT_DAYS, filial_id, AGENDA_SNAPSHOT_DEFINITION)
+            try:
+                with scoped_request_trace(f'snapshot:{key}') as trace, timer('snapshots.agenda_week', logger, {'date_start': date_start.strftime('%Y-%m-%d'), 'filial_id': filial_id}):
+                    payload = build_agenda_week(adapter, date_start, AGENDA_SNAPSHOT_DAYS, AGENDA_SNAPSHOT_DEFINITION, filial_id=filial_id)
+            except Exception as exc:
+                failed += 1
+                logger.warning('snapshot agenda week failed key=%s err=%s', key, exc)
+                continue
+            if trace.budget_exceeded:
+                failed += 1
+                logger.warning('snapshot agenda week incomplete, IXC call budget exceeded key=%s', key)
+                continue
+            cache_set_json(key, payload, ttl_s=ttl_s)
+            written += 1
+    return SnapshotRefreshResult(written=written, failed=failed, duration_ms=round((perf_counter() - started) * 1000, 2))
+
+
+def refresh_billing_open_snapshot(adapter: IXCAdapter) -> SnapshotRefreshResult:
+    started = perf_counter()
+    try:
+        with scoped_request_trace(f'snapshot:{BILLING_OPEN_CACHE_KEY}') as trace, timer('snapshots.billing_open', logger):
+            payload = build_billing_open_response(adapter)
+    except Exception as exc:
+        logger.warning('snapshot billing open failed err=%s', exc)
+        return SnapshotRefreshResult(written=0, failed=1, duration_ms=round((perf_counter() - started) * 1000, 2))
+    if trace.budget_exceeded:
+        logger.warning('snapshot billing open incomplete, IXC call budget exceeded')
+        return SnapshotRefreshResult(written=0, failed=1, duration_ms=round((perf_counter() - started) * 1000, 2))
+    cache_set_json(BILLING_OPEN_CACHE_KEY, payload, ttl_s=_snapshot_ttl_s())
+    return SnapshotRefreshResult(written=1, failed=0, duration_ms=round((perf_counter() - started) * 1000, 2))
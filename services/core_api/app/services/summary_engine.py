@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from datetime import date
+from operator import attrgetter
+from typing import Any, Callable
+
+try:
+    import numpy as np
+except ImportError:  # sem numpy a dashboard segue no caminho em Python puro
+    np = None
+
+from app.services.service_orders import STATUS_VOCAB, ServiceOrder, ServiceOrderBatch, filial_code
+from app.utils.timestamps import NO_DAY
+
+# Agregação colunar da dashboard: as OS viram arrays (dia ordinal, código de status, filial) numa
+# única passada e todos os contadores/histogramas saem de máscaras e bincount, sem loops por linha.
+
+# abaixo disso o custo fixo do numpy (alocação, fromiter) não compensa
+VECTORIZE_MIN_ROWS = 2000
+
+
+def should_vectorize(total_rows: int) -> bool:
+    return np is not None and total_rows >= VECTORIZE_MIN_ROWS
+
+
+class OrderColumns:
+    __slots__ = ('orders', 'size', 'status', '_prebuilt', '_days', '_filial')
+
+    def __init__(self, orders: list[ServiceOrder]) -> None:
+        self.orders = orders
+        self.size = len(orders)
+        # lote vindo do fetch: as colunas já existem, é só enxergar o buffer (sem cópia)
+        self._prebuilt = orders.columns if isinstance(orders, ServiceOrderBatch) and orders.columns_in_sync() else None
+        self._days: dict[str, Any] = {}
+        self._filial = None
+        self.status = self._column('status_code')
+
+    def _column(self, attr: str) -> Any:
+        if self._prebuilt is not None:
+            return np.frombuffer(self._prebuilt[attr], dtype=np.intc)
+        return np.fromiter(map(attrgetter(attr), self.orders), dtype=np.intc, count=self.size)
+
+    def days(self, attr: str) -> Any:
+        column = self._days.get(attr)
+        if column is None:
+            column = self._column(f'{attr}_day')
+            self._days[attr] = column
+        return column
+
+    @property
+    def filial(self) -> Any:
+        if self._filial is None:
+            if self._prebuilt is not None:
+                self._filial = np.frombuffer(self._prebuilt['filial_code'], dtype=np.intc)
+            else:
+                self._filial = np.fromiter((filial_code(o.id_filial) for o in self.orders), dtype=np.intc, count=self.size)
+        return self._filial
+
+    def status_mask(self, predicate: Callable[[str], bool]) -> Any:
+        # avalia o predicado uma vez por status conhecido e expande pelo código
+        vocab = list(STATUS_VOCAB)
+        lookup = np.fromiter((predicate(s) for s in vocab), dtype=bool, count=len(vocab))
+        return lookup[self.status]
+
+
+def _day_index(columns: OrderColumns, attr: str, date_start: date) -> Any:
+    days = columns.days(attr)
+    return np.where(days == NO_DAY, -1, days - date_start.toordinal())
+
+
+def count_by_day(columns: OrderColumns, attr: str, date_start: date, total_days: int, mask: Any = None) -> list[int]:
+    idx = _day_index(columns, attr, date_start)
+    valid = (idx >= 0) & (idx < total_days)
+    if mask is not None:
+        valid &= mask
+    return np.bincount(idx[valid], minlength=total_days).tolist()
+
+
+def count_by_day_and_filial(orders: list[ServiceOrder], attr: str, date_start: date, total_days: int) -> list[dict[str, int]]:
+    columns = OrderColumns(orders)
+    idx = _day_index(columns, attr, date_start)
+    filial = columns.filial
+    # a capacidade só conhece as filiais 1 e 2
+    valid = (idx >= 0) & (idx < total_days) & ((filial == 1) | (filial == 2))
+    # group-by (dia, filial) num único bincount: posição = dia * 3 + filial
+    flat = np.bincount(idx[valid] * 3 + filial[valid], minlength=total_days * 3).reshape(total_days, 3)
+    return [{'1': f1, '2': f2} for _, f1, f2 in flat.tolist()]
+
+
+def summary_counters(
+    install_rows: list[ServiceOrder],
+    maint_period_rows: list[ServiceOrder],
+    maint_done_rows: list[ServiceOrder],
+    selected_statuses: set[str],
+    date_start: date,
+    total_days: int,
+    today_date: date,
+    is_open_install: Callable[[str], bool],
+    is_done: Callable[[str], bool],
+) -> dict[str, Any]:
+    install = OrderColumns(install_rows)
+    maint_period = OrderColumns(maint_period_rows)
+    maint_done = OrderColumns(maint_done_rows)
+
+    if selected_statuses:
+        def selected(columns: OrderColumns) -> Any:
+            return columns.status_mask(lambda s: s in selected_statuses)
+    else:
+        def selected(columns: OrderColumns) -> Any:
+            return None
+
+    install_sel = selected(install)
+    period_sel = selected(maint_period)
+    done_sel = selected(maint_done)
+    install_all = np.ones(install.size, dtype=bool) if install_sel is None else install_sel
+
+    today = today_date.toordinal()
+    scheduled_today = install_all & (install.days('scheduled_or_reserved') == today)
+    install_done = install_all & install.status_mask(is_done)
+    return {
+        'scheduled_total': int(scheduled_today.sum()),
+        'pending_today': int((scheduled_today & install.status_mask(is_open_install)).sum()),
+        'completed_today': int((install_done & (install.days('closed') == today)).sum()),
+        'finalizadas_periodo': int(install_done.sum()),
+        'install_total': int(install_all.sum()),
+        'maint_period_total': maint_period.size if period_sel is None else int(period_sel.sum()),
+        'maint_done_total': maint_done.size if done_sel is None else int(done_sel.sum()),
+        'installations_scheduled_by_day': count_by_day(install, 'scheduled', date_start, total_days, install_sel),
+        'maint_opened_by_day': count_by_day(maint_period, 'opened', date_start, total_days, period_sel),
+        'maint_closed_by_day': count_by_day(maint_done, 'closed', date_start, total_days, done_sel),
+    }
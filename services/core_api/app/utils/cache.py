@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 import hashlib
-import json
 import logging
 from functools import lru_cache
 from typing import Any
 
+import orjson
 import redis
 
 from app.config import get_settings
+from app.utils.metrics import CACHE_REQUESTS, cache_key_family
 
 logger = logging.getLogger(__name__)
 
@@ -18,26 +19,136 @@ def get_redis() -> redis.Redis:
     return redis.from_url(get_settings().redis_url, decode_responses=True)
 
 
+@lru_cache
+def get_redis_raw() -> redis.Redis:
+    # mesmo servidor, sem decode: o valor volta em bytes e pode ir direto para a resposta
+    return redis.from_url(get_settings().redis_url)
+
+
+def _etag_key(key: str) -> str:
+    return f'{key}:etag'
+
+
+def _stale_key(key: str) -> str:
+    return f'{key}:stale'
+
+
+def cache_get_entry(key: str) -> tuple[bytes, str | None] | None:
+    # corpo em bytes (vai direto para a resposta) + hash do conteúdo gravado junto, usado como ETag
+    try:
+        raw, digest = get_redis_raw().mget(key, _etag_key(key))
+        if not raw:
+            CACHE_REQUESTS.inc(family=cache_key_family(key), result='miss')
+            return None
+        CACHE_REQUESTS.inc(family=cache_key_family(key), result='hit')
+        return raw, digest.decode('ascii') if digest else None
+    except Exception as exc:
+        CACHE_REQUESTS.inc(family=cache_key_family(key), result='error')
+        logger.warning('cache_get_entry failed key=%s err=%s', key, exc)
+        return None
+
+
+def cache_get_stale_entry(key: str) -> tuple[bytes, str | None] | None:
+    stale = _stale_key(key)
+    try:
+        raw, digest = get_redis_raw().mget(stale, _etag_key(stale))
+    except Exception as exc:
+        logger.warning('cache_get_stale_entry failed key=%s err=%s', key, exc)
+        return None
+    CACHE_REQUESTS.inc(family=cache_key_family(key), result='stale' if raw else 'stale_miss')
+    if not raw:
+        return None
+    return raw, digest.decode('ascii') if digest else None
+
+
 def cache_get_json(key: str) -> dict[str, Any] | None:
     try:
         raw = get_redis().get(key)
         if not raw:
+            CACHE_REQUESTS.inc(family=cache_key_family(key), result='miss')
             return None
-        parsed = json.loads(raw)
+        parsed = orjson.loads(raw)
+        CACHE_REQUESTS.inc(family=cache_key_family(key), result='hit')
         return parsed if isinstance(parsed, dict) else None
     except Exception as exc:
+        CACHE_REQUESTS.inc(family=cache_key_family(key), result='error')
         logger.warning('cache_get_json failed key=%s err=%s', key, exc)
         return None
 
 
-def cache_set_json(key: str, value: dict[str, Any], ttl_s: int | None = None) -> None:
-    ttl = ttl_s or get_settings().dashboard_cache_ttl_s
+def cache_set_json(key: str, value: dict[str, Any], ttl_s: int | None = None) -> str:
+    # além da entrada normal, guarda uma cópia longa em `<chave>:stale` (IXC_STALE_TTL_S, 0 desliga),
+    # servida com X-Cache: STALE quando o IXC está fora
+    settings = get_settings()
+    ttl = int(ttl_s or settings.dashboard_cache_ttl_s)
+    stale_ttl_s = settings.ixc_stale_ttl_s
+    digest = stable_json_hash(value)
     try:
-        get_redis().setex(key, int(ttl), json.dumps(value, ensure_ascii=False, separators=(',', ':')))
+        body = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.setex(key, ttl, body)
+        pipe.setex(_etag_key(key), ttl, digest)
+        if stale_ttl_s > ttl:
+            pipe.setex(_stale_key(key), int(stale_ttl_s), body)
+            pipe.setex(_etag_key(_stale_key(key)), int(stale_ttl_s), digest)
+        pipe.execute()
     except Exception as exc:
         logger.warning('cache_set_json failed key=%s err=%s', key, exc)
+    return digest
+
+
+def cache_get_many_json(keys: list[str]) -> dict[str, dict[str, Any]]:
+    # um MGET para várias chaves; só as presentes voltam no dict
+    if not keys:
+        return {}
+    try:
+        raws = get_redis().mget(keys)
+    except Exception as exc:
+        for key in keys:
+            CACHE_REQUESTS.inc(family=cache_key_family(key), result='error')
+        logger.warning('cache_get_many_json failed keys=%s err=%s', len(keys), exc)
+        return {}
+    found: dict[str, dict[str, Any]] = {}
+    for key, raw in zip(keys, raws):
+        parsed = orjson.loads(raw) if raw else None
+        if isinstance(parsed, dict):
+            found[key] = parsed
+        CACHE_REQUESTS.inc(family=cache_key_family(key), result='hit' if key in found else 'miss')
+    return found
+
+
+def cache_set_many_json(entries: dict[str, tuple[dict[str, Any], int]]) -> None:
+    # chave -> (valor, ttl_s); um pipeline sem transação
+    if not entries:
+        return
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for key, (value, ttl_s) in entries.items():
+            pipe.setex(key, int(ttl_s), orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS))
+        pipe.execute()
+    except Exception as exc:
+        logger.warning('cache_set_many_json failed keys=%s err=%s', len(entries), exc)
+
+
+def read_version_stamp(key: str) -> str | None:
+    # carimbos de versão (settings, filtros salvos) para invalidar caches em memória entre processos.
+    # Chave ausente é a versão '0' (o INCR começa em 1); None fica só para Redis fora do ar.
+    try:
+        value = get_redis().get(key)
+    except Exception as exc:
+        logger.warning('version stamp read failed key=%s err=%s', key, exc)
+        return None
+    return '0' if value is None else value
+
+
+def bump_version_stamp(key: str) -> str | None:
+    try:
+        return str(get_redis().incr(key))
+    except Exception as exc:
+        logger.warning('version stamp bump failed key=%s err=%s', key, exc)
+        return None
 
 
 def stable_json_hash(payload: dict[str, Any] | None) -> str:
-    canonical = json.dumps(payload or {}, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
-    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+    canonical = orjson.dumps(payload or {}, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.sha1(canonical).hexdigest()
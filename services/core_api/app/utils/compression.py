@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import zlib
+from typing import Any
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # sem o pacote brotli a negociação fica só em gzip
+    brotli = None
+
+# Compressão das respostas da API negociada pelo Accept-Encoding (br > gzip). Corpos pequenos, tipos já
+# comprimidos e respostas que já trazem Content-Encoding (assets .br/.gz do SPA) passam direto.
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/', 'application/javascript', 'image/svg+xml')
+
+
+def _accepted(accept_encoding: str) -> set[str]:
+    accepted = set()
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: str | None, available: tuple[str, ...]) -> str | None:
+    if not accept_encoding:
+        return None
+    accepted = _accepted(accept_encoding)
+    for coding in available:
+        if coding in accepted or '*' in accepted:
+            return coding
+    return None
+
+
+def available_encodings() -> tuple[str, ...]:
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+class _GzipStream:
+    def __init__(self, level: int) -> None:
+        # wbits 31: cabeçalho gzip; o sync flush por chunk mantém o NDJSON em stream
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def process(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _BrotliStream:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def process(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.process(data)
+        return out + (self._compressor.finish() if final else self._compressor.flush())
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get('accept-encoding'), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponder(self, encoding, send)(self.app, scope, receive)
+
+    def compressor(self, encoding: str) -> Any:
+        return _BrotliStream(self.brotli_quality) if encoding == 'br' else _GzipStream(self.gzip_level)
+
+
+class _CompressedResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Message | None = None
+        self.stream: Any = None
+        self.passthrough = False
+
+    async def __call__(self, app: ASGIApp, scope: Scope, receive: Receive) -> None:
+        await app(scope, receive, self.on_send)
+
+    async def on_send(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            self.start = message
+            headers = Headers(raw=message['headers'])
+            content_type = headers.get('content-type', '')
+            self.passthrough = (
+                'content-encoding' in headers
+                or message['status'] in (204, 304)
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message['type'] != 'http.response.body' or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        if self.stream is None:
+            # primeiro chunk: decide se vale comprimir (resposta inteira pequena vai como está)
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+            self.stream = self.middleware.compressor(self.encoding)
+            headers = MutableHeaders(raw=self.start['headers'])
+            headers['Content-Encoding'] = self.encoding
+            headers.add_vary_header('Accept-Encoding')
+            if 'etag' in headers and not headers['etag'].startswith('W/'):
+                # a representação mudou: o ETag forte vira fraco
+                headers['ETag'] = f"W/{headers['etag']}"
+            compressed = self.stream.process(body, final=not more_body)
+            if more_body:
+                del headers['Content-Length']
+            else:
+                headers['Content-Length'] = str(len(compressed))
+            await self.send(self.start)
+            await self.send({'type': 'http.response.body', 'body': compressed, 'more_body': more_body})
+            return
+
+        await self.send({'type': 'http.response.body', 'body': self.stream.process(body, final=not more_body), 'more_body': more_body})
+
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+import logging
+import math
+import threading
+from typing import Any, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TASK_BUCKETS_S = (0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0, 1800.0)
+WORKER_TASK_METRICS_KEY = 'softhub:metrics:worker_tasks'
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        return self._values.get(key, 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}')
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS_S) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # por série: contagens por bucket (não cumulativas, último = +Inf), soma e total
+        self._series: dict[tuple[str, ...], list[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[key] = series
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels: Any) -> int:
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        series = self._series.get(key)
+        return series[2] if series else 0
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((key, [list(s[0]), s[1], s[2]]) for key, s in self._series.items())
+        for key, (counts, total_sum, total_count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, (('le', _format_value(bound)),))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total_sum)}')
+            lines.append(f'{self.name}_count{labels} {total_count}')
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class GaugeCallback:
+    def __init__(self, name: str, help_text: str, collect: Callable[[], Iterable[tuple[dict[str, str], float]]]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.collect = collect
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} gauge']
+        try:
+            samples = list(self.collect())
+        except Exception as exc:
+            logger.warning('gauge collect failed name=%s err=%s', self.name, exc)
+            return lines
+        for labels, value in samples:
+            names = tuple(labels.keys())
+            lines.append(f'{self.name}{_format_labels(names, tuple(labels.values()))} {_format_value(value)}')
+        return lines
+
+
+HTTP_REQUEST_DURATION = Histogram(
+    'softhub_http_request_duration_seconds',
+    'Latência das rotas HTTP.',
+    ('method', 'route', 'status'),
+)
+IXC_REQUESTS = Counter('softhub_ixc_requests_total', 'Chamadas ao webservice IXC.', ('endpoint', 'status'))
+IXC_REQUEST_DURATION = Histogram('softhub_ixc_request_duration_seconds', 'Latência das chamadas ao IXC.', ('endpoint', 'status'))
+IXC_RESPONSE_BYTES = Counter('softhub_ixc_response_bytes_total', 'Bytes recebidos do IXC.', ('endpoint',))
+CACHE_REQUESTS = Counter('softhub_cache_requests_total', 'Leituras de cache por família de chave.', ('family', 'result'))
+DB_SESSIONS = Counter('softhub_db_sessions_total', 'Transações de sessão SQLAlchemy iniciadas.')
+STEP_DURATION = Histogram('softhub_step_duration_seconds', 'Duração das etapas medidas com timer().', ('step',))
+
+REGISTRY: list[Any] = [
+    HTTP_REQUEST_DURATION,
+    IXC_REQUESTS,
+    IXC_REQUEST_DURATION,
+    IXC_RESPONSE_BYTES,
+    CACHE_REQUESTS,
+    DB_SESSIONS,
+    STEP_DURATION,
+]
+
+
+def register(metric: Any) -> Any:
+    REGISTRY.append(metric)
+    return metric
+
+
+def cache_key_family(key: str) -> str:
+    return ':'.join(key.split(':')[:3])
+
+
+def observe_ixc_call(endpoint: str, status: int | str, elapsed_s: float, content_size: int) -> None:
+    normalized = '/' + endpoint.strip('/')
+    IXC_REQUESTS.inc(endpoint=normalized, status=status)
+    IXC_REQUEST_DURATION.observe(elapsed_s, endpoint=normalized, status=status)
+    IXC_RESPONSE_BYTES.inc(content_size, endpoint=normalized)
+
+
+def record_worker_task(redis_client: Any, task: str, state: str, elapsed_s: float) -> None:
+    # o worker roda em outro processo: agrega os buckets no Redis para o /metrics da API
+    idx = bisect_left(TASK_BUCKETS_S, elapsed_s)
+    bound = _format_value((*TASK_BUCKETS_S, math.inf)[idx])
+    pipe = redis_client.pipeline()
+    pipe.hincrby(WORKER_TASK_METRICS_KEY, f'{task}|{state}|bucket|{bound}', 1)
+    pipe.hincrbyfloat(WORKER_TASK_METRICS_KEY, f'{task}|{state}|sum', elapsed_s)
+    pipe.hincrby(WORKER_TASK_METRICS_KEY, f'{task}|{state}|count', 1)
+    pipe.execute()
+
+
+def render_worker_task_metrics(redis_client: Any) -> list[str]:
+    name = 'softhub_worker_task_duration_seconds'
+    lines = [f'# HELP {name} Duração das tasks do worker Celery.', f'# TYPE {name} histogram']
+    try:
+        raw = redis_client.hgetall(WORKER_TASK_METRICS_KEY)
+    except Exception as exc:
+        logger.warning('worker task metrics unavailable err=%s', exc)
+        return lines
+
+    series: dict[tuple[str, str], dict[str, Any]] = {}
+    for field, value in raw.items():
+        task, state, kind, *rest = field.split('|')
+        entry = series.setdefault((task, state), {'buckets': {}, 'sum': 0.0, 'count': 0})
+        if kind == 'bucket':
+            entry['buckets'][rest[0]] = int(value)
+        elif kind == 'sum':
+            entry['sum'] = float(value)
+        elif kind == 'count':
+            entry['count'] = int(value)
+
+    names = ('task', 'state')
+    for (task, state), entry in sorted(series.items()):
+        cumulative = 0
+        for bound in (*TASK_BUCKETS_S, math.inf):
+            cumulative += entry['buckets'].get(_format_value(bound), 0)
+            labels = _format_labels(names, (task, state), (('le', _format_value(bound)),))
+            lines.append(f'{name}_bucket{labels} {cumulative}')
+        lines.append(f'{name}_sum{_format_labels(names, (task, state))} {_format_value(entry["sum"])}')
+        lines.append(f'{name}_count{_format_labels(names, (task, state))} {entry["count"]}')
+    return lines
+
+
+def render_prometheus(extra_lines: Iterable[str] = ()) -> str:
+    lines: list[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(extra_lines)
+    return '\n'.join(lines) + '\n'
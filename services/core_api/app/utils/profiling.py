@@ -2,16 +2,79 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
 import time
 from collections import deque
 from contextlib import contextmanager
 from contextvars import ContextVar
+from dataclasses import dataclass, field
 from typing import Any
 
 from app.config import get_settings
+from app.utils.metrics import STEP_DURATION
+from app.utils.quantiles import WindowedSketches
 
 request_id_ctx: ContextVar[str | None] = ContextVar('request_id', default=None)
 _events: deque[dict[str, Any]] = deque(maxlen=500)
+_traces: deque[dict[str, Any]] = deque(maxlen=50)
+_latency = WindowedSketches()
+
+
+@dataclass
+class Span:
+    name: str
+    started_ms: int
+    elapsed_ms: int | None = None
+    attrs: dict[str, Any] = field(default_factory=dict)
+    children: list[Span] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        payload: dict[str, Any] = {'name': self.name, 'elapsed_ms': self.elapsed_ms}
+        if self.attrs:
+            payload['attrs'] = self.attrs
+        if self.children:
+            payload['children'] = [child.to_dict() for child in self.children]
+        return payload
+
+
+class RequestTrace:
+    def __init__(self, request_id: str | None) -> None:
+        self.request_id = request_id
+        self.root = Span('request', now_ms())
+        self.ixc_calls = 0
+        self.ixc_elapsed_ms = 0
+        self.budget_exceeded = False
+        self._lock = threading.Lock()
+
+    def add_child(self, parent: Span | None, span: Span) -> None:
+        with self._lock:
+            (parent or self.root).children.append(span)
+
+    def add_ixc_span(self, parent: Span | None, span: Span) -> None:
+        with self._lock:
+            (parent or self.root).children.append(span)
+            self.ixc_elapsed_ms += span.elapsed_ms or 0
+
+    def reserve_ixc_call(self) -> int:
+        with self._lock:
+            self.ixc_calls += 1
+            return self.ixc_calls
+
+    def finish(self) -> None:
+        self.root.elapsed_ms = now_ms() - self.root.started_ms
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'request_id': self.request_id,
+            'ixc_calls': self.ixc_calls,
+            'ixc_elapsed_ms': self.ixc_elapsed_ms,
+            'budget_exceeded': self.budget_exceeded,
+            'tree': self.root.to_dict(),
+        }
+
+
+request_trace_ctx: ContextVar[RequestTrace | None] = ContextVar('request_trace', default=None)
+current_span_ctx: ContextVar[Span | None] = ContextVar('current_span', default=None)
 
 
 def now_ms() -> int:
@@ -30,6 +93,71 @@ def get_request_id() -> str | None:
     return request_id_ctx.get()
 
 
+def start_request_trace(request_id: str | None) -> RequestTrace:
+    trace = RequestTrace(request_id)
+    request_trace_ctx.set(trace)
+    current_span_ctx.set(None)
+    return trace
+
+
+@contextmanager
+def scoped_request_trace(request_id: str | None):
+    # trace próprio fora de requisição HTTP (snapshots no worker): orçamento de chamadas contado por payload
+    trace = RequestTrace(request_id)
+    token = request_trace_ctx.set(trace)
+    span_token = current_span_ctx.set(None)
+    try:
+        yield trace
+    finally:
+        current_span_ctx.reset(span_token)
+        request_trace_ctx.reset(token)
+
+
+def get_request_trace() -> RequestTrace | None:
+    return request_trace_ctx.get()
+
+
+def ixc_budget_exceeded() -> bool:
+    # modo degrade pulou chamadas ao IXC nesta requisição: o payload montado está incompleto
+    trace = get_request_trace()
+    return trace is not None and trace.budget_exceeded
+
+
+def finish_request_trace(trace: RequestTrace) -> None:
+    trace.finish()
+    if profiling_enabled():
+        _traces.append(trace.to_dict())
+
+
+def find_trace(request_id: str) -> dict[str, Any] | None:
+    for trace in reversed(_traces):
+        if trace.get('request_id') == request_id:
+            return trace
+    return None
+
+
+def record_ixc_span(endpoint: str, elapsed_ms: int, attrs: dict[str, Any]) -> None:
+    trace = get_request_trace()
+    if trace is None:
+        return
+    span = Span('ixc.post_list', now_ms() - elapsed_ms, elapsed_ms, {'endpoint_ixc': endpoint, **attrs})
+    trace.add_ixc_span(current_span_ctx.get(), span)
+
+
+def server_timing_header(trace: RequestTrace) -> str:
+    return f'ixc;dur={trace.ixc_elapsed_ms};desc="{trace.ixc_calls} calls", app;dur={trace.root.elapsed_ms or 0}'
+
+
+def _latency_key(event: dict[str, Any]) -> str | None:
+    if event.get('step_name'):
+        return str(event['step_name'])
+    component = event.get('component')
+    if not component:
+        return None
+    endpoint = event.get('endpoint_ixc')
+    return f'{component} {endpoint}' if endpoint else str(component)
+
+
 def push_event(event: dict[str, Any]) -> None:
     payload = dict(event)
     payload.setdefault('ts_ms', now_ms())
@@ -37,6 +165,13 @@ def push_event(event: dict[str, Any]) -> None:
     if rid:
         payload.setdefault('request_id', rid)
     _events.append(payload)
+    key = _latency_key(payload)
+    if key is not None and isinstance(payload.get('elapsed_ms'), (int, float)):
+        _latency.record(key, payload['elapsed_ms'], payload['ts_ms'] / 1000)
+
+
+def latency_summary() -> dict[str, dict[str, dict[str, Any]]]:
+    return _latency.summary()
 
 
 def last_events(limit: int = 100) -> list[dict[str, Any]]:
@@ -58,10 +193,21 @@ def log_profile_event(logger: logging.Logger, event: dict[str, Any]) -> None:
 @contextmanager
 def timer(name: str, logger: logging.Logger, extra: dict[str, Any] | None = None):
     started = now_ms()
+    trace = get_request_trace()
+    span_token = None
+    span: Span | None = None
+    if trace is not None:
+        span = Span(name, started, attrs=dict(extra or {}))
+        trace.add_child(current_span_ctx.get(), span)
+        span_token = current_span_ctx.set(span)
     try:
         yield
     finally:
         elapsed = now_ms() - started
+        if span is not None:
+            span.elapsed_ms = elapsed
+            current_span_ctx.reset(span_token)
+        STEP_DURATION.observe(elapsed / 1000, step=name)
         event = {'step_name': name, 'elapsed_ms': elapsed}
         if extra:
             event.update(extra)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Any, Iterable
+
+WINDOWS_MIN = (1, 5, 15)
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class LogSketch:
+    # sketch de buckets logarítmicos (estilo DDSketch): erro relativo ~relative_accuracy, memória limitada por max_bins
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 1024) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        if value <= 0:
+            self.zero_count += 1
+            return
+        idx = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[idx] = self.bins.get(idx, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self._collapse_lowest()
+
+    def _collapse_lowest(self) -> None:
+        # junta os dois menores buckets: perde precisão só na cauda baixa, que não interessa para latência
+        lowest, second = sorted(self.bins)[:2]
+        self.bins[second] += self.bins.pop(lowest)
+
+    def merge(self, other: LogSketch) -> None:
+        for idx, n in other.bins.items():
+            self.bins[idx] = self.bins.get(idx, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        while len(self.bins) > self.max_bins:
+            self._collapse_lowest()
+
+    def quantile(self, q: float) -> float | None:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for idx in sorted(self.bins):
+            seen += self.bins[idx]
+            if seen > rank:
+                return min(2 * self.gamma ** idx / (self.gamma + 1), self.max)
+        return self.max
+
+
+class WindowedSketches:
+    # anel de buckets por minuto; cada bucket guarda um LogSketch por chave
+    def __init__(self, horizon_min: int = max(WINDOWS_MIN), max_keys: int = 256, relative_accuracy: float = 0.01) -> None:
+        self.horizon_min = horizon_min
+        self.max_keys = max_keys
+        self.relative_accuracy = relative_accuracy
+        self._slots: list[tuple[int, dict[str, LogSketch]]] = [(-1, {}) for _ in range(horizon_min)]
+        self._lock = threading.Lock()
+
+    def record(self, key: str, value: float, ts_s: float | None = None) -> None:
+        minute = int((time.time() if ts_s is None else ts_s) // 60)
+        pos = minute % self.horizon_min
+        with self._lock:
+            slot_minute, sketches = self._slots[pos]
+            if slot_minute != minute:
+                sketches = {}
+                self._slots[pos] = (minute, sketches)
+            sketch = sketches.get(key)
+            if sketch is None:
+                if len(sketches) >= self.max_keys:
+                    key = '_other'
+                    sketch = sketches.get(key)
+                if sketch is None:
+                    sketch = LogSketch(self.relative_accuracy)
+                    sketches[key] = sketch
+            sketch.add(value)
+
+    def merged(self, window_min: int, now_s: float | None = None) -> dict[str, LogSketch]:
+        current = int((time.time() if now_s is None else now_s) // 60)
+        merged: dict[str, LogSketch] = {}
+        with self._lock:
+            for slot_minute, sketches in self._slots:
+                if slot_minute < 0 or current - slot_minute >= window_min:
+                    continue
+                for key, sketch in sketches.items():
+                    target = merged.get(key)
+                    if target is None:
+                        target = LogSketch(self.relative_accuracy)
+                        merged[key] = target
+                    target.merge(sketch)
+        return merged
+
+    def summary(
+        self,
+        windows: Iterable[int] = WINDOWS_MIN,
+        quantiles: Iterable[float] = DEFAULT_QUANTILES,
+        now_s: float | None = None,
+    ) -> dict[str, dict[str, dict[str, Any]]]:
+        result: dict[str, dict[str, dict[str, Any]]] = {}
+        for window in windows:
+            rows: dict[str, dict[str, Any]] = {}
+            for key, sketch in sorted(self.merged(window, now_s).items()):
+                row: dict[str, Any] = {'count': sketch.count, 'max': sketch.max}
+                for q in quantiles:
+                    value = sketch.quantile(q)
+                    row[f'p{round(q * 100):g}'] = round(value, 2) if value is not None else None
+                rows[key] = row
+            result[f'{window}m'] = rows
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._slots = [(-1, {}) for _ in range(self.horizon_min)]
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            for _, sketches in self._slots:
+                sketches.pop(key, None)
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi.responses import ORJSONResponse, Response
+from starlette.requests import Request
+
+# ETag fraco: o hash é do conteúdo JSON canônico (stable_json_hash), não dos bytes enviados (que podem ir comprimidos)
+CACHE_CONTROL = 'no-cache'
+
+
+def weak_etag(digest: str) -> str:
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    target = etag.removeprefix('W/')
+    return any(tag.strip().removeprefix('W/') == target for tag in header.split(','))
+
+
+def conditional_headers(etag: str, headers: dict[str, str] | None = None) -> dict[str, str]:
+    return {**(headers or {}), 'ETag': etag, 'Cache-Control': CACHE_CONTROL}
+
+
+def raw_json_response(body: bytes, headers: dict[str, str] | None = None) -> Response:
+    # corpo já serializado (hit de cache): sai como está, sem decode, validação do response_model ou novo encode
+    return Response(content=body, media_type=ORJSONResponse.media_type, headers=headers)
+
+
+def cached_json_response(request: Request, body: bytes, digest: str | None, headers: dict[str, str] | None = None) -> Response:
+    if digest is None:
+        return raw_json_response(body, headers)
+    etag = weak_etag(digest)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=conditional_headers(etag, headers))
+    return raw_json_response(body, conditional_headers(etag, headers))
+
+
+def conditional_payload(request: Request, response: Response, payload: Any, digest: str) -> Any:
+    # payload recém-montado: 304 se o cliente já tem esse conteúdo, senão segue pelo response_model com ETag
+    etag = weak_etag(digest)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=conditional_headers(etag, dict(response.headers)))
+    response.headers.update(conditional_headers(etag))
+    return payload
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from decimal import Decimal
+import logging
+from typing import Any, Iterable, Iterator
+
+from fastapi.responses import StreamingResponse
+import orjson
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+# Modo stream (?stream=true) das listagens grandes: um objeto JSON por linha, serializado à medida que o
+# gerador produz os itens; não passa pela validação do response_model nem monta o corpo inteiro em memória.
+
+
+def _json_default(value: Any) -> Any:
+    # date/datetime o orjson já serializa em ISO; Decimal sai como string, igual ao pydantic em modo JSON
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def encode_line(record: Any) -> bytes:
+    return orjson.dumps(record, default=_json_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+
+
+def iter_ndjson(records: Iterable[Any], batch_size: int = 64) -> Iterator[bytes]:
+    # agrupa algumas linhas por chunk: um write por item custa mais que a serialização em si
+    buffer: list[bytes] = []
+    count = 0
+    try:
+        for record in records:
+            buffer.append(encode_line(record))
+            count += 1
+            if len(buffer) >= batch_size:
+                yield b''.join(buffer)
+                buffer.clear()
+        if buffer:
+            yield b''.join(buffer)
+    except Exception:
+        # o status 200 já foi enviado: só resta registrar e encerrar o corpo
+        logger.exception('ndjson stream aborted', extra={'event': 'stream.aborted', 'items_count': count})
+        raise
+
+
+def ndjson_response(records: Iterable[Any], headers: dict[str, str] | None = None) -> StreamingResponse:
+    return StreamingResponse(iter_ndjson(records), media_type=NDJSON_MEDIA_TYPE, headers=headers)
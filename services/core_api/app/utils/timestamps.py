@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from datetime import datetime
+from functools import lru_cache
+
+# Timestamps do IXC chegam como 'YYYY-MM-DD HH:MM:SS' (às vezes com 'T' ou só a data) e se repetem
+# muito entre linhas (agenda em horários cheios, mesmo dia). fromisoformat nesses formatos fixos é
+# ~15x mais rápido que strptime; o strptime fica só para formatos fora do padrão.
+
+_FALLBACK_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d')
+
+
+def _is_iso_shape(value: str) -> bool:
+    size = len(value)
+    if size == 19:
+        return value[4] == '-' and value[7] == '-' and value[10] in ' T' and value[13] == ':' and value[16] == ':'
+    return size == 10 and value[4] == '-' and value[7] == '-'
+
+
+@lru_cache(maxsize=65536)
+def _parse_prefix(value: str) -> datetime | None:
+    if _is_iso_shape(value):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    for fmt in _FALLBACK_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    return None
+
+
+def parse_ixc_datetime(raw: str | None) -> datetime | None:
+    if not raw or not isinstance(raw, str):
+        return None
+    # datetime é imutável: o mesmo objeto pode ser devolvido do memo para todas as linhas
+    return _parse_prefix(raw[:19])
+
+
+
+NO_DAY = -1
+
+
+@lru_cache(maxsize=65536)
+def _day_ordinal(value: datetime) -> int:
+    return value.toordinal()
+
+
+def day_ordinal(value: datetime | None) -> int:
+    # ordinal do dia para agregação em colunas; o memo também faz as linhas compartilharem o mesmo int
+    return NO_DAY if value is None else _day_ordinal(value)
@@ -0,0 +1,74 @@
+from datetime import date
+
+from sqlalchemy import delete, update
+
+from app.db import BillingCase, SessionLocal
+from app.devtools.synthetic import TITULOS_PER_OS
+from app.devtools.synthetic_adapter import SyntheticIXCAdapter
+from app.services.billing_cases import build_grouped_billing_cases
+from app.services.billing_enrich import enrich_billing_cases
+from app.services.billing_sync import sync_billing_cases
+from conftest import materialize
+
+
+class _TitlesAdapter(SyntheticIXCAdapter):
+    # devolve exatamente `rows` títulos em aberto; contratos/clientes vêm do dataset sintético
+    def __init__(self, dataset, titles):
+        super().__init__(dataset)
+        self.titles = titles
+
+    def list_contas_receber_atrasadas(self, min_days=20, due_from=None, due_to=None, filial_id=None):
+        return self.titles
+
+    def list_contas_receber_para_sync(self, due_from, only_open=True, filial_id=None, rp=500, limit_pages=5):
+        return self.titles
+
+
+def _adapter(datasets, rows):
+    dataset = datasets(max(1, int(rows / TITULOS_PER_OS)))
+    titles = [{**t, 'valor_aberto': t['valor']} for t in materialize(dataset.table('fn_areceber'), rows)]
+    return _TitlesAdapter(dataset, titles)
+
+
+def _clear_cases():
+    with SessionLocal() as db:
+        db.execute(delete(BillingCase))
+        db.commit()
+
+
+def test_build_grouped_billing_cases(benchmark, datasets, rows):
+    adapter = _adapter(datasets, rows)
+    result = benchmark(build_grouped_billing_cases, adapter, only_20p=True, group_by='contract', limit=500)
+    assert result is not None
+
+
+def test_sync_billing_cases(benchmark, database, datasets, rows):
+    adapter = _adapter(datasets, rows)
+    result = benchmark.pedantic(
+        sync_billing_cases,
+        args=(adapter,),
+        kwargs={'due_from': date(2024, 1, 1)},
+        setup=_clear_cases,
+        rounds=3 if rows <= 10_000 else 1,
+    )
+    assert result.upserted == rows
+
+
+def test_enrich_billing_cases(benchmark, database, datasets, rows):
+    adapter = _adapter(datasets, rows)
+    _clear_cases()
+    sync_billing_cases(adapter, due_from=date(2024, 1, 1))
+
+    def reset():
+        with SessionLocal() as db:
+            db.execute(update(BillingCase).values(contract_json=None, client_json=None, id_contrato=None))
+            db.commit()
+
+    result = benchmark.pedantic(
+        enrich_billing_cases,
+        args=(adapter,),
+        kwargs={'limit': rows, 'only_missing': True},
+        setup=reset,
+        rounds=3 if rows <= 10_000 else 1,
+    )
+    assert result.updated == rows
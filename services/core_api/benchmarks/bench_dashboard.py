@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+import time
+
+from app.devtools.synthetic_adapter import SyntheticIXCAdapter
+from app.services import summary_engine
+from app.services.dashboard import (
+    _is_done_status,
+    _is_open_installation_status,
+    _summary_counters,
+    build_agenda_week,
+    compose_dashboard_summary,
+    normalize_row,
+)
+from app.services.filter_plans import DEFAULT_INSTALL_ASSUNTOS, DEFAULT_MAINTENANCE_ASSUNTOS
+from app.services.service_orders import ServiceOrderBatch, as_service_orders, collect_service_orders
+from app.utils.timestamps import _parse_prefix, parse_ixc_datetime
+from conftest import BENCH_TODAY, materialize
+
+
+def _os_rows(datasets, rows):
+    return materialize(datasets(rows).table('su_oss_chamado'))
+
+
+DATE_FIELDS = ('data_agenda', 'data_abertura', 'data_fechamento', 'data_reservada')
+
+
+def _legacy_parse_dt(raw):
+    # parser anterior (strptime com até três formatos), mantido só como referência de comparação
+    if not raw:
+        return None
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(raw[:19], fmt)
+        except Exception:
+            pass
+    return None
+
+
+def _date_values(datasets, rows):
+    return [r.get(field) for r in _os_rows(datasets, rows) for field in DATE_FIELDS]
+
+
+def test_parse_dt(benchmark, datasets, rows):
+    values = _date_values(datasets, rows)
+
+    def run():
+        for value in values:
+            parse_ixc_datetime(value)
+
+    # memo frio a cada rodada: mede o parse, não só o lookup
+    benchmark.pedantic(run, setup=_parse_prefix.cache_clear)
+
+
+def test_parse_dt_speedup_vs_strptime(benchmark, datasets, rows):
+    values = _date_values(datasets, rows)
+
+    def legacy():
+        return [_legacy_parse_dt(v) for v in values]
+
+    def fast():
+        return [parse_ixc_datetime(v) for v in values]
+
+    legacy_s = []
+    for _ in range(3):
+        started = time.perf_counter()
+        expected = legacy()
+        legacy_s.append(time.perf_counter() - started)
+
+    assert benchmark.pedantic(fast, setup=_parse_prefix.cache_clear) == expected
+    speedup = min(legacy_s) / benchmark.stats['min_s']
+    assert speedup >= 5, f'parse só {speedup:.1f}x mais rápido que strptime'
+
+
+def test_normalize_row(benchmark, datasets, rows):
+    os_rows = _os_rows(datasets, rows)
+    clientes = {r['id']: r for r in materialize(datasets(rows).table('cliente'))}
+
+    def run():
+        return [
+            normalize_row(r, clientes.get(r['id_cliente']), DEFAULT_INSTALL_ASSUNTOS, DEFAULT_MAINTENANCE_ASSUNTOS)
+            for r in os_rows
+        ]
+
+    assert len(benchmark(run)) == rows
+
+
+def test_normalize_service_orders(benchmark, datasets, rows):
+    # caminho da API: as OS já saem do fetch como ServiceOrder
+    orders = as_service_orders(_os_rows(datasets, rows))
+    clientes = {r['id']: r for r in materialize(datasets(rows).table('cliente'))}
+
+    def run():
+        return [normalize_row(o, clientes.get(o.id_cliente), DEFAULT_INSTALL_ASSUNTOS, DEFAULT_MAINTENANCE_ASSUNTOS) for o in orders]
+
+    assert len(benchmark(run)) == rows
+
+
+def _summary_inputs(datasets, rows):
+    # mesmo formato do fetch: lotes de ServiceOrder com as colunas numéricas já preenchidas
+    os_rows = _os_rows(datasets, rows)
+
+    def batch(items):
+        out = ServiceOrderBatch()
+        collect_service_orders(items, set(), out)
+        return out
+
+    install = batch(r for r in os_rows if r['id_assunto'] in DEFAULT_INSTALL_ASSUNTOS)
+    maint = batch(r for r in os_rows if r['id_assunto'] in DEFAULT_MAINTENANCE_ASSUNTOS)
+    done = batch(r for r in os_rows if r['id_assunto'] in DEFAULT_MAINTENANCE_ASSUNTOS and r['status'] == 'F')
+    return install, maint, done
+
+
+def test_compose_dashboard_summary(benchmark, datasets, rows):
+    install, maint, done = _summary_inputs(datasets, rows)
+    date_start = BENCH_TODAY - timedelta(days=14)
+
+    result = benchmark(
+        compose_dashboard_summary,
+        date_start,
+        30,
+        BENCH_TODAY,
+        None,
+        install,
+        maint,
+        done,
+        [r for r in maint if r.status != 'F'],
+        [],
+        [],
+        [],
+    )
+    assert result['instalacoes']['total_periodo'] == len(install)
+
+
+def test_summary_counters_vectorized_vs_python(benchmark, datasets, rows):
+    install, maint, done = _summary_inputs(datasets, rows)
+    args = (install, maint, done, {'AG', 'F', 'A'}, BENCH_TODAY - timedelta(days=14), 30, BENCH_TODAY)
+
+    python_s = []
+    for _ in range(3):
+        started = time.perf_counter()
+        expected = _summary_counters(*args)
+        python_s.append(time.perf_counter() - started)
+
+    result = benchmark(summary_engine.summary_counters, *args, _is_open_installation_status, _is_done_status)
+    assert result == expected
+    if rows >= 10000:
+        speedup = min(python_s) / benchmark.stats['min_s']
+        assert speedup >= 5, f'agregação vetorizada só {speedup:.1f}x mais rápida'
+
+
+def test_build_agenda_week(benchmark, database, datasets, rows):
+    # janela de ±3 dias: todas as OS do dataset caem na semana consultada
+    adapter = SyntheticIXCAdapter(datasets(rows, window_days=3))
+    result = benchmark(build_agenda_week, adapter, BENCH_TODAY - timedelta(days=3), 7, None)
+    assert len(result['days']) == 7
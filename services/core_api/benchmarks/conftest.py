@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from datetime import date
+import json
+import os
+from pathlib import Path
+import statistics
+import time
+from typing import Any, Callable
+
+import pytest
+
+# banco próprio dos benchmarks: nunca usa o DATABASE_URL do ambiente
+os.environ['DATABASE_URL'] = os.getenv('BENCH_DATABASE_URL', 'sqlite:///./bench_softhub.db')
+os.environ['IXC_MODE'] = 'mock'
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASELINE_PATH = BENCH_DIR / 'baseline.json'
+BENCH_TODAY = date(2025, 3, 10)
+DEFAULT_SIZES = '1000,10000,100000'
+DEFAULT_THRESHOLD = 0.25
+MIN_TIME_S = 0.5
+MAX_ROUNDS = 100
+
+_results: dict[str, dict[str, Any]] = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('softhub-bench')
+    group.addoption('--bench-sizes', default=os.getenv('BENCH_SIZES', DEFAULT_SIZES), help='tamanhos (linhas), separados por vírgula')
+    group.addoption('--bench-threshold', type=float, default=float(os.getenv('BENCH_THRESHOLD', DEFAULT_THRESHOLD)), help='regressão tolerada sobre o baseline (0.25 = 25%%)')
+    group.addoption('--bench-save-baseline', action='store_true', help='grava os tempos desta execução no baseline')
+    group.addoption(
+        '--bench-baseline',
+        default=os.getenv('BENCH_BASELINE', str(BASELINE_PATH)),
+        help='arquivo de baseline (padrão: benchmarks/baseline.json, versionado)',
+    )
+    group.addoption('--bench-json', default=None, help='grava o resultado completo neste arquivo')
+
+
+def _size_id(size: int) -> str:
+    return f'{size // 1000}k' if size >= 1000 and size % 1000 == 0 else str(size)
+
+
+def pytest_generate_tests(metafunc):
+    if 'rows' in metafunc.fixturenames:
+        sizes = [int(x) for x in str(metafunc.config.getoption('bench_sizes')).split(',') if x.strip()]
+        metafunc.parametrize('rows', sizes, ids=_size_id)
+
+
+def _load_baseline(config) -> dict[str, dict[str, Any]]:
+    path = Path(config.getoption('bench_baseline'))
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+class Benchmark:
+    # API compatível com o fixture do pytest-benchmark (benchmark(fn) / benchmark.pedantic), sem a dependência
+    def __init__(self, key: str, threshold: float, baseline: dict[str, Any] | None) -> None:
+        self.key = key
+        self.threshold = threshold
+        self.baseline = baseline
+        self.timings: list[float] = []
+
+    def __call__(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return self.pedantic(fn, args=args, kwargs=kwargs)
+
+    def pedantic(
+        self,
+        fn: Callable[..., Any],
+        args: tuple[Any, ...] = (),
+        kwargs: dict[str, Any] | None = None,
+        setup: Callable[[], Any] | None = None,
+        rounds: int | None = None,
+        iterations: int = 1,
+    ) -> Any:
+        kwargs = kwargs or {}
+        if rounds is None:
+            # aquecimento fora da medição (imports, caches, tabelas do dataset geradas sob demanda)
+            if setup is not None:
+                setup()
+            fn(*args, **kwargs)
+        result = None
+        while True:
+            if setup is not None:
+                setup()
+            started = time.perf_counter()
+            for _ in range(iterations):
+                result = fn(*args, **kwargs)
+            self.timings.append((time.perf_counter() - started) / iterations)
+            done = len(self.timings)
+            if rounds is not None:
+                if done >= rounds:
+                    break
+            elif done >= MAX_ROUNDS or (done >= 3 and sum(self.timings) >= MIN_TIME_S) or sum(self.timings) >= 10 * MIN_TIME_S:
+                break
+        self._record()
+        return result
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            'median_s': round(statistics.median(self.timings), 6),
+            'min_s': round(min(self.timings), 6),
+            'mean_s': round(statistics.fmean(self.timings), 6),
+            'rounds': len(self.timings),
+        }
+
+    def _record(self) -> None:
+        stats = self.stats
+        _results[self.key] = stats
+        if self.baseline is None:
+            return
+        # compara o melhor tempo: bem menos sensível a ruído da máquina que a mediana
+        limit = self.baseline['min_s'] * (1 + self.threshold)
+        assert stats['min_s'] <= limit, (
+            f"{self.key}: regressão de desempenho, min {stats['min_s'] * 1000:.1f}ms "
+            f"> baseline {self.baseline['min_s'] * 1000:.1f}ms +{self.threshold:.0%}"
+        )
+
+
+@pytest.fixture
+def benchmark(request) -> Benchmark:
+    key = request.node.nodeid.rsplit('/', 1)[-1]
+    baseline = None if request.config.getoption('bench_save_baseline') else _load_baseline(request.config).get(key)
+    return Benchmark(key, request.config.getoption('bench_threshold'), baseline)
+
+
+@pytest.fixture(scope='session')
+def database():
+    from app.db import Base, engine, init_db
+
+    Base.metadata.drop_all(bind=engine)
+    init_db()
+    return engine
+
+
+@pytest.fixture(scope='session')
+def datasets():
+    from app.devtools.synthetic import SyntheticDataset
+
+    cache: dict[tuple[int, int], SyntheticDataset] = {}
+
+    def get(size: int, window_days: int = 60) -> SyntheticDataset:
+        key = (size, window_days)
+        if key not in cache:
+            cache[key] = SyntheticDataset(size=size, today=BENCH_TODAY, window_days=window_days)
+            cache[key].row_counts()
+        return cache[key]
+
+    return get
+
+
+def materialize(table: Any, limit: int | None = None) -> list[dict[str, Any]]:
+    count = len(table) if limit is None else min(limit, len(table))
+    return [table.row(i) for i in range(count)]
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _results:
+        return
+    if session.config.getoption('bench_save_baseline'):
+        merged = {**_load_baseline(session.config), **_results}
+        Path(session.config.getoption('bench_baseline')).write_text(json.dumps(dict(sorted(merged.items())), indent=2) + '\n')
+    target = session.config.getoption('bench_json')
+    if target:
+        Path(target).write_text(json.dumps(dict(sorted(_results.items())), indent=2) + '\n')
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _results:
+        return
+    baseline = _load_baseline(terminalreporter.config)
+    terminalreporter.section('softhub benchmarks')
+    for key, stats in sorted(_results.items()):
+        ref = baseline.get(key)
+        delta = f" ({(stats['min_s'] / ref['min_s'] - 1):+.0%} vs baseline)" if ref else ''
+        terminalreporter.write_line(
+            f"{key:<64} min {stats['min_s'] * 1000:10.2f}ms  median {stats['median_s'] * 1000:10.2f}ms  x{stats['rounds']}{delta}"
+        )
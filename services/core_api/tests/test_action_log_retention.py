@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+import gzip
+import json
+
+from app.db import BillingActionLog, SessionLocal
+from app.services.action_log_retention import archive_action_logs
+
+
+def _seed_logs(now):
+    with SessionLocal() as db:
+        db.query(BillingActionLog).delete()
+        db.add_all(
+            [
+                BillingActionLog(case_id='C-1', action_type='close_ticket', created_at=now - timedelta(days=200), payload_json={'would_close': True}, success=True),
+                BillingActionLog(case_id='C-1', action_type='create_ticket', created_at=now - timedelta(days=120), payload_json={'ticket_id': 'T1'}, success=True),
+                BillingActionLog(case_id='C-2', action_type='create_ticket', created_at=now - timedelta(days=5), payload_json={}, success=False, error='boom'),
+            ]
+        )
+        db.commit()
+
+
+def test_archive_moves_old_rows_to_monthly_gzip_files(tmp_path):
+    now = datetime(2024, 9, 15, 12, 0, 0)
+    _seed_logs(now)
+
+    result = archive_action_logs(retention_days=90, archive_dir=str(tmp_path), now=now)
+
+    assert result.archived == 2
+    assert [p.split('/')[-1] for p in result.files] == ['billing_action_log-2024-02.ndjson.gz', 'billing_action_log-2024-05.ndjson.gz']
+    with gzip.open(tmp_path / 'billing_action_log-2024-05.ndjson.gz') as fh:
+        [line] = [json.loads(raw) for raw in fh]
+    assert line['case_id'] == 'C-1' and line['payload_json'] == {'ticket_id': 'T1'}
+    with SessionLocal() as db:
+        assert [row.case_id for row in db.query(BillingActionLog)] == ['C-2']
+
+    # segundo run sem nada vencido não mexe nos arquivos; novos lotes do mesmo mês são anexados
+    assert archive_action_logs(retention_days=90, archive_dir=str(tmp_path), now=now).archived == 0
+    with SessionLocal() as db:
+        db.add(BillingActionLog(case_id='C-3', action_type='close_ticket', created_at=datetime(2024, 5, 2), payload_json={}, success=True))
+        db.commit()
+    archive_action_logs(retention_days=90, archive_dir=str(tmp_path), now=now)
+    with gzip.open(tmp_path / 'billing_action_log-2024-05.ndjson.gz') as fh:
+        assert [json.loads(raw)['case_id'] for raw in fh] == ['C-1', 'C-3']
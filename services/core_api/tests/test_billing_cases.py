@@ -2,11 +2,13 @@ from datetime import date, datetime, timedelta
 from decimal import Decimal
 
 from fastapi.testclient import TestClient
+from sqlalchemy import select
 
 from app.config import get_settings
-from app.db import BillingCase, SessionLocal
+from app.db import BillingActionLog, BillingCase, SessionLocal
 from app.main import app
 from app.services.adapters import get_ixc_adapter
+from app.services.billing_tickets import reconcile_tickets
 
 
 class _BillingFlowAdapter:
@@ -282,6 +284,23 @@ def test_reconcile_ready_to_close_when_disabled(monkeypatch):
     assert paid_case['action_state'] == 'READY_TO_CLOSE'
 
 
+def test_reconcile_logs_would_close_once_per_case(monkeypatch):
+    _seed_cases()
+    monkeypatch.setenv('BILLING_AUTOCLOSE_ENABLED', 'false')
+    get_settings.cache_clear()
+    try:
+        first = reconcile_tickets(_BillingFlowAdapter())
+        second = reconcile_tickets(_BillingFlowAdapter())
+    finally:
+        get_settings.cache_clear()
+
+    assert first['would_close'] == second['would_close'] >= 1
+    with SessionLocal() as db:
+        case_id = db.scalar(select(BillingCase.id).where(BillingCase.external_id == 'SYNC-PAID'))
+        logs = list(db.scalars(select(BillingActionLog).where(BillingActionLog.case_id == case_id)))
+    assert [log.payload_json for log in logs] == [{'would_close': True}]
+
+
 
 def test_get_billing_summary_endpoint():
     _seed_cases()
@@ -364,3 +383,18 @@ def test_grouped_cases_by_client():
     case = payload['cases'][0]
     assert case['id_cliente'] == '100'
     assert case['qtd_titulos'] == 3
+
+
+def test_cases_filter_by_enriched_json_keys():
+    _seed_cases()
+    with SessionLocal() as db:
+        for case in db.query(BillingCase).filter(BillingCase.external_id.in_(['CASE-2', 'CASE-4'])):
+            case.contract_json = {'status_internet': 'CM' if case.external_id == 'CASE-2' else 'A', 'plano_nome': '300MB'}
+            case.client_json = {'cidade': 'Serra'}
+        db.commit()
+    client = TestClient(app)
+
+    listing = client.get('/billing/cases/db', params={'status_internet': 'CM', 'plano_nome': '300MB'}).json()
+    assert [item['external_id'] for item in listing] == ['CASE-2']
+    assert {item['external_id'] for item in client.get('/billing/cases/db', params={'cidade': 'Serra'}).json()} == {'CASE-2', 'CASE-4'}
+    assert client.get('/billing/cases/summary', params={'cidade': 'Serra', 'status_internet': 'A'}).json()['total_cases'] == 1
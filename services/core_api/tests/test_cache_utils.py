@@ -1,7 +1,188 @@
+from datetime import date
+
+from fastapi.testclient import TestClient
+import orjson
+
+from app.adapters.ixc_adapter import MockIXCAdapter
+from app.clients.ixc_client import IXCCircuitOpenError
+from app.main import app
+from app.models.billing import BillingOpenResponse
+from app.models.dashboard import AgendaWeekResponse, DashboardSummary
+from app.services.billing import BILLING_OPEN_CACHE_KEY, build_billing_open_response
+from app.services.adapters import get_ixc_adapter
+from app.services.dashboard import build_agenda_week
+from app.utils import cache
 from app.utils.cache import stable_json_hash
+from app.utils.profiling import get_request_trace
+from test_billing_cases import _GroupedAdapter
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value if isinstance(value, bytes) else value.encode()
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, *keys):
+        return [self.data.get(k) for k in keys]
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        return []
+
+
+def _install_fake(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setattr(cache, 'get_redis', lambda: fake)
+    monkeypatch.setattr(cache, 'get_redis_raw', lambda: fake)
+    return fake
 
 
 def test_stable_json_hash_is_order_independent():
     a = {'b': 2, 'a': {'x': [2, 1], 'y': 'z'}}
     b = {'a': {'y': 'z', 'x': [2, 1]}, 'b': 2}
     assert stable_json_hash(a) == stable_json_hash(b)
+
+
+def test_billing_open_hit_serves_cached_bytes_untouched(monkeypatch):
+    fake = _install_fake(monkeypatch)
+    payload = {'summary': {'total_open': 1, 'over_20_days': 0, 'oldest_due_date': None}, 'items': [{'external_id': 'ç'}]}
+    cache.cache_set_json(BILLING_OPEN_CACHE_KEY, payload, ttl_s=60)
+
+    def _fail(adapter):
+        raise AssertionError('hit não deveria montar o payload')
+
+    monkeypatch.setattr('app.api.billing.build_billing_open_response', _fail)
+    response = TestClient(app).get('/billing/open')
+
+    assert response.status_code == 200
+    assert response.headers['X-Cache'] == 'HIT'
+    assert response.headers['content-type'] == 'application/json'
+    # o hit não revalida: o que está no cache vai byte a byte para o cliente
+    assert response.content == fake.data[BILLING_OPEN_CACHE_KEY]
+    assert cache.cache_get_json(BILLING_OPEN_CACHE_KEY) == payload
+
+
+def test_cached_payloads_already_match_their_response_models(monkeypatch):
+    # o caminho raw confia no payload gravado; os builders precisam sair no formato final do response_model
+    adapter = MockIXCAdapter()
+    written = {}
+    monkeypatch.setattr('app.api.dashboard.cache_get_entry', lambda key: None)
+    monkeypatch.setattr('app.api.dashboard.cache_set_json', lambda key, value, ttl_s=None: written.update(summary=value))
+    TestClient(app).get('/dashboard/summary', params={'start': '2025-01-01', 'days': 7, 'today': '2025-01-02'})
+
+    payloads = [
+        (BillingOpenResponse, build_billing_open_response(adapter)),
+        (AgendaWeekResponse, build_agenda_week(adapter, date(2025, 1, 6), 7, {})),
+        (DashboardSummary, written['summary']),
+    ]
+
+    for model, payload in payloads:
+        assert orjson.loads(orjson.dumps(payload)) == model.model_validate(payload).model_dump(mode='json')
+
+
+def test_summary_etag_revalidates_with_304_on_miss_and_hit(monkeypatch):
+    fake = _install_fake(monkeypatch)
+    client = TestClient(app)
+    params = {'start': '2025-01-01', 'days': 7, 'today': '2025-01-02'}
+
+    first = client.get('/dashboard/summary', params=params)
+    assert first.headers['X-Cache'] == 'MISS'
+    etag = first.headers['ETag']
+    assert etag.startswith('W/"') and first.headers['Cache-Control'] == 'no-cache'
+
+    hit = client.get('/dashboard/summary', params=params)
+    assert hit.headers['X-Cache'] == 'HIT'
+    assert hit.headers['ETag'] == etag
+    assert hit.json() == first.json()
+
+    revalidated = client.get('/dashboard/summary', params=params, headers={'If-None-Match': f'"other", {etag}'})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b''
+    assert revalidated.headers['ETag'] == etag
+
+    # mesmo conteúdo recalculado depois de expirar o cache: continua 304
+    fake.data.clear()
+    recomputed = client.get('/dashboard/summary', params=params, headers={'If-None-Match': etag})
+    assert recomputed.status_code == 304
+    assert recomputed.headers['X-Cache'] == 'MISS'
+
+    changed = client.get('/dashboard/summary', params=params, headers={'If-None-Match': 'W/"stale"'})
+    assert changed.status_code == 200
+
+
+def test_billing_cases_etag_ignores_generated_at(monkeypatch):
+    app.dependency_overrides[get_ixc_adapter] = lambda: _GroupedAdapter()
+    try:
+        client = TestClient(app)
+        first = client.get('/billing/cases')
+        second = client.get('/billing/cases', headers={'If-None-Match': first.headers['ETag']})
+    finally:
+        app.dependency_overrides.pop(get_ixc_adapter, None)
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+
+
+class _DownAdapter(MockIXCAdapter):
+    def list_service_orders(self, grid_filters):
+        raise IXCCircuitOpenError('IXC circuit open for /su_oss_chamado', retry_after_s=12.3)
+
+
+def test_agenda_serves_stale_copy_while_ixc_is_unavailable(monkeypatch):
+    fake = _install_fake(monkeypatch)
+    client = TestClient(app)
+    params = {'start': '2025-03-10', 'days': 7}
+    try:
+        app.dependency_overrides[get_ixc_adapter] = lambda: MockIXCAdapter()
+        fresh = client.get('/dashboard/agenda-week', params=params)
+        assert fresh.headers['X-Cache'] == 'MISS'
+
+        # entrada normal expirou; só a cópia longa sobrou
+        stale_keys = {k for k in fake.data if k.endswith(':stale') or k.endswith(':stale:etag')}
+        assert len(stale_keys) == 2
+        fake.data = {k: v for k, v in fake.data.items() if k in stale_keys}
+
+        app.dependency_overrides[get_ixc_adapter] = lambda: _DownAdapter()
+        stale = client.get('/dashboard/agenda-week', params=params)
+        assert stale.status_code == 200
+        assert stale.headers['X-Cache'] == 'STALE'
+        assert stale.json() == fresh.json()
+
+        fake.data.clear()
+        down = client.get('/dashboard/agenda-week', params=params)
+        assert down.status_code == 503
+        assert down.headers['Retry-After'] == '13'
+    finally:
+        app.dependency_overrides.pop(get_ixc_adapter, None)
+
+
+class _OverBudgetAdapter(MockIXCAdapter):
+    # simula IXC_CALL_BUDGET_MODE=degrade: alguma chamada foi pulada nesta requisição
+    def list_service_orders(self, grid_filters):
+        get_request_trace().budget_exceeded = True
+        return super().list_service_orders(grid_filters)
+
+
+def test_partial_payload_over_call_budget_is_not_cached_nor_tagged(monkeypatch):
+    fake = _install_fake(monkeypatch)
+    client = TestClient(app)
+    try:
+        app.dependency_overrides[get_ixc_adapter] = lambda: _OverBudgetAdapter()
+        agenda = client.get('/dashboard/agenda-week', params={'start': '2025-03-10', 'days': 7})
+        summary = client.get('/dashboard/summary', params={'start': '2025-01-01', 'days': 7, 'today': '2025-01-02'})
+    finally:
+        app.dependency_overrides.pop(get_ixc_adapter, None)
+
+    for response in (agenda, summary):
+        assert response.status_code == 200
+        assert response.headers['X-IXC-Budget'] == 'exceeded'
+        assert response.headers['X-Cache'] == 'MISS'
+        assert 'ETag' not in response.headers
+    assert fake.data == {}
@@ -0,0 +1,82 @@
+import gzip
+import json
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.adapters.ixc_adapter import MockIXCAdapter
+from app.main import app
+from app.services.adapters import get_ixc_adapter
+from app.utils.compression import negotiate_encoding
+
+client = TestClient(app)
+
+
+def _raw_get(path, accept_encoding, **params):
+    app.dependency_overrides[get_ixc_adapter] = lambda: MockIXCAdapter()
+    try:
+        with client.stream('GET', path, params=params, headers={'Accept-Encoding': accept_encoding}) as response:
+            return response, b''.join(response.iter_raw())
+    finally:
+        app.dependency_overrides.pop(get_ixc_adapter, None)
+
+
+def test_negotiate_encoding_prefers_server_order_and_respects_q_zero():
+    assert negotiate_encoding('gzip, br', ('br', 'gzip')) == 'br'
+    assert negotiate_encoding('gzip;q=1.0, br;q=0', ('br', 'gzip')) == 'gzip'
+    assert negotiate_encoding('*', ('gzip',)) == 'gzip'
+    assert negotiate_encoding('identity', ('br', 'gzip')) is None
+    assert negotiate_encoding(None, ('gzip',)) is None
+
+
+def test_large_json_is_gzipped_and_small_is_not():
+    plain, plain_body = _raw_get('/dashboard/maintenances', 'identity', tab='done')
+    assert 'content-encoding' not in plain.headers
+    assert len(plain_body) > 1024
+
+    response, body = _raw_get('/dashboard/maintenances', 'gzip', tab='done')
+    assert response.headers['content-encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['vary']
+    assert int(response.headers['content-length']) == len(body) < len(plain_body)
+    assert gzip.decompress(body) == plain_body
+
+    small, _ = _raw_get('/healthz', 'gzip')
+    assert 'content-encoding' not in small.headers
+
+
+def test_ndjson_stream_is_compressed_incrementally():
+    plain, plain_body = _raw_get('/dashboard/maintenances', 'identity', tab='done', stream='true')
+    response, body = _raw_get('/dashboard/maintenances', 'gzip', tab='done', stream='true')
+
+    assert response.headers['content-encoding'] == 'gzip'
+    assert 'content-length' not in response.headers
+    assert gzip.decompress(body) == plain_body
+    assert all(json.loads(line) for line in plain_body.splitlines())
+
+
+def test_spa_serves_precompressed_assets_with_cache_headers(tmp_path, monkeypatch):
+    assets = tmp_path / 'assets'
+    assets.mkdir()
+    (tmp_path / 'index.html').write_text('<html></html>')
+    (assets / 'index-AbC123_x.js').write_text('console.log(1)')
+    (assets / 'index-AbC123_x.js.gz').write_bytes(gzip.compress(b'console.log(1)'))
+    (assets / 'index-AbC123_x.js.br').write_bytes(b'fake-brotli')
+    monkeypatch.setattr(main, 'WEBAPP_DIST_DIR', tmp_path)
+    monkeypatch.setattr(main, 'WEBAPP_INDEX_FILE', tmp_path / 'index.html')
+
+    response, body = _raw_get('/assets/index-AbC123_x.js', 'br, gzip')
+    assert response.headers['content-encoding'] == 'br'
+    assert response.headers['content-type'].startswith(('text/javascript', 'application/javascript'))
+    assert response.headers['cache-control'] == 'public, max-age=31536000, immutable'
+    assert body == b'fake-brotli'
+
+    response, body = _raw_get('/assets/index-AbC123_x.js', 'gzip')
+    assert response.headers['content-encoding'] == 'gzip'
+    assert gzip.decompress(body) == b'console.log(1)'
+
+    response, body = _raw_get('/assets/index-AbC123_x.js', 'identity')
+    assert 'content-encoding' not in response.headers
+    assert body == b'console.log(1)'
+
+    index, _ = _raw_get('/agenda', 'gzip')
+    assert index.headers['cache-control'] == 'no-cache'
@@ -0,0 +1,84 @@
+import asyncio
+
+import anyio
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.adapters.ixc_adapter import MockIXCAdapter
+from app.config import Settings
+from app.db import engine_kwargs
+from app.main import app
+from app.services import filter_plans, filters
+from app.services.adapters import get_ixc_adapter
+
+client = TestClient(app)
+
+
+def test_engine_kwargs_apply_pool_settings_to_postgres_only():
+    config = Settings(DATABASE_URL='postgresql+psycopg://u:p@db/softhub', DB_POOL_SIZE=8, DB_MAX_OVERFLOW=4, DB_POOL_RECYCLE_S=600)
+    kwargs = engine_kwargs(config)
+    assert kwargs == {'pool_size': 8, 'max_overflow': 4, 'pool_timeout': 30.0, 'pool_recycle': 600, 'pool_pre_ping': True}
+    assert engine_kwargs(Settings(DATABASE_URL='sqlite:///./x.db')) == {}
+
+    # o engine async (psycopg) aceita os mesmos parâmetros; nada conecta até o primeiro uso
+    async_engine = create_async_engine(config.database_url, **kwargs)
+    try:
+        assert async_engine.sync_engine.pool.size() == 8
+    finally:
+        anyio.run(async_engine.dispose)
+
+
+def test_metrics_expose_pool_gauges():
+    client.get('/filters', params={'scope': 'maintenances'})
+    body = client.get('/metrics').text
+    assert '# TYPE softhub_db_pool_connections gauge' in body
+    assert 'softhub_db_pool_connections{engine="sync",state="checked_out"} 0' in body
+    assert 'softhub_db_pool_connections{engine="sync",state="idle"}' in body
+
+
+def test_async_summary_resolves_saved_filter_off_the_event_loop():
+    row = filters.create_saved_filter('Resumo', 'agenda_week', {'status_codes': ['AG']})
+    assert anyio.run(filters.get_saved_filter_definition_async, row.id) == {'status_codes': ['AG']}
+
+    app.dependency_overrides[get_ixc_adapter] = lambda: MockIXCAdapter()
+    try:
+        assert client.get('/dashboard/summary', params={'filter_id': row.id}).status_code == 200
+        assert client.get('/dashboard/summary', params={'filter_id': 'missing'}).status_code == 404
+    finally:
+        app.dependency_overrides.pop(get_ixc_adapter, None)
+        filters.delete_saved_filter(row.id)
+
+
+def test_async_summary_keeps_redis_and_db_calls_off_the_event_loop(monkeypatch):
+    on_loop = []
+
+    def _track(name, fn):
+        def wrapper(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(name)
+            except RuntimeError:
+                pass
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    monkeypatch.setattr('app.api.dashboard.cache_get_entry', _track('cache_get_entry', lambda key: None))
+    monkeypatch.setattr('app.api.dashboard.cache_set_json', _track('cache_set_json', lambda key, value, ttl_s=None: 'digest'))
+    monkeypatch.setattr('app.api.dashboard.load_subject_ids', _track('load_subject_ids', filter_plans.load_subject_ids))
+    monkeypatch.setattr(filters, '_sync_definitions', _track('_sync_definitions', filters._sync_definitions))
+    monkeypatch.setattr(filters, 'async_db_enabled', lambda: True)
+    row = filters.create_saved_filter('Resumo', 'agenda_week', {'status_codes': ['AG']})
+    # definição já em cache: o caminho async não chega no AsyncSession (sem driver async no sqlite dos testes)
+    filters.get_saved_filter_definition(row.id)
+
+    app.dependency_overrides[get_ixc_adapter] = lambda: MockIXCAdapter()
+    try:
+        response = client.get('/dashboard/summary', params={'filter_id': row.id, 'today': '2025-01-02'})
+    finally:
+        app.dependency_overrides.pop(get_ixc_adapter, None)
+        filters.delete_saved_filter(row.id)
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] == 'W/"digest"'
+    assert on_loop == []
@@ -0,0 +1,143 @@
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.adapters.ixc_adapter import MockIXCAdapter, RealIXCAdapter
+from app.clients.ixc_client import IXCClient
+from app.config import get_settings
+from app.devtools.fake_ixc import FakeIXCBackend, FakeIXCConfig, FakeIXCTransport, create_app
+from app.devtools.synthetic import DictColumn, SyntheticDataset
+from app.devtools.synthetic_adapter import SyntheticIXCAdapter
+from app.services.adapters import get_ixc_adapter
+from app.services.ixc_grid_builder import build_os_grid
+
+TODAY = date(2025, 3, 10)
+
+
+def _adapter(backend: FakeIXCBackend) -> RealIXCAdapter:
+    client = IXCClient(host='fake.ixc', user='u', token='t', backoff_base=0, transport=FakeIXCTransport(backend))
+    return RealIXCAdapter(client)
+
+
+def _backend(size=400, **config) -> FakeIXCBackend:
+    return FakeIXCBackend(dataset=SyntheticDataset(size=size, today=TODAY), config=FakeIXCConfig(**config))
+
+
+def test_real_adapter_end_to_end_evaluates_grid_and_paginates():
+    backend = _backend()
+    grid = build_os_grid(TODAY - timedelta(days=3), TODAY + timedelta(days=3), ['A', 'AG'], ['1', '15'])
+    oss = backend.dataset.table('su_oss_chamado')
+    expected = [
+        row
+        for row in (oss.row(i) for i in range(len(oss)))
+        if '2025-03-07' <= row['data_agenda'][:10] <= '2025-03-13' and row['status'] in {'A', 'AG'} and row['id_assunto'] in {'1', '15'}
+    ]
+
+    adapter = _adapter(backend)
+    rows = adapter.client.iterate_all('/su_oss_chamado', grid, rp=7, sortname='id')
+
+    assert expected
+    assert [r['id'] for r in rows] == sorted((r['id'] for r in expected), key=int)
+    assert backend.calls == -(-len(expected) // 7)
+
+
+def test_in_operator_unsupported_falls_back_to_single_lookups():
+    backend = _backend(support_in=False)
+    rows = _adapter(backend).list_clientes_by_ids(['100', '101', '999999'])
+
+    assert [r['id'] for r in rows] == ['100', '101']
+
+
+def test_injected_errors_are_retried_by_client():
+    backend = _backend(error_rate=0.5, seed=1)
+    client = IXCClient(host='fake.ixc', user='u', token='t', backoff_base=0, max_retries=10, transport=FakeIXCTransport(backend))
+
+    data = client.post_list('/fn_areceber', [{'TB': 'fn_areceber.valor_aberto', 'OP': '>', 'P': '0'}], 1, 50, 'id', 'asc')
+
+    assert all(float(r['valor_aberto']) > 0 for r in data['registros'])
+    assert backend.calls >= 1
+
+
+def test_asgi_app_serves_webservice_with_like_and_sorting():
+    client = TestClient(create_app(_backend()))
+    response = client.post(
+        '/webservice/v1/cliente',
+        headers={'Authorization': 'Basic dTp0', 'ixcsoft': 'listar'},
+        json={'grid_param': '[{"TB":"cliente.nome","OP":"LIKE","P":"cliente 10%"}]', 'page': '1', 'rp': '5', 'sortname': 'cliente.id', 'sortorder': 'desc'},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['total'] == '10'
+    assert [r['nome'] for r in body['registros']] == ['Cliente 109', 'Cliente 108', 'Cliente 107', 'Cliente 106', 'Cliente 105']
+    assert client.post('/webservice/v1/cliente', json={}).status_code == 401
+
+
+def test_synthetic_dataset_is_deterministic_and_consistent():
+    first = SyntheticDataset(size=500, seed=7, today=TODAY)
+    second = SyntheticDataset(size=500, seed=7, today=TODAY)
+
+    assert first.table('fn_areceber').row(123) == second.table('fn_areceber').row(123)
+    assert first.row_counts()['cliente'] == 250
+    titulo = first.table('fn_areceber').row(10)
+    contrato = first.table('cliente_contrato').row(int(titulo['id_contrato']) - 1)
+    assert contrato['id_cliente'] == titulo['id_cliente']
+    future = first.table('su_oss_chamado').query([{'TB': 'su_oss_chamado.data_agenda', 'OP': '>', 'P': '2025-03-11'}])[1]
+    assert future and all(r['status'] != 'F' for r in future)
+
+
+def _stored_bytes(table) -> int:
+    total = 0
+    for col in table.columns.values():
+        data = col.codes if isinstance(col, DictColumn) else getattr(col, 'values', b'')
+        total += len(data) * getattr(data, 'itemsize', 1)
+    return total
+
+
+def test_synthetic_dataset_scales_lazily_in_compact_columns():
+    # o tamanho só fixa as contagens; as tabelas são geradas na primeira consulta
+    huge = SyntheticDataset(size=5_000_000, today=TODAY)
+    assert (huge.n_clientes, huge.n_contratos, huge.n_titulos) == (2_500_000, 2_750_000, 10_000_000)
+
+    small = SyntheticDataset(size=2_000, today=TODAY)
+    large = SyntheticDataset(size=20_000, today=TODAY)
+    assert len(large.table('fn_areceber')) == 10 * len(small.table('fn_areceber'))
+    for name in ('su_oss_chamado', 'fn_areceber'):
+        table = large.table(name)
+        # colunas em bytes/array, sem dict por registro: poucas dezenas de bytes por linha
+        assert _stored_bytes(table) / len(table) < 48
+
+
+def test_synthetic_receivables_cover_every_calendar_month():
+    dataset = SyntheticDataset(size=2000, seed=3, today=date(2025, 3, 10))
+    titulos = dataset.table('fn_areceber')
+    months = sorted({titulos.row(i)['data_vencimento'][:7] for i in range(len(titulos))})
+    # do próximo mês até 11 meses atrás, sem pular fevereiro
+    assert months == [f'2024-{m:02d}' for m in range(4, 13)] + ['2025-01', '2025-02', '2025-03', '2025-04']
+
+
+def test_synthetic_adapter_queries_dataset():
+    adapter = SyntheticIXCAdapter(SyntheticDataset(size=300, today=TODAY))
+
+    rows = adapter.list_service_orders(build_os_grid(TODAY, TODAY + timedelta(days=6), ['AG'], None))
+    assert rows and all(r['status'] == 'AG' for r in rows)
+    assert [c['id'] for c in adapter.list_clientes_by_ids(['101', '100', 'x'])] == ['100', '101']
+    mensagens = adapter.list_oss_mensagens('1000')
+    assert mensagens and [m['data'] for m in mensagens] == sorted(m['data'] for m in mensagens)
+    assert all(float(r['valor_aberto']) > 0 for r in adapter.list_contas_receber_abertas())
+
+
+def test_get_ixc_adapter_injects_synthetic_adapter_only_when_sized(monkeypatch):
+    monkeypatch.setenv('IXC_MODE', 'mock')
+    monkeypatch.setenv('IXC_MOCK_DATASET_SIZE', '0')
+    get_settings.cache_clear()
+    try:
+        assert type(get_ixc_adapter()) is MockIXCAdapter
+        monkeypatch.setenv('IXC_MOCK_DATASET_SIZE', '200')
+        get_settings.cache_clear()
+        adapter = get_ixc_adapter()
+        assert isinstance(adapter, SyntheticIXCAdapter)
+        assert adapter.dataset.size == 200
+        assert get_ixc_adapter().dataset is adapter.dataset
+    finally:
+        get_settings.cache_clear()
@@ -0,0 +1,100 @@
+import pytest
+
+from app.config import get_settings
+from app.services import filter_plans, filters
+from app.services import settings as app_settings
+from app.services.dashboard import resolve_definition
+from app.utils import cache
+from test_settings import _FakeRedis
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setattr(cache, 'get_redis', lambda: fake)
+    monkeypatch.setenv('APP_SETTINGS_REFRESH_S', '3600')
+    get_settings.cache_clear()
+    app_settings.invalidate_settings_snapshot()
+    filter_plans.clear_filter_plans()
+    filters._definitions.clear()
+    yield fake
+    app_settings.invalidate_settings_snapshot()
+    filter_plans.clear_filter_plans()
+    filters._definitions.clear()
+    get_settings.cache_clear()
+
+
+def _count_lookups(monkeypatch):
+    calls = []
+    original = filters.get_saved_filter
+    monkeypatch.setattr(filters, 'get_saved_filter', lambda filter_id: calls.append(filter_id) or original(filter_id))
+    return calls
+
+
+def test_saved_filter_definition_is_cached_until_update_or_delete(fake_redis, monkeypatch):
+    row = filters.create_saved_filter('Abertas', 'maintenances', {'status_codes': ['A']})
+    calls = _count_lookups(monkeypatch)
+
+    for _ in range(3):
+        assert filters.get_saved_filter_definition(row.id) == {'status_codes': ['A']}
+    assert calls == [row.id]
+
+    filters.update_saved_filter(row.id, 'Abertas', 'maintenances', {'status_codes': ['AG']})
+    assert filters.get_saved_filter_definition(row.id) == {'status_codes': ['AG']}
+    assert fake_redis.version == '1'
+
+    filters.delete_saved_filter(row.id)
+    assert filters.get_saved_filter_definition(row.id) is None
+    assert filters.get_saved_filter_definition('missing') is None
+    assert calls.count('missing') == 1 and len(calls) == 4
+
+
+def test_other_process_update_clears_definitions_on_next_check(fake_redis, monkeypatch):
+    monkeypatch.setenv('APP_SETTINGS_REFRESH_S', '0')
+    get_settings.cache_clear()
+    row = filters.create_saved_filter('Agenda', 'agenda_week', {'category': 'instalacao'})
+    filters.get_saved_filter_definition(row.id)
+    calls = _count_lookups(monkeypatch)
+
+    filters.get_saved_filter_definition(row.id)
+    assert calls == []
+
+    fake_redis.incr(filters.FILTERS_VERSION_KEY)
+    filters.get_saved_filter_definition(row.id)
+    assert calls == [row.id]
+
+
+
+def test_definition_read_racing_an_update_is_not_cached(fake_redis, monkeypatch):
+    row = filters.create_saved_filter('Abertas', 'maintenances', {'status_codes': ['A']})
+    original = filters.get_saved_filter
+
+    def _read_then_concurrent_update(filter_id):
+        stale = original(filter_id)
+        # outro request salva o filtro enquanto este ainda não guardou o que leu
+        filters.update_saved_filter(row.id, 'Abertas', 'maintenances', {'status_codes': ['AG']})
+        return stale
+
+    monkeypatch.setattr(filters, 'get_saved_filter', _read_then_concurrent_update)
+    assert filters.get_saved_filter_definition(row.id) == {'status_codes': ['A']}
+    monkeypatch.setattr(filters, 'get_saved_filter', original)
+    assert filters.get_saved_filter_definition(row.id) == {'status_codes': ['AG']}
+
+def test_plan_is_compiled_once_per_settings_generation(fake_redis, monkeypatch):
+    compiled = []
+    original = filter_plans.compile_filter_plan
+    monkeypatch.setattr(filter_plans, 'compile_filter_plan', lambda *args: compiled.append(args[1]) or original(*args))
+
+    definition = {'category': 'manutencao', 'status_codes': ['A', 'F']}
+    plan = filter_plans.get_filter_plan(definition, 'maintenances')
+    assert filter_plans.get_filter_plan(dict(definition), 'maintenances') is plan
+    assert compiled == ['maintenances']
+    assert plan.tab_statuses == {'open': ('A',), 'scheduled': (), 'done': ('F',)}
+    assert len(plan.tab_grids['open']) == len(plan.assunto_ids)
+    assert resolve_definition(definition, 'maintenances') == dict(plan.definition)
+
+    app_settings.update_settings_payload({'maintenance_subject_ids': ['99']})
+    replanned = filter_plans.get_filter_plan(definition, 'maintenances')
+    assert replanned is not plan
+    assert replanned.assunto_ids == ('99',)
+    assert compiled == ['maintenances', 'maintenances']
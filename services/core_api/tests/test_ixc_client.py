@@ -1,4 +1,12 @@
-from app.clients.ixc_client import IXCClient, IXCClientError
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.clients.ixc_client import IXCCallBudgetExceeded, IXCCircuitOpenError, IXCClient, IXCClientError, IXCUnavailableError
+from app.clients.ixc_resilience import CLOSED, HALF_OPEN, OPEN, AdaptiveTimeout, CircuitBreaker, CircuitBreakers
+from app.config import get_settings
+from app.main import app
+from app.utils.profiling import request_trace_ctx, start_request_trace
 
 
 class DummyResponse:
@@ -28,3 +36,205 @@ def test_ixc_client_raises_on_type_error_json():
         assert False, 'expected IXCClientError'
     except IXCClientError as exc:
         assert 'falha logica' in str(exc)
+
+
+class CountingResponse:
+    status_code = 200
+    content = b'{"registros":[]}'
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return {'registros': [{'id': '1'}], 'total': '1'}
+
+
+class CountingHttpClient:
+    def __init__(self):
+        self.calls = 0
+
+    def post(self, *args, **kwargs):
+        self.calls += 1
+        return CountingResponse()
+
+    def close(self):
+        return None
+
+
+def _budget_client(monkeypatch, mode):
+    monkeypatch.setenv('IXC_CALL_BUDGET', '2')
+    monkeypatch.setenv('IXC_CALL_BUDGET_MODE', mode)
+    get_settings.cache_clear()
+    client = IXCClient(host='host', user='user', token='token', max_retries=1)
+    client._client = CountingHttpClient()
+    return client
+
+
+def test_ixc_call_budget_fail_mode(monkeypatch):
+    client = _budget_client(monkeypatch, 'fail')
+    trace = start_request_trace('req-budget')
+    try:
+        for _ in range(2):
+            client.post_list('/su_oss_chamado', [], page=1, rp=10, sortname='id', sortorder='asc')
+        with pytest.raises(IXCCallBudgetExceeded):
+            client.post_list('/su_oss_chamado', [], page=1, rp=10, sortname='id', sortorder='asc')
+    finally:
+        request_trace_ctx.set(None)
+        get_settings.cache_clear()
+
+    assert client._client.calls == 2
+    assert trace.budget_exceeded is True
+    assert [span.attrs['endpoint_ixc'] for span in trace.root.children] == ['/su_oss_chamado', '/su_oss_chamado']
+
+
+def test_ixc_call_budget_degrade_mode(monkeypatch):
+    client = _budget_client(monkeypatch, 'degrade')
+    trace = start_request_trace('req-degrade')
+    try:
+        results = [client.post_list('/su_oss_chamado', [], page=1, rp=10, sortname='id', sortorder='asc') for _ in range(3)]
+    finally:
+        request_trace_ctx.set(None)
+        get_settings.cache_clear()
+
+    assert client._client.calls == 2
+    assert results[-1] == {'registros': [], 'total': 0}
+    assert trace.ixc_calls == 3
+    assert trace.budget_exceeded is True
+
+
+def test_response_exposes_ixc_call_headers():
+    response = TestClient(app).get('/healthz', headers={'X-Request-Id': 'req-headers'})
+
+    assert response.headers['X-Request-Id'] == 'req-headers'
+    assert response.headers['X-IXC-Calls'] == '0'
+    assert response.headers['Server-Timing'].startswith('ixc;dur=0;desc="0 calls", app;dur=')
+    assert 'X-IXC-Budget' not in response.headers
+
+
+class FlakyHttpClient:
+    def __init__(self, status_code=503):
+        self.status_code = status_code
+        self.timeouts = []
+
+    def post(self, *args, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        return FlakyResponse(self.status_code)
+
+    def close(self):
+        return None
+
+
+class FlakyResponse(CountingResponse):
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def test_circuit_breaker_opens_probes_and_closes():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, open_s=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.allow() and breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+    assert breaker.retry_after_s() == 10
+
+    now[0] = 10.5
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()  # só uma sonda por vez
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    now[0] = 21
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_post_list_fails_fast_once_circuit_opens():
+    client = IXCClient(host='host', user='user', token='token', backoff_base=0, breaker_failures=2, breaker_open_s=60)
+    client._client = FlakyHttpClient()
+
+    with pytest.raises(IXCCircuitOpenError) as opened:
+        client.post_list('/su_oss_chamado', [], page=1, rp=10, sortname='id', sortorder='asc')
+    # abriu no 2º retry: o 3º não acontece
+    assert len(client._client.timeouts) == 2
+    assert 0 < opened.value.retry_after_s <= 60
+
+    with pytest.raises(IXCCircuitOpenError):
+        client.post_list('/su_oss_chamado', [], page=1, rp=10, sortname='id', sortorder='asc')
+    assert len(client._client.timeouts) == 2
+    assert client.breakers.states() == {'/su_oss_chamado': OPEN}
+    assert 'softhub_ixc_circuit_state{endpoint="/su_oss_chamado"} 2' in TestClient(app).get('/metrics').text
+
+    # outro endpoint tem breaker próprio; esgotar os retries sem abrir vira IXCUnavailableError
+    client.breakers = CircuitBreakers(failure_threshold=0, open_s=60)
+    with pytest.raises(IXCUnavailableError):
+        client.post_list('/cliente', [], page=1, rp=10, sortname='id', sortorder='asc')
+
+
+def test_adaptive_timeout_follows_observed_p99():
+    timeouts = AdaptiveTimeout(max_s=20, min_s=0.5, p99_factor=3, min_samples=5, refresh_s=0)
+    for _ in range(10):
+        timeouts.observe('/su_oss_chamado', 0.4)
+        timeouts.observe('cliente', 0.01)
+    assert timeouts.timeout_for('/su_oss_chamado') == pytest.approx(1.2, rel=0.05)
+    assert timeouts.timeout_for('/cliente') == 0.5
+    assert timeouts.timeout_for('/fn_areceber') == 20
+
+    client = IXCClient(host='host', user='user', token='token', timeout_s=20)
+    client._client = FlakyHttpClient(status_code=200)
+    client.timeouts.refresh_s = 0
+    client.timeouts.min_samples = 3
+    for _ in range(4):
+        client.post_list('/cliente', [], page=1, rp=10, sortname='id', sortorder='asc')
+    assert client._client.timeouts[:3] == [20, 20, 20]
+    assert client._client.timeouts[-1] == 2.0
+
+
+class SlowHttpClient(FlakyHttpClient):
+    # IXC com latência fixa: estoura quando o timeout pedido é menor que ela
+    def __init__(self, latency_s):
+        super().__init__(status_code=200)
+        self.latency_s = latency_s
+
+    def post(self, *args, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        if timeout < self.latency_s:
+            raise httpx.ReadTimeout('read timeout')
+        return FlakyResponse(self.status_code)
+
+
+def test_adaptive_timeout_grows_when_ixc_latency_shifts_up():
+    client = IXCClient(host='host', user='user', token='token', timeout_s=20, max_retries=1, breaker_failures=0)
+    client._client = SlowHttpClient(latency_s=0.01)
+    client.timeouts.refresh_s = 0
+    client.timeouts.min_samples = 3
+    for _ in range(4):
+        client.post_list('/cliente', [], page=1, rp=10, sortname='id', sortorder='asc')
+    assert client._client.timeouts[-1] == 2.0
+
+    # IXC passou a levar 5s: o timeout estourado vira amostra e o p99 sobe em vez de cortar para sempre em 2s
+    client._client.latency_s = 5
+    for _ in range(2):
+        with pytest.raises(IXCUnavailableError):
+            client.post_list('/cliente', [], page=1, rp=10, sortname='id', sortorder='asc')
+    client.post_list('/cliente', [], page=1, rp=10, sortname='id', sortorder='asc')
+    assert client._client.timeouts[-3:] == [2.0, 2.0, 6.0]
+
+
+def test_breaker_open_resets_adaptive_timeout_for_the_probe():
+    client = IXCClient(host='host', user='user', token='token', timeout_s=20, max_retries=1)
+    client.breakers = CircuitBreakers(failure_threshold=1, open_s=0)
+    client._client = SlowHttpClient(latency_s=0.01)
+    client.timeouts.refresh_s = 0
+    client.timeouts.min_samples = 3
+    for _ in range(4):
+        client.post_list('/cliente', [], page=1, rp=10, sortname='id', sortorder='asc')
+
+    client._client.latency_s = 5
+    with pytest.raises(IXCCircuitOpenError):
+        client.post_list('/cliente', [], page=1, rp=10, sortname='id', sortorder='asc')
+    # sonda do half_open sai com o IXC_TIMEOUT_S cheio e fecha o circuito
+    client.post_list('/cliente', [], page=1, rp=10, sortname='id', sortorder='asc')
+    assert client._client.timeouts[-2:] == [2.0, 20]
+    assert client.breakers.states() == {'/cliente': CLOSED}
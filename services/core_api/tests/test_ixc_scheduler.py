@@ -0,0 +1,116 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.clients import ixc_scheduler
+from app.clients.ixc_client import IXCClient, IXCUnavailableError
+from app.clients.ixc_resilience import CLOSED
+from app.clients.ixc_scheduler import (
+    BACKGROUND,
+    BUCKET_KEY,
+    INTERACTIVE,
+    IXCScheduler,
+    IXCSchedulerTimeout,
+    LocalTokenBucket,
+    current_ixc_priority,
+    ixc_priority,
+)
+from app.main import app
+from app.services.billing_sync import BillingSyncResult
+from test_ixc_client import CountingHttpClient
+
+
+def _redis_down():
+    raise ConnectionError('redis down')
+
+
+def test_local_bucket_refills_and_keeps_reserve():
+    now = [0.0]
+    bucket = LocalTokenBucket(rate_per_s=2, burst=4, clock=lambda: now[0])
+    assert [bucket.take(2) for _ in range(2)] == [0.0, 0.0]
+    # background parou na reserva; as telas ainda levam os 2 tokens que sobraram
+    assert bucket.take(2) == pytest.approx(0.5)
+    assert [bucket.take(0) for _ in range(2)] == [0.0, 0.0]
+    assert bucket.take(0) == pytest.approx(0.5)
+
+    now[0] = 0.5
+    assert bucket.take(0) == 0.0
+
+
+def test_scheduler_uses_redis_script_and_falls_back_to_local_bucket(caplog):
+    calls = []
+
+    class _Redis:
+        def register_script(self, source):
+            assert 'HMGET' in source
+            return lambda keys, args: calls.append((keys, args)) or '0'
+
+    scheduler = IXCScheduler(rate_per_s=10, burst=8, interactive_reserve=0.25, redis_factory=_Redis)
+    with scheduler.slot() as priority:
+        assert priority == INTERACTIVE
+    with ixc_priority(BACKGROUND), scheduler.slot() as priority:
+        assert priority == BACKGROUND
+    assert calls == [([BUCKET_KEY], [10, 8, 0.0]), ([BUCKET_KEY], [10, 8, 2.0])]
+
+    offline = IXCScheduler(rate_per_s=1, burst=2, interactive_reserve=0.5, timeout_s=0, redis_factory=_redis_down)
+    with caplog.at_level('WARNING'), ixc_priority(BACKGROUND):
+        with offline.slot():
+            pass
+        with pytest.raises(IXCSchedulerTimeout):
+            with offline.slot():
+                pass
+    with offline.slot():
+        pass
+    assert sum('using local bucket' in rec.message for rec in caplog.records) == 1
+
+
+def test_background_concurrency_cap_leaves_room_for_interactive():
+    scheduler = IXCScheduler(max_concurrency=2, background_concurrency=1, timeout_s=0.05, redis_factory=None)
+    holding = threading.Event()
+    release = threading.Event()
+
+    def _background_call():
+        with ixc_priority(BACKGROUND), scheduler.slot():
+            holding.set()
+            release.wait(2)
+
+    worker = threading.Thread(target=_background_call)
+    worker.start()
+    try:
+        assert holding.wait(2)
+        with ixc_priority(BACKGROUND), pytest.raises(IXCSchedulerTimeout):
+            with scheduler.slot():
+                pass
+        with scheduler.slot() as priority:
+            assert priority == INTERACTIVE
+    finally:
+        release.set()
+        worker.join()
+
+
+def test_scheduler_timeout_is_unavailable_without_tripping_breaker():
+    scheduler = IXCScheduler(max_concurrency=1, timeout_s=0, redis_factory=None)
+    client = IXCClient(host='host', user='user', token='token', max_retries=1, breaker_failures=1, scheduler=scheduler)
+    client._client = CountingHttpClient()
+    assert client.post_list('/cliente', [], page=1, rp=10, sortname='id', sortorder='asc')['total'] == '1'
+
+    with scheduler.slot():
+        with pytest.raises(IXCUnavailableError, match='scheduler timeout'):
+            client.post_list('/cliente', [], page=1, rp=10, sortname='id', sortorder='asc')
+    assert client._client.calls == 1
+    assert client.breakers.states() == {'/cliente': CLOSED}
+
+
+def test_batch_routes_run_as_background(monkeypatch):
+    seen = []
+
+    def _sync(**kwargs):
+        seen.append(current_ixc_priority())
+        return BillingSyncResult(synced=0, upserted=0, duration_ms=0.0, due_from_used='2025-01-01', only_open_used=True)
+
+    monkeypatch.setattr('app.api.billing.sync_billing_cases', _sync)
+    monkeypatch.setattr(ixc_scheduler, '_default_priority', INTERACTIVE)
+    assert TestClient(app).post('/billing/sync').status_code == 200
+    assert seen == [BACKGROUND]
+    assert current_ixc_priority() == INTERACTIVE
@@ -0,0 +1,155 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from app.adapters.ixc_adapter import MockIXCAdapter
+from app.config import get_settings
+from app.main import app
+from app.services import jobs
+
+client = TestClient(app)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.renewals = 0
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, key):
+        return 1 if self.data.pop(key, None) is not None else 0
+
+    def register_script(self, source):
+        # mesma semântica dos scripts Lua de lock, atômica por rodar sem troca de dono no meio
+        def acquire(key, job_id, ttl):
+            holder = self.data.setdefault(key, job_id)
+            return '' if holder == job_id else holder
+
+        def replace(key, expected, job_id, ttl):
+            if self.data.get(key) != expected:
+                return 0
+            self.data[key] = job_id
+            return 1
+
+        def extend(key, job_id, ttl):
+            if self.data.get(key) != job_id:
+                return 0
+            self.renewals += 1
+            return 1
+
+        def release(key, job_id):
+            return self.delete(key) if self.data.get(key) == job_id else 0
+
+        scripts = {
+            jobs.LOCK_ACQUIRE_LUA: acquire,
+            jobs.LOCK_REPLACE_LUA: replace,
+            jobs.LOCK_EXTEND_LUA: extend,
+            jobs.LOCK_RELEASE_LUA: release,
+        }
+        return lambda keys, args: scripts[source](*keys, *args)
+
+
+class _FakeProducer:
+    def __init__(self):
+        self.sent = []
+
+    def send_task(self, name, kwargs=None):
+        self.sent.append((name, kwargs))
+
+
+def _install_fakes(monkeypatch):
+    fake_redis = _FakeRedis()
+    producer = _FakeProducer()
+    monkeypatch.setattr('app.services.jobs.get_redis', lambda: fake_redis)
+    monkeypatch.setattr('app.services.jobs.get_celery_producer', lambda: producer)
+    return fake_redis, producer
+
+
+def test_enqueue_sync_job_dedupes_while_running(monkeypatch):
+    fake_redis, producer = _install_fakes(monkeypatch)
+
+    first = client.post('/jobs/billing/sync', params={'due_from': '2025-01-01'})
+    assert first.status_code == 202
+    body = first.json()
+    assert body['status'] == 'queued'
+    assert body['deduplicated'] is False
+    assert producer.sent == [(jobs.JOB_TASK_NAMES['billing_sync'], {'job_id': body['id'], 'params': body['params']})]
+
+    second = client.post('/jobs/billing/sync')
+    assert second.status_code == 202
+    assert second.json()['id'] == body['id']
+    assert second.json()['deduplicated'] is True
+    assert len(producer.sent) == 1
+
+
+def test_run_job_reports_progress_and_releases_lock(monkeypatch):
+    fake_redis, _ = _install_fakes(monkeypatch)
+    job = jobs.enqueue_job('billing_enrich', {'limit': 50, 'only_missing': False})
+
+    result = jobs.run_job(job['id'], 'billing_enrich', job['params'], MockIXCAdapter())
+
+    stored = client.get(f"/jobs/{job['id']}").json()
+    assert stored['status'] == 'succeeded'
+    assert stored['result'] == result
+    assert stored['progress']['done'] == stored['progress']['total']
+    assert jobs._lock_key('billing_enrich') not in fake_redis.data
+
+
+def test_run_job_skips_when_another_job_holds_the_lock(monkeypatch):
+    _install_fakes(monkeypatch)
+    running = jobs.enqueue_job('billing_reconcile', {'limit': 10})
+    duplicate = {**running, 'id': 'other-job'}
+    jobs._save_job(duplicate)
+
+    assert jobs.run_job('other-job', 'billing_reconcile', {'limit': 10}, MockIXCAdapter()) is None
+    assert jobs.get_job('other-job')['status'] == 'skipped'
+
+
+def test_get_unknown_job_returns_404(monkeypatch):
+    _install_fakes(monkeypatch)
+    assert client.get('/jobs/missing').status_code == 404
+
+
+def test_release_never_deletes_a_lock_taken_by_another_job(monkeypatch):
+    fake_redis, _ = _install_fakes(monkeypatch)
+    key = jobs._lock_key('billing_sync')
+    assert jobs._acquire_lock('billing_sync', 'job-a') is None
+    # lock do job-a expirou e o job-b pegou: o release atrasado do job-a não pode apagar
+    fake_redis.data[key] = 'job-b'
+    jobs._release_lock('billing_sync', 'job-a')
+    assert fake_redis.data[key] == 'job-b'
+    assert jobs._acquire_lock('billing_sync', 'job-a') == 'job-b'
+    assert not jobs._replace_lock('billing_sync', 'job-a', 'job-c')
+
+
+def test_run_job_renews_lock_while_running(monkeypatch):
+    fake_redis, _ = _install_fakes(monkeypatch)
+    monkeypatch.setenv('JOB_LOCK_TTL_S', '1')
+    monkeypatch.setattr(jobs, 'LOCK_RENEW_MIN_S', 0.01)
+    get_settings.cache_clear()
+
+    def _slow_runner(adapter, params, progress):
+        # roda mais que o TTL do lock; sai assim que o lock foi renovado duas vezes
+        for _ in range(200):
+            if fake_redis.renewals >= 2:
+                break
+            time.sleep(0.01)
+        return {}
+
+    monkeypatch.setitem(jobs.JOB_RUNNERS, 'billing_sync', _slow_runner)
+    try:
+        job = jobs.enqueue_job('billing_sync', {})
+        jobs.run_job(job['id'], 'billing_sync', {}, MockIXCAdapter())
+    finally:
+        get_settings.cache_clear()
+
+    assert fake_redis.renewals >= 2
+    assert jobs._lock_key('billing_sync') not in fake_redis.data
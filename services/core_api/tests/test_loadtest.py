@@ -0,0 +1,65 @@
+import asyncio
+import os
+
+from app.devtools import loadtest
+from app.devtools.loadtest import DEFAULT_DATABASE_URL, DEFAULT_MIX, LoadTestConfig, Scenario, build_schedule, compare_reports, run_loadtest
+from app.main import app
+
+
+def test_schedule_is_deterministic_and_follows_weights():
+    first = build_schedule(DEFAULT_MIX, 500, seed=7)
+    assert first == build_schedule(DEFAULT_MIX, 500, seed=7)
+    assert first != build_schedule(DEFAULT_MIX, 500, seed=8)
+
+    counts = {}
+    for name, _, _ in first:
+        counts[name] = counts.get(name, 0) + 1
+    assert set(counts) == {s.name for s in DEFAULT_MIX}
+    assert counts['dashboard.summary'] > counts['billing.cases_summary']
+
+
+def test_run_loadtest_reports_levels_ixc_calls_and_cache():
+    mix = (
+        Scenario('dashboard.maintenances', '/dashboard/maintenances', 3, ({'tab': 'open'}, {'tab': 'done'})),
+        Scenario('billing.cases_summary', '/billing/cases/summary', 1),
+    )
+    config = LoadTestConfig(size=200, requests=12, concurrency=(1, 3), sync_billing=False)
+    try:
+        report = asyncio.run(run_loadtest(config, mix))
+    finally:
+        app.dependency_overrides.clear()
+
+    assert report['config']['mix'] == {'dashboard.maintenances': 3, 'billing.cases_summary': 1}
+    assert [level['concurrency'] for level in report['levels']] == [1, 3]
+    for level in report['levels']:
+        assert level['requests'] == 12
+        assert level['errors'] == 0
+        assert level['throughput_rps'] > 0
+        assert level['latency_ms']['p50'] <= level['latency_ms']['p99'] <= level['latency_ms']['max']
+        assert level['by_scenario']['dashboard.maintenances']['ixc_calls_per_request']['mean'] >= 1
+        assert level['by_scenario']['billing.cases_summary']['ixc_calls_per_request']['max'] == 0
+        assert level['ixc_backend_calls'] > 0
+        assert level['cache']['hit_rate'] is None
+
+    lines = compare_reports(report, report)
+    assert len(lines) == 2
+    assert 'rps' in lines[0] and '+0.0%' in lines[0]
+
+
+def test_main_ignores_inherited_database_url(monkeypatch, tmp_path):
+    seen = []
+
+    async def _run(config):
+        seen.append(os.environ['DATABASE_URL'])
+        return {'levels': []}
+
+    monkeypatch.setattr(loadtest, 'run_loadtest', _run)
+    monkeypatch.setenv('DATABASE_URL', 'postgresql+psycopg://softhub:softhub@db:5432/softhub')
+    monkeypatch.delenv('LOADTEST_DATABASE_URL', raising=False)
+    monkeypatch.setenv('IXC_MODE', 'mock')
+    monkeypatch.setenv('IXC_CALL_BUDGET', '0')
+    loadtest.main(['--output', str(tmp_path / 'report.json')])
+    monkeypatch.setenv('LOADTEST_DATABASE_URL', 'sqlite:///./outro.db')
+    loadtest.main(['--output', str(tmp_path / 'report.json')])
+
+    assert seen == [DEFAULT_DATABASE_URL, 'sqlite:///./outro.db']
@@ -0,0 +1,73 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils.metrics import Histogram, cache_key_family, observe_ixc_call, record_worker_task, render_worker_task_metrics
+
+client = TestClient(app)
+
+
+class _FakeRedisHash:
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self):
+        return self
+
+    def hincrby(self, key, field, amount):
+        self.data[field] = int(self.data.get(field, 0)) + amount
+
+    def hincrbyfloat(self, key, field, amount):
+        self.data[field] = float(self.data.get(field, 0.0)) + amount
+
+    def execute(self):
+        return None
+
+    def hgetall(self, key):
+        return {k: str(v) for k, v in self.data.items()}
+
+
+def test_histogram_renders_cumulative_fixed_buckets():
+    hist = Histogram('t_latency_seconds', 'test', ('route',), buckets=(0.1, 1.0))
+    hist.observe(0.05, route='/a')
+    hist.observe(0.5, route='/a')
+    hist.observe(5.0, route='/a')
+
+    lines = hist.render()
+    assert 't_latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 't_latency_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 't_latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 't_latency_seconds_count{route="/a"} 3' in lines
+
+
+def test_metrics_endpoint_exposes_route_latency_by_template():
+    client.get('/filters/does-not-exist')
+    body = client.get('/metrics').text
+
+    assert 'softhub_http_request_duration_seconds_count{method="GET",route="/filters/{filter_id}",status="404"}' in body
+    assert '# TYPE softhub_ixc_requests_total counter' in body
+    assert '# TYPE softhub_db_sessions_total counter' in body
+
+
+def test_ixc_latency_is_labeled_by_endpoint_and_status():
+    observe_ixc_call('su_oss_chamado', 200, 0.2, 10)
+    observe_ixc_call('/su_oss_chamado', 'error', 5.0, 0)
+    body = client.get('/metrics').text
+
+    assert 'softhub_ixc_request_duration_seconds_count{endpoint="/su_oss_chamado",status="200"}' in body
+    assert 'softhub_ixc_request_duration_seconds_bucket{endpoint="/su_oss_chamado",status="error",le="+Inf"}' in body
+
+
+def test_worker_task_durations_round_trip_through_redis_hash():
+    fake = _FakeRedisHash()
+    record_worker_task(fake, 'softhub.jobs.billing_sync', 'SUCCESS', 0.3)
+    record_worker_task(fake, 'softhub.jobs.billing_sync', 'SUCCESS', 42.0)
+
+    lines = render_worker_task_metrics(fake)
+    assert 'softhub_worker_task_duration_seconds_bucket{task="softhub.jobs.billing_sync",state="SUCCESS",le="0.5"} 1' in lines
+    assert 'softhub_worker_task_duration_seconds_bucket{task="softhub.jobs.billing_sync",state="SUCCESS",le="60"} 2' in lines
+    assert 'softhub_worker_task_duration_seconds_count{task="softhub.jobs.billing_sync",state="SUCCESS"} 2' in lines
+
+
+def test_cache_key_family_drops_variable_suffix():
+    assert cache_key_family('softhub:dash:summary:2025-01-01:7:all:abc') == 'softhub:dash:summary'
+    assert cache_key_family('softhub:billing:open:v1') == 'softhub:billing:open'
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.dialects import postgresql
+
+from app.db import Base, BillingCase, json_key_equals
+from app.migrate import check_schema, head_revision, load_revisions, upgrade
+
+
+@pytest.fixture
+def fresh_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_revisions_form_a_single_chain():
+    revisions = load_revisions()
+    assert revisions[0].down_revision is None
+    for parent, child in zip(revisions, revisions[1:]):
+        assert child.down_revision == parent.revision
+    assert head_revision() == revisions[-1].revision
+
+
+def test_upgrade_builds_the_model_schema_and_is_idempotent(fresh_engine):
+    with pytest.raises(RuntimeError, match='python -m app.migrate upgrade'):
+        check_schema(fresh_engine)
+
+    assert upgrade(fresh_engine) == [rev.revision for rev in load_revisions()]
+    assert upgrade(fresh_engine) == []
+    check_schema(fresh_engine)
+
+    # as revisões precisam chegar no mesmo schema dos modelos
+    inspector = inspect(fresh_engine)
+    assert set(inspector.get_table_names()) == set(Base.metadata.tables)
+    for name, table in Base.metadata.tables.items():
+        assert {c['name'] for c in inspector.get_columns(name)} == set(table.columns.keys()), name
+
+
+def test_upgrade_adopts_database_created_by_create_all(fresh_engine):
+    legacy = [table for name, table in Base.metadata.tables.items() if name != 'schema_migrations']
+    Base.metadata.create_all(fresh_engine, tables=legacy)
+
+    assert upgrade(fresh_engine)[0] == '0001'
+    check_schema(fresh_engine)
+
+
+def test_billing_case_json_filters_target_gin_on_postgres_only(fresh_engine):
+    query = select(BillingCase.id).where(json_key_equals(BillingCase.contract_json, 'status_internet', 'A', 'postgresql'))
+    assert 'contract_json @> ' in str(query.compile(dialect=postgresql.dialect()))
+
+    upgrade(fresh_engine)
+    # no SQLite os índices GIN não são criados e as colunas seguem como JSON
+    assert inspect(fresh_engine).get_indexes('billing_case') == []
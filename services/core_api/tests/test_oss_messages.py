@@ -1,7 +1,18 @@
+from datetime import date
+
+import orjson
+import pytest
 from fastapi.testclient import TestClient
 
+from app.adapters.ixc_adapter import RealIXCAdapter
+from app.clients.ixc_client import IXCClientError
+from app.config import get_settings
+from app.devtools.synthetic import SyntheticDataset
+from app.devtools.synthetic_adapter import SyntheticIXCAdapter
 from app.main import app
+from app.services import oss_messages
 from app.services.adapters import get_ixc_adapter
+from app.utils import cache
 
 client = TestClient(app)
 
@@ -16,7 +27,15 @@ class _MessagesAdapter:
 
 class _MessagesErrorAdapter:
     def list_oss_mensagens(self, id_chamado: str):
-        return []
+        raise IXCClientError('non-json response')
+
+
+class _OpenMessagesAdapter:
+    def list_oss_mensagens(self, id_chamado: str):
+        return [{'id': '1', 'id_chamado': id_chamado, 'data': '2025-01-02 08:00:00', 'mensagem': 'Criada', 'id_evento': '10', 'status': 'A'}]
+
+    def list_oss_mensagens_batch(self, ids):
+        return {i: self.list_oss_mensagens(i) for i in ids}
 
 
 def test_get_oss_mensagens_returns_records_sorted_by_data():
@@ -47,17 +66,157 @@ def test_get_oss_mensagens_error_returns_empty_list_and_logs(caplog):
     assert payload['registros'] == []
 
 
-def test_real_adapter_logs_and_returns_empty_on_ixc_error(caplog):
-    from app.adapters.ixc_adapter import RealIXCAdapter
-    from app.clients.ixc_client import IXCClientError
-
+def test_real_adapter_logs_and_raises_on_ixc_error(caplog):
     class _BrokenClient:
         def iterate_all(self, *args, **kwargs):
             raise IXCClientError('non-json response')
 
     adapter = RealIXCAdapter(_BrokenClient())
-    with caplog.at_level('WARNING'):
-        registros = adapter.list_oss_mensagens('9083')
+    with caplog.at_level('WARNING'), pytest.raises(IXCClientError):
+        adapter.list_oss_mensagens('9083')
 
-    assert registros == []
     assert any('list_oss_mensagens failed' in rec.message for rec in caplog.records)
+
+
+class _KVRedis:
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.ttls[key] = ttl
+
+    def execute(self):
+        return []
+
+
+class _BatchAdapter(_MessagesAdapter):
+    def __init__(self):
+        self.batches = []
+
+    def list_oss_mensagens_batch(self, ids):
+        self.batches.append(list(ids))
+        return {i: self.list_oss_mensagens(i) for i in ids}
+
+
+@pytest.fixture
+def kv_redis(monkeypatch):
+    fake = _KVRedis()
+    monkeypatch.setattr(cache, 'get_redis', lambda: fake)
+    get_settings.cache_clear()
+    yield fake
+    get_settings.cache_clear()
+
+
+def test_batch_endpoint_fetches_only_cache_misses_in_one_call(kv_redis):
+    adapter = _BatchAdapter()
+    app.dependency_overrides[get_ixc_adapter] = lambda: adapter
+    try:
+        body = {'items': [{'id': '1', 'status': 'F'}, {'id': '2', 'status': 'AG'}, {'id': '1'}]}
+        first = client.post('/oss/mensagens/batch', json=body).json()['items']
+        body['items'].append({'id': '3'})
+        second = client.post('/oss/mensagens/batch', json=body).json()['items']
+        too_many = client.post('/oss/mensagens/batch', json={'items': [{'id': str(i)} for i in range(201)]})
+    finally:
+        app.dependency_overrides.pop(get_ixc_adapter, None)
+
+    assert list(first) == ['1', '2'] and first['1']['total'] == 2
+    assert [r['id'] for r in first['2']['registros']] == ['1', '2']
+    assert second['1'] == first['1'] and second['3']['total'] == 2
+    assert adapter.batches == [['1', '2'], ['3']]
+    assert too_many.status_code == 422
+
+    # última mensagem de todas é F: TTL longo independente do status mandado pela tela
+    key = oss_messages.oss_messages_cache_key
+    assert {kv_redis.ttls[key(i)] for i in ('1', '2', '3')} == {get_settings().oss_messages_final_ttl_s}
+
+
+def test_single_endpoint_reuses_batch_cache(kv_redis):
+    kv_redis.data[oss_messages.oss_messages_cache_key('7')] = orjson.dumps({'total': 0, 'registros': []})
+    app.dependency_overrides[get_ixc_adapter] = lambda: _OpenMessagesAdapter()
+    try:
+        assert client.get('/oss/7/mensagens').json() == {'total': 0, 'registros': []}
+        # status=F vindo da tela não vale: no IXC a OS ainda está aberta
+        assert client.get('/oss/8/mensagens', params={'status': 'F'}).json()['total'] == 1
+        batch = client.post('/oss/mensagens/batch', json={'items': [{'id': '9', 'status': 'F'}]}).json()['items']
+    finally:
+        app.dependency_overrides.pop(get_ixc_adapter, None)
+    assert batch['9']['total'] == 1
+    key = oss_messages.oss_messages_cache_key
+    assert kv_redis.ttls[key('8')] == kv_redis.ttls[key('9')] == get_settings().oss_messages_ttl_s
+
+
+def test_failed_fetch_is_flagged_and_not_cached(kv_redis):
+    app.dependency_overrides[get_ixc_adapter] = lambda: _MessagesErrorAdapter()
+    try:
+        single = client.get('/oss/5/mensagens')
+    finally:
+        app.dependency_overrides.pop(get_ixc_adapter, None)
+
+    class _PartialAdapter(_BatchAdapter):
+        def list_oss_mensagens_batch(self, ids):
+            return {i: self.list_oss_mensagens(i) for i in ids if i != '6'}
+
+    app.dependency_overrides[get_ixc_adapter] = lambda: _PartialAdapter()
+    try:
+        batch = client.post('/oss/mensagens/batch', json={'items': [{'id': '6'}, {'id': '7'}]}).json()['items']
+    finally:
+        app.dependency_overrides.pop(get_ixc_adapter, None)
+
+    failed = {'total': 0, 'registros': [], 'error': True}
+    assert single.status_code == 200 and single.json() == failed
+    assert batch['6'] == failed and batch['7'] == {'total': 2, 'registros': batch['7']['registros']}
+    assert list(kv_redis.data) == [oss_messages.oss_messages_cache_key('7')]
+
+
+def test_mock_adapter_batch_matches_single_lookups():
+    adapter = SyntheticIXCAdapter(SyntheticDataset(size=300, today=date(2025, 3, 10)))
+    batch = adapter.list_oss_mensagens_batch(['1000', '1001', '1000'])
+    assert list(batch) == ['1000', '1001']
+    assert batch['1000'] == adapter.list_oss_mensagens('1000')
+    assert batch['1001'] == adapter.list_oss_mensagens('1001')
+
+
+def test_real_adapter_batches_with_in_and_falls_back_per_id(caplog):
+    calls = []
+
+    class _Client:
+        def iterate_all(self, endpoint, grid, **kwargs):
+            calls.append(grid[0])
+            if grid[0]['OP'] == 'IN' or grid[0]['P'] == '13':
+                raise IXCClientError('IN not supported')
+            return [{'id': '1', 'id_chamado': grid[0]['P'], 'data': '2025-01-01'}]
+
+    ids = [str(i) for i in range(250)]
+    with caplog.at_level('WARNING'):
+        out = RealIXCAdapter(_Client()).list_oss_mensagens_batch(ids)
+
+    assert [c['P'].count(',') + 1 for c in calls if c['OP'] == 'IN'] == [200, 50]
+    # a OS que também falhou na consulta individual fica fora do retorno, em vez de virar lista vazia
+    assert '13' not in out
+    assert all(out[i][0]['id_chamado'] == i for i in ids if i != '13')
+    assert any('list_oss_mensagens_batch failed' in rec.message for rec in caplog.records)
+
+
+def test_real_adapter_groups_in_results_by_chamado():
+    class _Client:
+        def iterate_all(self, endpoint, grid, **kwargs):
+            return [
+                {'id': '3', 'id_chamado': '20', 'data': '2025-01-03'},
+                {'id': '1', 'id_chamado': '10', 'data': '2025-01-02'},
+                {'id': '2', 'id_chamado': '10', 'data': '2025-01-01'},
+            ]
+
+    out = RealIXCAdapter(_Client()).list_oss_mensagens_batch(['10', '20', '30'])
+    assert [r['id'] for r in out['10']] == ['2', '1']
+    assert [r['id'] for r in out['20']] == ['3'] and out['30'] == []
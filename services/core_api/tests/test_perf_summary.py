@@ -0,0 +1,61 @@
+import logging
+
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.main import app
+from app.utils.profiling import log_profile_event
+from app.utils.quantiles import LogSketch, WindowedSketches
+
+
+def test_log_sketch_quantiles_within_relative_accuracy():
+    sketch = LogSketch(relative_accuracy=0.01)
+    for value in range(1, 10001):
+        sketch.add(value)
+
+    assert sketch.count == 10000
+    assert sketch.max == 10000
+    for q, expected in ((0.5, 5000), (0.9, 9000), (0.99, 9900)):
+        assert abs(sketch.quantile(q) - expected) / expected <= 0.011
+
+
+def test_log_sketch_memory_is_bounded():
+    sketch = LogSketch(relative_accuracy=0.01, max_bins=64)
+    for exp in range(0, 60):
+        sketch.add(1.5 ** exp)
+
+    assert len(sketch.bins) <= 64
+    assert sketch.quantile(1.0) == sketch.max
+
+
+def test_windowed_sketches_drop_expired_minutes():
+    windows = WindowedSketches()
+    now = 1_700_000_000.0
+    windows.record('dashboard.summary', 1000, ts_s=now - 10 * 60)
+    windows.record('dashboard.summary', 10, ts_s=now)
+
+    summary = windows.summary(now_s=now)
+    assert summary['1m']['dashboard.summary']['count'] == 1
+    assert summary['15m']['dashboard.summary']['count'] == 2
+    assert summary['15m']['dashboard.summary']['max'] == 1000
+
+    windows.record('dashboard.summary', 20, ts_s=now + 15 * 60)
+    assert windows.summary(now_s=now + 15 * 60)['15m']['dashboard.summary']['count'] == 1
+
+
+def test_perf_summary_endpoint_groups_ixc_calls_by_endpoint(monkeypatch):
+    monkeypatch.setenv('SOFTHUB_PROFILE', '1')
+    get_settings.cache_clear()
+    try:
+        logger = logging.getLogger('test')
+        log_profile_event(logger, {'component': 'ixc.post_list', 'endpoint_ixc': '/su_oss_chamado', 'elapsed_ms': 120})
+        log_profile_event(logger, {'step_name': 'dashboard.summary.merge', 'elapsed_ms': 8})
+        response = TestClient(app).get('/debug/perf/summary')
+    finally:
+        get_settings.cache_clear()
+
+    assert response.status_code == 200
+    window = response.json()['windows']['1m']
+    assert window['ixc.post_list /su_oss_chamado']['count'] >= 1
+    assert window['ixc.post_list /su_oss_chamado']['p50'] is not None
+    assert 'dashboard.summary.merge' in window
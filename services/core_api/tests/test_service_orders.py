@@ -0,0 +1,56 @@
+from datetime import date, datetime
+
+from app.services.dashboard import compose_dashboard_summary, normalize_row
+from app.services.service_orders import ServiceOrder, ServiceOrderBatch, as_service_orders, collect_service_orders
+
+ROW = {
+    'id': 501,
+    'status': 'AG',
+    'id_assunto': 1,
+    'id_cliente': '77',
+    'id_filial': '2',
+    'protocolo': None,
+    'data_agenda': '',
+    'data_reservada': '2025-03-11 08:30:00',
+    'data_abertura': '2025-03-01 10:00:00',
+    'data_fechamento': '0000-00-00 00:00:00',
+    'endereco': 'Rua A',
+}
+
+
+def test_service_order_coerces_codes_and_parses_dates_once():
+    order = ServiceOrder.from_row(ROW)
+    other = ServiceOrder.from_row({**ROW, 'status': ''.join(['A', 'G'])})
+
+    assert (order.id, order.assunto_id, order.protocolo) == ('501', '1', '')
+    assert order.status is other.status
+    assert order.scheduled is None
+    assert order.scheduled_or_reserved == datetime(2025, 3, 11, 8, 30)
+    assert order.opened == datetime(2025, 3, 1, 10, 0)
+    assert order.closed is None
+    assert not hasattr(order, '__dict__')
+    assert as_service_orders([order, ROW])[0] is order
+
+
+def test_collect_service_orders_dedupes_by_id_and_fills_columns():
+    seen, out = set(), ServiceOrderBatch()
+    collect_service_orders([ROW, {'id': ''}], seen, out)
+    collect_service_orders([{**ROW, 'status': 'F'}, {**ROW, 'id': 502}], seen, out)
+    assert [(o.id, o.status) for o in out] == [('501', 'AG'), ('502', 'AG')]
+    assert out.columns_in_sync()
+    assert list(out.columns['scheduled_or_reserved_day']) == [out[0].scheduled_or_reserved.toordinal()] * 2
+    assert list(out.columns['closed_day']) == [-1, -1]
+    assert list(out.columns['filial_code']) == [2, 2]
+    assert as_service_orders(out) is out
+
+
+def test_normalize_row_and_summary_accept_dicts_or_service_orders():
+    row = {**ROW, 'data_agenda': '2025-03-10 14:05:00'}
+    customer = {'razao': 'Cliente X', 'cidade': 'Cidade Y'}
+    from_dict = normalize_row(row, customer, {'1'}, {'17'})
+    assert from_dict == normalize_row(ServiceOrder.from_row(row), customer, {'1'}, {'17'})
+    assert (from_dict['date'], from_dict['time'], from_dict['type'], from_dict['status_label']) == ('2025-03-10', '14:05', 'instalacao', 'Agendada')
+
+    args = (date(2025, 3, 10), 7, date(2025, 3, 10), None)
+    rows = ([row], [], [], [], [], [], [])
+    assert compose_dashboard_summary(*args, *rows) == compose_dashboard_summary(*args, *(as_service_orders(r) for r in rows))
@@ -0,0 +1,89 @@
+import pytest
+
+from app.config import get_settings
+from app.db import SessionLocal, Setting
+from app.services import settings as app_settings
+from app.utils import cache
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.version = None
+
+    def get(self, key):
+        return self.version
+
+    def incr(self, key):
+        self.version = str(int(self.version or 0) + 1)
+        return int(self.version)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setattr(cache, 'get_redis', lambda: fake)
+    monkeypatch.setenv('APP_SETTINGS_REFRESH_S', '0')
+    get_settings.cache_clear()
+    app_settings.invalidate_settings_snapshot()
+    with SessionLocal() as session:
+        session.query(Setting).delete()
+        session.commit()
+    yield fake
+    app_settings.invalidate_settings_snapshot()
+    get_settings.cache_clear()
+
+
+def _count_sessions(monkeypatch):
+    opened = []
+    original = app_settings.SessionLocal
+    monkeypatch.setattr(app_settings, 'SessionLocal', lambda: opened.append(1) or original())
+    return opened
+
+
+def test_read_normalizes_without_writing(fake_redis):
+    payload = app_settings.get_settings_payload()
+    assert payload == app_settings.DEFAULT_SETTINGS
+
+    with SessionLocal() as session:
+        session.add(Setting(key=app_settings.SETTINGS_KEY, value_json={'filiais': {'1': 'GV'}}))
+        session.commit()
+    app_settings.invalidate_settings_snapshot()
+
+    payload = app_settings.get_settings_payload()
+    assert payload['filiais']['1'] == 'GV'
+    assert payload['installation_subject_ids'] == ['1', '15']
+    with SessionLocal() as session:
+        # o JSON antigo continua como estava: leitura não grava a versão normalizada
+        assert session.get(Setting, app_settings.SETTINGS_KEY).value_json == {'filiais': {'1': 'GV'}}
+
+
+def test_snapshot_reloads_only_when_version_changes(fake_redis, monkeypatch):
+    app_settings.update_settings_payload({'filiais': {'1': 'A'}})
+    opened = _count_sessions(monkeypatch)
+
+    for _ in range(5):
+        assert app_settings.get_settings_payload()['filiais']['1'] == 'A'
+    assert opened == []
+
+    # outro processo grava e incrementa o carimbo
+    with SessionLocal() as session:
+        session.get(Setting, app_settings.SETTINGS_KEY).value_json = app_settings._merge_defaults({'filiais': {'1': 'B'}})
+        session.commit()
+    fake_redis.incr(app_settings.SETTINGS_VERSION_KEY)
+
+    assert app_settings.get_settings_payload()['filiais']['1'] == 'B'
+    assert app_settings.get_settings_payload()['filiais']['1'] == 'B'
+    assert len(opened) == 1
+
+
+def test_snapshot_skips_version_check_inside_refresh_interval(fake_redis, monkeypatch):
+    monkeypatch.setenv('APP_SETTINGS_REFRESH_S', '3600')
+    get_settings.cache_clear()
+    app_settings.get_settings_payload()
+
+    calls = []
+    monkeypatch.setattr(app_settings, 'read_version_stamp', lambda key: calls.append(1))
+    opened = _count_sessions(monkeypatch)
+    for _ in range(100):
+        app_settings.get_settings_payload()
+    assert calls == [] and opened == []
@@ -0,0 +1,88 @@
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+import orjson
+
+from app.adapters.ixc_adapter import MockIXCAdapter
+from app.main import app
+from app.services import snapshots
+from app.services.billing import BILLING_OPEN_CACHE_KEY
+from app.services.dashboard import agenda_week_cache_key, summary_cache_key
+from app.utils.profiling import get_request_trace
+
+client = TestClient(app)
+
+
+def test_refresh_dashboard_summary_snapshots_writes_every_period_and_filial(monkeypatch):
+    written = {}
+    monkeypatch.setattr('app.services.snapshots.cache_set_json', lambda key, value, ttl_s=None: written.setdefault(key, value))
+
+    today = date(2025, 1, 2)
+    result = snapshots.refresh_dashboard_summary_snapshots(MockIXCAdapter(), today_date=today)
+
+    assert result.failed == 0
+    assert result.written == 12
+    for days in (1, 7, 14, 30):
+        for filial_id in (None, '1', '2'):
+            assert summary_cache_key(today, days, filial_id, {}) in written
+    assert written[summary_cache_key(today, 1, None, {})]['period'] == {'start': '2025-01-02', 'end': '2025-01-02'}
+
+
+def test_refresh_agenda_week_snapshots_covers_current_and_next_week(monkeypatch):
+    written = {}
+    monkeypatch.setattr('app.services.snapshots.cache_set_json', lambda key, value, ttl_s=None: written.setdefault(key, value))
+
+    today = date(2025, 1, 2)
+    result = snapshots.refresh_agenda_week_snapshots(MockIXCAdapter(), today_date=today)
+
+    assert result.written == 6
+    definition = snapshots.AGENDA_SNAPSHOT_DEFINITION
+    assert agenda_week_cache_key(today, 7, None, definition) in written
+    assert agenda_week_cache_key(today + timedelta(days=7), 7, '2', definition) in written
+
+
+def test_refresh_billing_open_snapshot_counts_failures(monkeypatch):
+    written = {}
+    monkeypatch.setattr('app.services.snapshots.cache_set_json', lambda key, value, ttl_s=None: written.setdefault(key, value))
+
+    assert snapshots.refresh_billing_open_snapshot(MockIXCAdapter()).written == 1
+    assert BILLING_OPEN_CACHE_KEY in written
+
+    def _boom(adapter):
+        raise RuntimeError('ixc down')
+
+    monkeypatch.setattr('app.services.snapshots.build_billing_open_response', _boom)
+    assert snapshots.refresh_billing_open_snapshot(MockIXCAdapter()).failed == 1
+
+
+
+def test_snapshots_skip_payloads_over_ixc_call_budget(monkeypatch):
+    written = {}
+    monkeypatch.setattr('app.services.snapshots.cache_set_json', lambda key, value, ttl_s=None: written.setdefault(key, value))
+
+    class _OverBudgetAdapter(MockIXCAdapter):
+        def list_service_orders(self, grid_filters):
+            # só a semana que começa em 2025-01-09 estoura o orçamento
+            if any(f.get('P', '').startswith('2025-01-09') for f in grid_filters):
+                get_request_trace().budget_exceeded = True
+            return super().list_service_orders(grid_filters)
+
+    today = date(2025, 1, 2)
+    result = snapshots.refresh_agenda_week_snapshots(_OverBudgetAdapter(), today_date=today)
+
+    assert (result.written, result.failed) == (3, 3)
+    definition = snapshots.AGENDA_SNAPSHOT_DEFINITION
+    assert agenda_week_cache_key(today, 7, '1', definition) in written
+    assert agenda_week_cache_key(today + timedelta(days=7), 7, '1', definition) not in written
+    assert get_request_trace() is None
+
+def test_agenda_week_serves_precomputed_snapshot(monkeypatch):
+    snapshot = {'days': []}
+    expected_key = agenda_week_cache_key(date(2025, 1, 6), 7, None, {'category': 'instalacao'})
+    monkeypatch.setattr('app.api.dashboard.cache_get_entry', lambda key: (orjson.dumps(snapshot), None) if key == expected_key else None)
+
+    response = client.get('/dashboard/agenda-week', params={'start': '2025-01-06', 'days': 7, 'filter_json': '{"category": "instalacao"}'})
+
+    assert response.status_code == 200
+    assert response.headers.get('X-Cache') == 'HIT'
+    assert response.json() == snapshot
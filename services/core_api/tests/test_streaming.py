@@ -0,0 +1,99 @@
+from datetime import date
+from decimal import Decimal
+import json
+
+from fastapi.testclient import TestClient
+
+from app.adapters.ixc_adapter import MockIXCAdapter
+from app.main import app
+from app.services.adapters import get_ixc_adapter
+from app.utils.streaming import encode_line, ndjson_response
+from test_billing_cases import _GroupedAdapter, _seed_cases
+
+client = TestClient(app)
+
+
+def _get(path, adapter=None, **params):
+    if adapter is not None:
+        app.dependency_overrides[get_ixc_adapter] = lambda: adapter
+    try:
+        return client.get(path, params=params)
+    finally:
+        app.dependency_overrides.pop(get_ixc_adapter, None)
+
+
+def _lines(response):
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_encode_line_matches_pydantic_json_for_dates_and_decimals():
+    line = encode_line({'due': date(2025, 3, 10), 'amount': Decimal('10.50'), 'nome': 'João'})
+    assert line == '{"due":"2025-03-10","amount":"10.50","nome":"João"}\n'.encode('utf-8')
+
+
+def test_maintenances_stream_matches_list_response():
+    for tab in ('open', 'scheduled', 'done'):
+        expected = _get('/dashboard/maintenances', MockIXCAdapter(), tab=tab).json()
+        assert _lines(_get('/dashboard/maintenances', MockIXCAdapter(), tab=tab, stream='true')) == expected
+
+
+def test_billing_open_stream_emits_items_then_summary(monkeypatch):
+    stored = {}
+    monkeypatch.setattr('app.api.billing.cache_get_json', lambda key: None)
+    monkeypatch.setattr('app.api.billing.cache_set_json', lambda key, value, ttl_s=60: stored.update(value))
+
+    expected = _get('/billing/open', MockIXCAdapter()).json()
+    stored.clear()
+    response = _get('/billing/open', MockIXCAdapter(), stream='true')
+    lines = _lines(response)
+
+    assert response.headers['X-Cache'] == 'MISS'
+    assert lines[:-1] == expected['items']
+    assert lines[-1] == {'summary': expected['summary']}
+    # o stream também alimenta o cache com o payload completo
+    assert stored == expected
+
+    monkeypatch.setattr('app.api.billing.cache_get_json', lambda key: expected)
+    response = _get('/billing/open', stream='true')
+    assert response.headers['X-Cache'] == 'HIT'
+    assert _lines(response) == lines
+
+
+
+def test_billing_open_stream_marks_actions_before_streaming(monkeypatch):
+    marked = []
+    captured = {}
+    monkeypatch.setattr('app.api.billing.cache_get_json', lambda key: None)
+    monkeypatch.setattr('app.api.billing.cache_set_json', lambda key, value, ttl_s=60: None)
+    monkeypatch.setattr('app.services.billing.mark_action_if_new', lambda key, external_id: marked.append(key) or True)
+
+    def _capture(items, headers=None):
+        # o iterador ainda não foi consumido: as ações já precisam estar gravadas
+        captured['marked'] = list(marked)
+        return ndjson_response(items, headers=headers)
+
+    monkeypatch.setattr('app.api.billing.ndjson_response', _capture)
+    lines = _lines(_get('/billing/open', MockIXCAdapter(), stream='true'))
+
+    assert captured['marked'] and captured['marked'] == marked
+    assert len(marked) == lines[-1]['summary']['over_20_days']
+
+
+def test_grouped_cases_stream_matches_response():
+    expected = _get('/billing/cases', _GroupedAdapter(), group_by='contract').json()
+    lines = _lines(_get('/billing/cases', _GroupedAdapter(), group_by='contract', stream='true'))
+
+    summary = lines.pop()['summary']
+    assert lines == expected['cases']
+    summary.pop('generated_at')
+    expected['summary'].pop('generated_at')
+    assert summary == expected['summary']
+
+
+def test_cases_db_stream_matches_response_model():
+    _seed_cases()
+    expected = _get('/billing/cases/db', status='OPEN', min_days=20).json()
+    assert len(expected) >= 2
+    assert _lines(_get('/billing/cases/db', status='OPEN', min_days=20, stream='true')) == expected
@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.devtools.synthetic import SyntheticDataset
+from app.services import dashboard, summary_engine
+from app.services.filter_plans import DEFAULT_INSTALL_ASSUNTOS, DEFAULT_MAINTENANCE_ASSUNTOS
+from app.services.service_orders import ServiceOrderBatch, as_service_orders, collect_service_orders
+
+pytest.importorskip('numpy')
+
+TODAY = date(2025, 3, 10)
+
+
+def _batch(rows):
+    out = ServiceOrderBatch()
+    collect_service_orders(rows, set(), out)
+    return out
+
+
+def _inputs():
+    rows = SyntheticDataset(size=3000, today=TODAY, window_days=20).table('su_oss_chamado')
+    os_rows = [rows.row(i) for i in range(len(rows))]
+    install = [r for r in os_rows if r['id_assunto'] in DEFAULT_INSTALL_ASSUNTOS]
+    maint = [r for r in os_rows if r['id_assunto'] in DEFAULT_MAINTENANCE_ASSUNTOS]
+    done = [r for r in maint if r['status'] == 'F']
+    return install, maint, done
+
+
+@pytest.mark.parametrize('selected', [set(), {'AG', 'F'}, {'X'}])
+def test_vectorized_counters_match_python_for_batches_and_plain_lists(selected):
+    install, maint, done = _inputs()
+    args = (TODAY - timedelta(days=14), 30, TODAY)
+    predicates = (dashboard._is_open_installation_status, dashboard._is_done_status)
+
+    expected = dashboard._summary_counters(*(as_service_orders(x) for x in (install, maint, done)), selected, *args)
+    from_batches = summary_engine.summary_counters(*(_batch(x) for x in (install, maint, done)), selected, *args, *predicates)
+    from_lists = summary_engine.summary_counters(*(as_service_orders(x) for x in (install, maint, done)), selected, *args, *predicates)
+
+    assert expected['install_total'] > 0 or selected == {'X'}
+    assert from_batches == expected
+    assert from_lists == expected
+
+
+def test_batch_columns_are_ignored_once_the_list_is_changed():
+    install, _, _ = _inputs()
+    batch = _batch(install)
+    assert batch.columns_in_sync()
+    batch.pop()
+    assert not batch.columns_in_sync()
+
+    start = TODAY - timedelta(days=14)
+    expected = dashboard._summary_counters(list(batch), [], [], set(), start, 30, TODAY)
+    result = summary_engine.summary_counters(batch, [], [], set(), start, 30, TODAY, dashboard._is_open_installation_status, dashboard._is_done_status)
+    assert result == expected
+
+
+def test_compose_and_capacity_use_engine_above_threshold(monkeypatch):
+    install, maint, done = _inputs()
+    start = TODAY - timedelta(days=7)
+    args = (start, 14, TODAY, {'status_codes': ['AG', 'A', 'F']}, _batch(install), _batch(maint), _batch(done), [], [], [], [])
+
+    monkeypatch.setattr(summary_engine, 'VECTORIZE_MIN_ROWS', 10**9)
+    python_summary = dashboard.compose_dashboard_summary(*args)
+    python_capacity = dashboard._capacity_counts(_batch(install), start, 14)
+
+    calls = []
+    original = summary_engine.summary_counters
+    monkeypatch.setattr(summary_engine, 'summary_counters', lambda *a, **kw: calls.append(1) or original(*a, **kw))
+    monkeypatch.setattr(summary_engine, 'VECTORIZE_MIN_ROWS', 1)
+    assert dashboard.compose_dashboard_summary(*args) == python_summary
+    assert calls == [1]
+
+    vector_capacity = dashboard._capacity_counts(_batch(install), start, 14)
+    assert len(vector_capacity) == 14
+    # o caminho em Python também conta dias fora da janela (o fetch real nunca os traz); compara só a janela
+    empty = {'1': 0, '2': 0}
+    assert any(v != empty for v in vector_capacity.values())
+    assert vector_capacity == {day: python_capacity.get(day, empty) for day in vector_capacity}
+
+
+def test_capacity_counts_only_exact_filial_codes_on_both_paths(monkeypatch):
+    start = TODAY
+    filiais = ['1', '2', '01', ' 1', '02', '', '3', '1']
+    rows = [
+        {'id': str(i), 'status': 'AG', 'id_assunto': '1', 'id_filial': filial, 'data_agenda': f'2025-03-1{i % 2} 08:00:00'}
+        for i, filial in enumerate(filiais)
+    ]
+
+    monkeypatch.setattr(summary_engine, 'VECTORIZE_MIN_ROWS', 10**9)
+    python_capacity = dashboard._capacity_counts(as_service_orders(rows), start, 2)
+    monkeypatch.setattr(summary_engine, 'VECTORIZE_MIN_ROWS', 1)
+
+    assert python_capacity == {'2025-03-10': {'1': 1, '2': 0}, '2025-03-11': {'1': 1, '2': 1}}
+    assert dashboard._capacity_counts(as_service_orders(rows), start, 2) == python_capacity
+    assert dashboard._capacity_counts(_batch(rows), start, 2) == python_capacity
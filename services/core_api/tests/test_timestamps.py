@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from app.utils.timestamps import parse_ixc_datetime
+
+
+def test_parse_ixc_datetime_accepts_ixc_formats_and_rejects_invalid():
+    assert parse_ixc_datetime('2025-03-10 14:30:05') == datetime(2025, 3, 10, 14, 30, 5)
+    assert parse_ixc_datetime('2025-03-10T14:30:05') == datetime(2025, 3, 10, 14, 30, 5)
+    assert parse_ixc_datetime('2025-03-10T14:30:05.123-03:00') == datetime(2025, 3, 10, 14, 30, 5)
+    assert parse_ixc_datetime('2025-03-10') == datetime(2025, 3, 10)
+    # formatos fora do padrão continuam passando pelo strptime
+    assert parse_ixc_datetime('2025-3-1') == datetime(2025, 3, 1)
+
+    assert parse_ixc_datetime('0000-00-00 00:00:00') is None
+    assert parse_ixc_datetime('2025-03-10 14:30') is None
+    assert parse_ixc_datetime('2025-03-10T14:30+03:00') is None
+    assert parse_ixc_datetime('') is None
+    assert parse_ixc_datetime(None) is None
+    assert parse_ixc_datetime(20250310) is None
+
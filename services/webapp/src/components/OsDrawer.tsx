@@ -12,6 +12,44 @@ type OssMensagem = {
   status?: string
 }
 
+// mensagens já buscadas em lote pela agenda; o drawer abre sem nova chamada quando a OS está aqui
+// (OS em andamento só vale por pouco tempo, igual ao TTL curto da API)
+const prefetchedMessages = new Map<string, { registros: OssMensagem[]; at: number; final: boolean }>()
+const PREFETCH_BATCH_SIZE = 200
+const PREFETCH_TTL_MS = 60_000
+
+function getPrefetched(id: string) {
+  const entry = prefetchedMessages.get(id)
+  if (!entry) return null
+  return entry.final || Date.now() - entry.at < PREFETCH_TTL_MS ? entry.registros : null
+}
+
+export async function prefetchOssMensagens(apiBase: string, items: DashboardItem[]) {
+  const pending = items.filter((item) => item.id && !getPrefetched(item.id))
+  for (let start = 0; start < pending.length; start += PREFETCH_BATCH_SIZE) {
+    const batch = pending.slice(start, start + PREFETCH_BATCH_SIZE)
+    try {
+      const response = await fetch(`${apiBase}/oss/mensagens/batch`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ items: batch.map((item) => ({ id: item.id })) }),
+      })
+      if (!response.ok) return
+      const payload = await response.json()
+      Object.entries(payload?.items || {}).forEach(([id, value]: [string, any]) => {
+        // busca que falhou no IXC fica de fora: o drawer tenta de novo e mostra o erro
+        if (value?.error) return
+        const registros: OssMensagem[] = Array.isArray(value?.registros) ? value.registros : []
+        // mesmo critério da API: finalizada é a OS cuja última mensagem no IXC tem status F
+        prefetchedMessages.set(id, { registros, at: Date.now(), final: registros[registros.length - 1]?.status === 'F' })
+      })
+    } catch {
+      // prefetch é só otimização: o drawer busca a OS sozinho se faltar
+      return
+    }
+  }
+}
+
 export function OsDrawer({ item, open, onClose, apiBase }: { item: DashboardItem | null; open: boolean; onClose: () => void; apiBase: string }) {
   const [messages, setMessages] = useState<OssMensagem[]>([])
   const [loadingMessages, setLoadingMessages] = useState(false)
@@ -31,14 +69,20 @@ export function OsDrawer({ item, open, onClose, apiBase }: { item: DashboardItem
     let cancelled = false
 
     const loadMessages = async () => {
+      const prefetched = getPrefetched(item.id)
+      if (prefetched) {
+        setMessagesError(null)
+        setMessages(prefetched)
+        return
+      }
       setLoadingMessages(true)
       setMessagesError(null)
       try {
-        const url = `${apiBase}/oss/${item.id}/mensagens`
-        const response = await fetch(url)
+        const response = await fetch(`${apiBase}/oss/${item.id}/mensagens`)
         const text = await response.text()
         if (!response.ok) throw new Error(`HTTP ${response.status} ${response.statusText}\n${text.slice(0, 300)}`)
         const payload = JSON.parse(text)
+        if (payload?.error) throw new Error('Falha ao consultar mensagens da OS no IXC')
         if (!cancelled) setMessages(Array.isArray(payload?.registros) ? payload.registros : [])
       } catch (err: any) {
         if (!cancelled) {
@@ -8,7 +8,7 @@ import { BillingPage } from './billing/BillingPage'
 import { ActionBar } from './components/ActionBar'
 import { CapacityBar } from './components/CapacityBar'
 import { OsCard } from './components/OsCard'
-import { OsDrawer } from './components/OsDrawer'
+import { OsDrawer, prefetchOssMensagens } from './components/OsDrawer'
 import { PillToggle } from './components/PillToggle'
 import { ToastProvider, useToast } from './components/Toast'
 import type { AgendaDay, AgendaWeekResponse, AppSettings, DashboardItem, FilterDefinition, FilterScope, SavedFilter } from './types'
@@ -71,6 +71,11 @@ function AgendaBoard({ days, startDate, totalDays, loading, selectedFilialId, fi
   const byDate = useMemo(() => Object.fromEntries(days.map((d) => [d.date, d])), [days])
   const today = toISODate(new Date())
 
+  useEffect(() => {
+    if (loading) return
+    prefetchOssMensagens(API, days.flatMap((d) => d.items))
+  }, [days, loading])
+
   return (
     <section className="panel">
       <header className="panel-header"><h2>Agenda técnica</h2><p>{dateFormatter.format(parseISODate(startDate))} até {dateFormatter.format(parseISODate(addDays(startDate, totalDays - 1)))}</p></header>
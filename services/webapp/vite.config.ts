@@ -1,3 +1,39 @@
-import { defineConfig } from 'vite'
+import { readFileSync, writeFileSync } from 'node:fs'
+import { join } from 'node:path'
+import { brotliCompressSync, constants, gzipSync } from 'node:zlib'
+import { defineConfig, type Plugin } from 'vite'
 
-export default defineConfig({})
+const COMPRESSIBLE = /\.(js|mjs|css|html|svg|json|txt)$/
+const MIN_BYTES = 1024
+
+// Gera irmãos .br/.gz de cada arquivo do build; o core_api (spa_fallback) serve esses direto,
+// sem comprimir a cada request. Usa só o zlib do Node, sem dependência nova.
+function precompress(): Plugin {
+  return {
+    name: 'softhub-precompress',
+    apply: 'build',
+    writeBundle(options, bundle) {
+      const outDir = options.dir ?? 'dist'
+      for (const fileName of Object.keys(bundle)) {
+        if (!COMPRESSIBLE.test(fileName)) continue
+        const path = join(outDir, fileName)
+        const source = readFileSync(path)
+        if (source.length < MIN_BYTES) continue
+        writeFileSync(`${path}.gz`, gzipSync(source, { level: 9 }))
+        writeFileSync(
+          `${path}.br`,
+          brotliCompressSync(source, {
+            params: {
+              [constants.BROTLI_PARAM_QUALITY]: 11,
+              [constants.BROTLI_PARAM_SIZE_HINT]: source.length,
+            },
+          }),
+        )
+      }
+    },
+  }
+}
+
+export default defineConfig({
+  plugins: [precompress()],
+})
@@ -1,8 +1,110 @@
+from dataclasses import asdict
+import logging
+from time import perf_counter
+
 from celery import Celery
+from celery.signals import task_postrun, task_prerun
+
+from app.clients.ixc_scheduler import BACKGROUND, set_default_ixc_priority
+from app.config import get_settings
+from app.services.action_log_retention import archive_action_logs
+from app.services.adapters import get_ixc_adapter
+from app.services.jobs import JOB_TASK_NAMES, run_job
+from app.services.snapshots import (
+    refresh_agenda_week_snapshots,
+    refresh_billing_open_snapshot,
+    refresh_dashboard_summary_snapshots,
+)
+from app.utils.cache import get_redis
+from app.utils.metrics import record_worker_task
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+# tudo que o worker manda ao IXC (snapshots, jobs de billing) entra como background na fila do IXCClient
+set_default_ixc_priority(BACKGROUND)
+celery = Celery('softhub', broker=settings.redis_url, backend=settings.celery_result_backend)
+
+# snapshots são regravados antes do TTL do cache expirar; `expires` descarta execuções
+# atrasadas para não empilhar refreshes quando o IXC estiver lento.
+_snapshot_interval_s = float(settings.dashboard_snapshot_interval_s)
+celery.conf.beat_schedule = {
+    'snapshots-dashboard-summary': {
+        'task': 'softhub.snapshots.dashboard_summary',
+        'schedule': _snapshot_interval_s,
+        'options': {'expires': _snapshot_interval_s},
+    },
+    'snapshots-agenda-week': {
+        'task': 'softhub.snapshots.agenda_week',
+        'schedule': _snapshot_interval_s,
+        'options': {'expires': _snapshot_interval_s},
+    },
+    'snapshots-billing-open': {
+        'task': 'softhub.snapshots.billing_open',
+        'schedule': _snapshot_interval_s,
+        'options': {'expires': _snapshot_interval_s},
+    },
+    # move billing_action_log antigo (ACTION_LOG_RETENTION_DAYS) para arquivos .ndjson.gz mensais
+    'billing-action-log-retention': {
+        'task': 'softhub.retention.billing_action_log',
+        'schedule': 24 * 3600.0,
+    },
+}
+
+_task_started: dict[str, float] = {}
 
-celery = Celery('softhub', broker='redis://redis:6379/0', backend='redis://redis:6379/1')
+
+@task_prerun.connect
+def _mark_task_started(task_id=None, **kwargs) -> None:
+    _task_started[task_id] = perf_counter()
+
+
+@task_postrun.connect
+def _record_task_duration(task_id=None, task=None, state=None, **kwargs) -> None:
+    started = _task_started.pop(task_id, None)
+    if started is None or task is None:
+        return
+    try:
+        record_worker_task(get_redis(), task.name, state or 'UNKNOWN', perf_counter() - started)
+    except Exception as exc:
+        logger.warning('worker task metrics failed task=%s err=%s', task.name, exc)
 
 
 @celery.task
 def ping_task() -> str:
     return 'pong'
+
+
+@celery.task(name='softhub.snapshots.dashboard_summary')
+def refresh_dashboard_summary_task() -> dict:
+    return asdict(refresh_dashboard_summary_snapshots(get_ixc_adapter()))
+
+
+@celery.task(name='softhub.snapshots.agenda_week')
+def refresh_agenda_week_task() -> dict:
+    return asdict(refresh_agenda_week_snapshots(get_ixc_adapter()))
+
+
+@celery.task(name='softhub.snapshots.billing_open')
+def refresh_billing_open_task() -> dict:
+    return asdict(refresh_billing_open_snapshot(get_ixc_adapter()))
+
+
+@celery.task(name='softhub.retention.billing_action_log')
+def archive_action_logs_task() -> dict:
+    return asdict(archive_action_logs())
+
+
+@celery.task(name=JOB_TASK_NAMES['billing_sync'])
+def billing_sync_job(job_id: str, params: dict) -> dict | None:
+    return run_job(job_id, 'billing_sync', params, get_ixc_adapter())
+
+
+@celery.task(name=JOB_TASK_NAMES['billing_enrich'])
+def billing_enrich_job(job_id: str, params: dict) -> dict | None:
+    return run_job(job_id, 'billing_enrich', params, get_ixc_adapter())
+
+
+@celery.task(name=JOB_TASK_NAMES['billing_reconcile'])
+def billing_reconcile_job(job_id: str, params: dict) -> dict | None:
+    return run_job(job_id, 'billing_reconcile', params, get_ixc_adapter())